@@ -0,0 +1,72 @@
+"""Row -> Pydantic 変換のマイクロベンチマーク
+
+SocialAccount の行 (select(*projection) の Row) を ReadSocialAccount に変換するコストを比較する。
+インメモリSQLiteを使用するためDBサーバーは不要。
+    PYTHONPATH=. uv run python benchmark/crud_converter.py --rows 10000
+"""
+
+import argparse
+import timeit
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from src.app.crud.social_account_crud import SocialAccountCRUD
+from src.app.models.base_model import Base
+from src.app.models.social_account import SocialAccount
+from src.app.models.user import User  # noqa: F401  (外部キー参照先の users テーブルを metadata に登録する)
+from src.app.schemas.social_account_schema import ReadSocialAccount
+
+
+def legacy_convert(obj) -> ReadSocialAccount:
+    """変換レジストリ導入前の実装 (フィールドごとの getattr + model_validate)"""
+    data = {}
+    for field in ReadSocialAccount.model_fields:
+        data[field] = getattr(obj, field)
+    return ReadSocialAccount.model_validate(data)
+
+
+def main(rows: int, repeat: int) -> None:
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        now = datetime.now(tz=ZoneInfo('Asia/Tokyo'))
+        db.execute(
+            insert(SocialAccount.__table__),
+            [
+                {
+                    'user_id': 1,
+                    'provider': 'google',
+                    'provider_user_id': f'user_{i}',
+                    'provider_email': f'user_{i}@example.com',
+                    'access_token': 'access_token',
+                    'refresh_token': 'refresh_token',
+                    'token_expiry': now,
+                    'created_at': now,
+                }
+                for i in range(rows)
+            ],
+        )
+        crud = SocialAccountCRUD(db)
+        result_rows = db.execute(select(*crud._projection())).all()
+
+    cases = {
+        'legacy per-row getattr + model_validate': lambda: [legacy_convert(row) for row in result_rows],
+        'converter.one per row': lambda: [crud._convert_to_pydantic_model(row) for row in result_rows],
+        'converter.many (batch TypeAdapter)': lambda: crud._convert_many(result_rows),
+    }
+    print(f'rows={rows} repeat={repeat}')
+    baseline = None
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=1, repeat=repeat))
+        baseline = baseline or elapsed
+        print(f'{name:42s}: {elapsed * 1000:8.2f} ms ({baseline / elapsed:4.1f}x)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,90 @@
+"""SQLAlchemyCRUD.create_async のループと create_many_async の比較ベンチマーク
+
+settings.postgres_async_uri のDBに対して実行する。
+    PYTHONPATH=. uv run python benchmark/crud_create_many.py --rows 5000 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid as uuid_pkg
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.app.core.config import settings
+from src.app.crud.social_account_crud import SocialAccountCRUD
+from src.app.models.base_model import Base
+from src.app.models.social_account import SocialAccount
+from src.app.models.user import User
+from src.app.schemas.social_account_schema import CreateInternalSocialAccount
+
+
+def make_social_accounts(user_id: int, rows: int, prefix: str) -> list[CreateInternalSocialAccount]:
+    return [
+        CreateInternalSocialAccount(
+            user_id=user_id,
+            provider='google',
+            provider_user_id=f'{prefix}_{i}',
+            provider_email=f'{prefix}_{i}@example.com',
+            access_token='access_token',
+            refresh_token='refresh_token',
+        )
+        for i in range(rows)
+    ]
+
+
+async def main(rows: int, chunk_size: int) -> None:
+    engine = create_async_engine(settings.postgres_async_uri, echo=False)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as db:
+        result = await db.execute(
+            insert(User)
+            .values(
+                username=f'bench_{uuid_pkg.uuid4().hex[:8]}',
+                email=f'bench_{uuid_pkg.uuid4().hex[:8]}@example.com',
+                uuid=uuid_pkg.uuid4(),
+                is_verified=False,
+                is_deleted=False,
+                created_at=datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+            )
+            .returning(User.id)
+        )
+        user_id = result.scalar_one()
+        await db.commit()
+
+        crud = SocialAccountCRUD(db)
+        try:
+            start = time.perf_counter()
+            for obj_in in make_social_accounts(user_id, rows, 'loop'):
+                await crud.create_async(obj_in)
+            loop_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await crud.create_many_async(make_social_accounts(user_id, rows, 'bulk'), chunk_size=chunk_size)
+            bulk_elapsed = time.perf_counter() - start
+        finally:
+            await db.execute(delete(SocialAccount).where(SocialAccount.user_id == user_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+
+    await engine.dispose()
+
+    print(f'rows={rows} chunk_size={chunk_size}')
+    print(f'create_async loop : {loop_elapsed:8.3f}s ({rows / loop_elapsed:10.1f} rows/s)')
+    print(f'create_many_async : {bulk_elapsed:8.3f}s ({rows / bulk_elapsed:10.1f} rows/s)')
+    print(f'speedup           : {loop_elapsed / bulk_elapsed:8.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=SocialAccountCRUD.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.chunk_size))
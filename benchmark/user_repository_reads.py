@@ -0,0 +1,100 @@
+"""UserRepositoryImpl の読み取り (ORM経由 / Coreの行から直接生成) のCPU時間の比較ベンチマーク
+
+settings.postgres_async_uri のDBに対して find_by_id / find_by_email / find_by_username を繰り返し実行し、
+1回あたりのアプリ側のCPU時間 (time.process_time) を比較する。DBサーバー側の処理時間は含まれない。
+参考として asyncpg のプリペアドステートメントを直接実行した場合 (アプリ側の下限) も計測する。
+    PYTHONPATH=. uv run python benchmark/user_repository_reads.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid as uuid_pkg
+from datetime import datetime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, build_engine
+from src.app.domains.users.schemas.user_schemas import Email
+from src.app.infrastructures.users.dtos.user_entity_dto import UserEntityDTO
+from src.app.infrastructures.users.repositories.user_repository_impl import UserRepositoryImpl
+from src.app.models.base_model import Base
+from src.app.models.user import User
+
+
+async def cpu_per_call(func, iterations: int) -> float:
+    """func を iterations 回実行したときの1回あたりのCPU時間 (マイクロ秒)"""
+    for _ in range(min(iterations, 50)):  # ウォームアップ (ステートメントのコンパイル・プリペア)
+        await func()
+    start = time.process_time()
+    for _ in range(iterations):
+        await func()
+    return (time.process_time() - start) / iterations * 1_000_000
+
+
+async def main(iterations: int) -> None:
+    engine = build_engine(settings.postgres_async_uri, EngineOptions())
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    suffix = uuid_pkg.uuid4().hex[:8]
+    async with async_session() as db:
+        result = await db.execute(
+            insert(User)
+            .values(
+                username=f'bench_{suffix}',
+                email=f'bench_{suffix}@example.com',
+                full_name='Bench User',
+                uuid=uuid_pkg.uuid4(),
+                created_at=datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+            )
+            .returning(User.id)
+        )
+        user_id = result.scalar_one()
+        await db.commit()
+
+    email = Email(email=f'bench_{suffix}@example.com')
+    lookups = {
+        'find_by_id': lambda repository: repository.find_by_id(user_id),
+        'find_by_email': lambda repository: repository.find_by_email(email),
+        'find_by_username': lambda repository: repository.find_by_username(f'bench_{suffix}'),
+    }
+    try:
+        print(f'iterations={iterations} (CPU time per call)')
+        async with async_session() as db:
+            orm_repository = UserRepositoryImpl(db, core_reads=())
+            core_repository = UserRepositoryImpl(db)
+            for name, lookup in lookups.items():
+                orm = await cpu_per_call(lambda: lookup(orm_repository), iterations)
+                core = await cpu_per_call(lambda: lookup(core_repository), iterations)
+                print(f'{name:17s} ORM : {orm:8.1f} us')
+                print(f'{name:17s} Core: {core:8.1f} us ({orm - core:6.1f} us saved, {orm / core:4.2f}x)')
+
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            asyncpg_connection = raw.driver_connection
+            statement = await asyncpg_connection.prepare(f'SELECT {", ".join(User.__table__.columns.keys())} FROM users WHERE id = $1')
+
+            async def fetch_raw():
+                UserEntityDTO.to_entity(SimpleNamespace(**await statement.fetchrow(user_id)))
+
+            raw_cpu = await cpu_per_call(fetch_raw, iterations)
+            print(f'{"find_by_id":17s} asyncpg prepared (no session, lower bound): {raw_cpu:8.1f} us')
+    finally:
+        async with async_session() as db:
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -5,24 +5,29 @@ import httpx
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, status
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from google.auth.transport import requests
 from google.oauth2 import id_token
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.app.api.v1.users.dependencies import get_user_loader
 from src.app.core.config import settings
 from src.app.core.db.database import get_db_async
+from src.app.core.db.timeouts import db_time_budget
+from src.app.core.resources import get_http_client
+from src.app.crud.loaders import DataLoader
 from src.app.crud.social_account_crud import SocialAccountCRUD
 from src.app.crud.user_crud import UserCRUD
 from src.app.schemas.social_account_schema import CreateInternalSocialAccount
 from src.app.schemas.token_schemas import TokenUserData
-from src.app.schemas.user_schemas import CreateInternalUser
+from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
+from src.app.services.google_certs_service import google_certs_request
 from src.app.services.token_service import token_service
 from src.utils.logger import get_logger
 
 from .schemas import LogoutResponse, TokenResponse
 
 logger = get_logger(__name__)
-router = APIRouter(prefix='/auth', tags=['auth'])
+router = APIRouter(prefix='/auth', tags=['auth'], dependencies=[Depends(db_time_budget(settings.DB_REQUEST_BUDGET_MS))])
 
 
 @router.post('/login', response_model=TokenResponse)
@@ -77,7 +82,14 @@ async def login_with_google():
 
 
 @router.get('/google/callback', response_class=RedirectResponse)
-async def login_with_google_callback(code: str, request: Request, response: Response, db: AsyncSession = Depends(get_db_async)):
+async def login_with_google_callback(
+    code: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db_async),
+    user_loader: DataLoader[int, ReadUser] = Depends(get_user_loader),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+):
     data = {
         'code': code,
         'client_id': settings.GOOGLE_OAUTH_CLIENT_ID,
@@ -85,11 +97,10 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
         'redirect_uri': settings.get_google_redirect_uri,
         'grant_type': 'authorization_code',
     }
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(settings.GOOGLE_TOKEN_URL, data=data)
-        token_response.raise_for_status()
-        token_data = token_response.json()
-        logger.info(f'token_data: {token_data}')
+    token_response = await http_client.post(settings.GOOGLE_TOKEN_URL, data=data)
+    token_response.raise_for_status()
+    token_data = token_response.json()
+    logger.info(f'token_data: {token_data}')
 
     id_token_value = token_data.get('id_token')
     access_token = token_data.get('access_token')
@@ -104,9 +115,11 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
         )
 
     try:
+        # 証明書の取得 (期限切れが近い場合の再取得) を非同期に行い、検証中に同期の取得でイベントループを止めない
+        await google_certs_request.ensure(http_client)
         id_info = id_token.verify_oauth2_token(
             id_token_value,
-            requests.Request(),
+            google_certs_request,
             settings.GOOGLE_OAUTH_CLIENT_ID,
         )
         google_user_id = id_info.get('sub')
@@ -124,16 +137,13 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
 
         social_account_crud = SocialAccountCRUD(db)
         user_crud = UserCRUD(db)
-        social_account = await social_account_crud.get_by_provider_and_id(
-            google_user_id,
-            'google',
-        )
+        social_account = await social_account_crud.get_by_provider_and_id('google', google_user_id)
 
         if social_account:
             # 既存のソーシャルアカウントがある場合
             logger.info(f'既存のGoogleアカウント連携を検出: {email}')
 
-            user = await user_crud.get_by_id_async(social_account.user_id)
+            user = await user_loader.load(social_account.user_id)
 
             if not user:
                 # ユーザーが見つからない場合（通常は発生しないはず）
@@ -143,13 +153,6 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
                     detail='ユーザーが見つかりません。',
                 )
 
-            await social_account_crud.update_tokens(
-                social_account_id=social_account.id,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                expires_in=expires_in,
-            )
-
         else:
             # 新しいソーシャルアカウントの場合
             logger.info(f'新しいGoogleアカウント連携を検出: {email}')
@@ -163,12 +166,7 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
             else:
                 # 新しいユーザーの場合
                 logger.info(f'新しいユーザーを作成: {email}')
-                username = email.split('@')[0]
-
-                counter = 1
-                while await user_crud.username_exists_async(username):
-                    username = f'{username}_{counter}'
-                    counter += 1
+                username = await user_crud.next_available_username_async(email.split('@')[0])
                 logger.info(f'既存のユーザーを検出: {username}')
                 user_data = CreateInternalUser(
                     name=name,
@@ -180,17 +178,18 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
                 user = await user_crud.create_async(user_data)
                 logger.info(f'ユーザーを作成しました: {user.id}')
 
-            social_account_data = CreateInternalSocialAccount(
-                provider='google',
-                provider_user_id=google_user_id,
-                provider_email=email,
-                user_id=user.id,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                token_expiry=token_expiry,
-            )
-            account = await social_account_crud.create_async(social_account_data)
-            logger.info(f'ソーシャルアカウントを作成しました: {account.id}')
+        # ソーシャルアカウントの作成とトークン更新を1ステートメントで行う (同時ログインでも重複しない)
+        social_account_data = CreateInternalSocialAccount(
+            provider='google',
+            provider_user_id=google_user_id,
+            provider_email=email,
+            user_id=user.id,
+            access_token=access_token,
+            refresh_token=refresh_token,
+            token_expiry=token_expiry,
+        )
+        account = await social_account_crud.upsert_async(social_account_data)
+        logger.info(f'ソーシャルアカウントを保存しました: {account.id}')
 
         # JWTトークンの生成
         token_input_data = TokenUserData(
@@ -221,6 +220,9 @@ async def login_with_google_callback(code: str, request: Request, response: Resp
 
         return RedirectResponse('https://www.google.com/')
 
+    except (HTTPException, DBAPIError):
+        # 意図したステータスコードの例外と、時間予算の超過 (503) などDB側の例外はそのまま送出する
+        raise
     except Exception as e:
         logger.error(e)
         raise HTTPException(status_code=400, detail=f'エラーが発生しました: {str(e)}')
@@ -237,6 +239,7 @@ async def logout(
             detail='refresh_token is not found.',
         )
     response.delete_cookie(key='refresh_token')
+    token_service.revoke_token(refresh_token)
     return {'message': 'Successfully logged out'}
 
 
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response, status
 
+from src.app.core.resources import resources
 from src.utils.logger import get_logger
 
 from .schemas import HealthCheckResponse
@@ -16,3 +17,12 @@ async def health_check(request: Request):
         message='OK',
         status=200,
     )
+
+
+@router.get('/ready', response_model=HealthCheckResponse)
+async def readiness_check(response: Response):
+    """起動時のウォームアップが完了するまで 503 を返す (ロードバランサーのレディネスプローブ用)"""
+    if not resources.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return HealthCheckResponse(message='Warming up', status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return HealthCheckResponse(message='OK', status=status.HTTP_200_OK)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.app.core.metrics import metrics
+
+router = APIRouter(prefix='/metrics', tags=['metrics'])
+
+
+@router.get('', response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    """アプリケーション内のメトリクスをPrometheusのテキスト形式で返す"""
+    return metrics.render()
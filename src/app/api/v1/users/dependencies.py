@@ -1,18 +1,45 @@
+from collections.abc import AsyncGenerator
+
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app.core.db.database import get_db_async
+from src.app.crud.loaders import DataLoader, id_loader
 from src.app.crud.user_crud import UserCRUD
+from src.app.schemas.user_schemas import ReadUser
 from src.app.services.auth_service import oauth2_scheme
+from src.app.services.principal_cache import principal_cache
 from src.app.services.token_service import token_service
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_async)):
-    crud_user = UserCRUD(db)
+async def get_user_loader(db: AsyncSession = Depends(get_db_async)) -> AsyncGenerator[DataLoader[int, ReadUser], None]:
+    """リクエスト単位のユーザーローダー (FastAPIの依存性キャッシュにより1リクエストで1つだけ生成される)
+    AsyncSession は最初のクエリまで接続をチェックアウトしないため、トークンが不正なリクエストではDBに接続しない。
+    取得したユーザーは認証済みユーザーのキャッシュ (Redis) でワーカー間に共有されるため、
+    更新直後にレプリカの古い値をキャッシュしないようプライマリから取得する
+    """
+    loader = id_loader(UserCRUD(db), primary=True)
+    try:
+        yield loader
+    finally:
+        # get_db_async のセッションを閉じる前に、実行中のバッチ取得を止める
+        await loader.close()
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_loader: DataLoader[int, ReadUser] = Depends(get_user_loader),
+) -> ReadUser:
     payload = token_service.verify_token(token)
-    if payload is None:
+    if payload is None or not payload.id.isdigit():
         raise HTTPException(status_code=401, detail='Invalid token')
-    user = await crud_user.get_by_email_async(payload.email)
+    user_id = int(payload.id)
+    # キャッシュにあればDBに接続しない (ユーザーの更新・削除時に UserCRUD / UserRepositoryImpl が削除する)
+    user = await principal_cache.get(user_id)
+    if user is not None:
+        return user
+    user = await user_loader.load(user_id)
     if user is None:
         raise HTTPException(status_code=401, detail='user not authorized')
+    await principal_cache.set(user)
     return user
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 
 from src.app.core.config import settings
 from src.app.core.db.database import AsyncSession, get_db_async
+from src.app.core.db.timeouts import db_time_budget
 from src.app.crud.user_crud import UserCRUD
 from src.app.schemas.token_schemas import TokenUserData
 from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
 from src.app.services.token_service import token_service
-from src.app.services.user_service import get_hashed_password
+from src.app.services.user_service import get_hashed_password_async
 from src.app.worker import tasks
 from src.utils.logger import get_logger
 
@@ -14,7 +15,7 @@ from .dependencies import get_current_user
 from .schemas import DataInUser
 
 logger = get_logger(__name__)
-router = APIRouter(prefix='/users', tags=['users'])
+router = APIRouter(prefix='/users', tags=['users'], dependencies=[Depends(db_time_budget(settings.DB_REQUEST_BUDGET_MS))])
 
 
 @router.post('/register', response_model=ReadUser, status_code=201)
@@ -23,9 +24,11 @@ async def register_user(request: Request, user: DataInUser, db: AsyncSession = D
     email_row = await crud_user.email_exists_async(email=user.email)
     if email_row:
         raise HTTPException(status_code=400, detail='Email already exists')
+    # アドミッション制御の待ち行列や bcrypt の実行中 (拒否による 503 を含む) に接続を保持しないよう、読み取りのトランザクションを終える
+    await db.commit()
 
     user_internal_dict = user.model_dump()
-    user_internal_dict['hashed_password'] = get_hashed_password(user.password)
+    user_internal_dict['hashed_password'] = await get_hashed_password_async(user.password)
     del user_internal_dict['password']
     logger.info(user_internal_dict)
     user_internal = CreateInternalUser(**user_internal_dict)
@@ -0,0 +1,128 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from src.app.core.metrics import metrics
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ADMISSION_IN_FLIGHT = metrics.gauge('admission_in_flight', 'Operations currently admitted, by controller')
+ADMISSION_QUEUE_DEPTH = metrics.gauge('admission_queue_depth', 'Operations waiting for admission, by controller')
+ADMISSION_REJECTIONS = metrics.counter(
+    'admission_rejections_total', 'Operations rejected by admission control, by controller and reason'
+)
+
+# 処理時間の実績がまだない場合に Retry-After の見積もりに使う1件あたりの処理時間 (秒)
+DEFAULT_SERVICE_TIME = 0.25
+
+
+class AdmissionRejectedError(Exception):
+    """同時実行数と待ち行列が上限に達し、処理を受け付けられなかった場合の例外"""
+
+    def __init__(self, controller: str, reason: str, retry_after: int):
+        self.controller = controller
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f'{controller} rejected the operation ({reason}), retry after {retry_after}s')
+
+
+class AdmissionController:
+    """同時実行数を制限し、上限を超えた分を期限付きの有限の待ち行列で待たせるアドミッションコントローラー
+    待ち行列が満杯の場合は待たずに、期限までに順番が来なかった場合はその時点で AdmissionRejectedError を送出する。
+    ワーカープロセスごとに1つ持ち、イベントループに依存しないため、モジュールレベルで生成できる
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout_ms: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_ms = queue_timeout_ms
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._service_time = DEFAULT_SERVICE_TIME
+        self.rejections: dict[str, int] = {'queue_full': 0, 'queue_timeout': 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight, controller=self.name)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters), controller=self.name)
+
+    def retry_after(self) -> int:
+        """現在の実行中・待機中の操作が捌けるまでの見積もり秒数 (1秒以上)"""
+        backlog = self.in_flight + len(self._waiters)
+        return max(1, math.ceil(backlog / self.max_concurrent * self._service_time))
+
+    def _reject(self, reason: str) -> AdmissionRejectedError:
+        self.rejections[reason] += 1
+        ADMISSION_REJECTIONS.inc(controller=self.name, reason=reason)
+        logger.warning(f'Admission rejected by {self.name}: {reason} (in_flight={self.in_flight}, queued={len(self._waiters)})')
+        return AdmissionRejectedError(self.name, reason, self.retry_after())
+
+    async def acquire(self) -> None:
+        """実行枠を確保する。確保した枠は必ず release() で返す"""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject('queue_full')
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout_ms / 1000)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # 枠を受け取った直後にキャンセルされた場合は、次の待機者に渡す
+                self.release()
+            elif waiter in self._waiters:
+                # release() が先に取り出した (が枠を渡す前に完了していた) 場合は待ち行列に残っていない
+                self._waiters.remove(waiter)
+                self._update_gauges()
+            if isinstance(exc, TimeoutError):
+                raise self._reject('queue_timeout') from None
+            raise
+
+    def release(self, service_time: float | None = None) -> None:
+        """実行枠を返し、待機中の操作があれば先頭に枠を渡す"""
+        if service_time is not None:
+            # 指数移動平均で1件あたりの処理時間を Retry-After の見積もりに反映する
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """ブロック内の処理を実行枠を確保して実行する"""
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError) -> JSONResponse:
+    """AdmissionRejectedError を Retry-After 付きの 503 に変換する例外ハンドラー"""
+    return JSONResponse(
+        status_code=503,
+        content={'detail': 'Server is busy, please retry later'},
+        headers={'Retry-After': str(exc.retry_after)},
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic.fields import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -53,11 +55,43 @@ class DatabaseSettings(BaseSettings):
     DB_USER: str = Field(default='user')
     DB_PASSWORD: str = Field(default='password')
     DB_NAME: str = Field(default='dev-db')
+    # 使用するデータベース。sqlite はローカル開発・オフラインでのテスト用
+    DB_BACKEND: Literal['postgresql', 'sqlite'] = Field(default='postgresql')
+    # コネクションプール (1プロセスあたりの最大接続数は DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE: int = Field(default=5)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+    DB_POOL_TIMEOUT: float = Field(default=30.0)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    DB_ECHO: bool = Field(default=False)
+    # 0 の場合はタイムアウトなし
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=0)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=100)
+    # PgBouncer をトランザクションプーリングで使用する場合は 'transaction' (NullPool・ステートメントキャッシュ無効)
+    DB_POOLER_MODE: Literal['none', 'transaction'] = Field(default='none')
+    # ルート単位のDB処理の時間予算 (ミリ秒)。超過したクエリはキャンセルされ 503 を返す (0 の場合は無効)
+    # 予算が DB_STATEMENT_TIMEOUT_MS 以上の場合はトランザクションごとの SET LOCAL を省略する
+    DB_REQUEST_BUDGET_MS: int = Field(default=0)
+    # 起動時に確立しておく接続数 (DB_POOL_SIZE を上限とする)
+    DB_POOL_WARMUP: int = Field(default=5)
+    # 起動時のウォームアップに失敗したエンジンを再試行する間隔 (秒)。成功した時点でレディネスを有効にする
+    DB_WARMUP_RETRY_INTERVAL: float = Field(default=5.0)
+    # スロークエリログの閾値 (0 の場合は無効)、EXPLAIN を取得する割合 (0.0 - 1.0) とそのタイムアウト
+    DB_SLOW_QUERY_MS: int = Field(default=500)
+    DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = Field(default=0.0)
+    DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = Field(default=5000)
+    # APP_DEBUG 時に警告を出すリクエストあたりのクエリ数と、同じ形のクエリの繰り返し回数
+    DB_QUERY_COUNT_WARN_THRESHOLD: int = Field(default=20)
+    DB_QUERY_REPEAT_WARN_THRESHOLD: int = Field(default=5)
 
 
 class SqliteSettings(DatabaseSettings):
     SQLITE_SYNC_PREFIX: str = 'sqlite://'
     SQLITE_ASYNC_PREFIX: str = 'sqlite+aiosqlite://'
+    # インメモリDBの名前 (同じ名前の接続は同期・非同期エンジンをまたいで同じDBを共有する)
+    SQLITE_MEMORY_DB_NAME: str = Field(default='memdb')
+    SQLITE_MMAP_SIZE: int = Field(default=256 * 1024 * 1024)
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000)
 
     @property
     def sqlite_sync_uri(self) -> str:
@@ -69,11 +103,11 @@ class SqliteSettings(DatabaseSettings):
 
     @property
     def sqlite_sync_uri_memory(self) -> str:
-        return f'{self.SQLITE_SYNC_PREFIX}/:memory:'
+        return f'{self.SQLITE_SYNC_PREFIX}/file:{self.SQLITE_MEMORY_DB_NAME}?mode=memory&cache=shared&uri=true'
 
     @property
     def sqlite_async_uri_memory(self) -> str:
-        return f'{self.SQLITE_ASYNC_PREFIX}/:memory:'
+        return f'{self.SQLITE_ASYNC_PREFIX}/file:{self.SQLITE_MEMORY_DB_NAME}?mode=memory&cache=shared&uri=true'
 
 
 class PostgresSettings(DatabaseSettings):
@@ -81,6 +115,8 @@ class PostgresSettings(DatabaseSettings):
     POSTGRES_ASYNC_PREFIX: str = 'postgresql+asyncpg://'
     DB_USER: str = Field(default='user')
     DB_PASSWORD: str = Field(default='postgres')
+    # リードレプリカの接続URI (postgresql+asyncpg://...)。未設定の場合は読み取りもプライマリで実行する
+    POSTGRES_REPLICA_URIS: list[str] = Field(default=[])
 
     @property
     def postgres_sync_uri(self) -> str:
@@ -95,6 +131,9 @@ class RedisSettings(BaseSettings):
     REDIS_HOST: str = Field(default='localhost')
     REDIS_PORT: int = Field(default=6379)
     REDIS_DB: int = Field(default=0)
+    # 共有クライアントの接続・応答のタイムアウト (秒)。応答しないRedisで起動やリクエストが止まらないようにする
+    REDIS_CONNECT_TIMEOUT: float = Field(default=1.0)
+    REDIS_SOCKET_TIMEOUT: float = Field(default=1.0)
 
     @property
     def redis_uri(self) -> str:
@@ -107,6 +146,31 @@ class CryptoSettings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7)
     EMAIL_VERIFICATION_TOKEN_EXPIRE_MINUTES: int = Field(default=15)
+    # 検証済みトークンのキャッシュの最大件数 (ワーカープロセスごと)。0 の場合はキャッシュしない
+    TOKEN_CACHE_MAX_SIZE: int = Field(default=10000)
+    # 認証済みユーザーのキャッシュ。プロセス内のLRU (最大件数・秒) とRedis (秒)。
+    # 更新・削除時に削除するが、他のワーカーのLRUには LOCAL_TTL の間だけ古い値が残る
+    PRINCIPAL_CACHE_MAX_SIZE: int = Field(default=10000)
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = Field(default=5.0)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(default=60)
+    # Redisの1回の操作の上限 (秒)。超えた場合はRedisに障害があるとみなしてDBから取得する
+    PRINCIPAL_CACHE_REDIS_TIMEOUT_SECONDS: float = Field(default=0.1)
+    # bcrypt を実行するスレッド数 (同時に実行するハッシュ計算の上限)。CPUコア数以下にする
+    PASSWORD_HASH_WORKERS: int = Field(default=2)
+    # ワーカープロセスごとのアドミッション制御。同時実行数を超えた分は待ち行列で待ち、
+    # 待ち行列が満杯、または待ち時間の上限を超えた場合は bcrypt を実行せずに 503 (Retry-After付き) を返す
+    PASSWORD_HASH_MAX_CONCURRENT: int = Field(default=2)
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=16)
+    PASSWORD_HASH_QUEUE_TIMEOUT_MS: int = Field(default=2000)
+    # bcrypt のコスト。新しいハッシュは ROUNDS で作成し、
+    # 保存されているハッシュのコストが MIN〜MAX の範囲外の場合のみログイン時に再ハッシュする
+    # (ワーカーごとにコストが異なっても範囲内であれば再ハッシュしない。MIN を上げると既存のハッシュが順次再ハッシュされる)
+    PASSWORD_HASH_ROUNDS: int = Field(default=12)
+    PASSWORD_HASH_MIN_ROUNDS: int = Field(default=10)
+    PASSWORD_HASH_MAX_ROUNDS: int = Field(default=14)
+    # True の場合は起動時に PASSWORD_HASH_TARGET_MS に合うコストを MIN〜MAX の範囲で計測し、ROUNDS の代わりに使う
+    PASSWORD_HASH_CALIBRATE: bool = Field(default=False)
+    PASSWORD_HASH_TARGET_MS: int = Field(default=250)
 
 
 class TestUserSettings(BaseSettings):
@@ -129,5 +193,13 @@ class Settings(
 ):
     model_config = SettingsConfigDict(env_file='.env')
 
+    @property
+    def database_sync_uri(self) -> str:
+        return self.sqlite_sync_uri if self.DB_BACKEND == 'sqlite' else self.postgres_sync_uri
+
+    @property
+    def database_async_uri(self) -> str:
+        return self.sqlite_async_uri if self.DB_BACKEND == 'sqlite' else self.postgres_async_uri
+
 
 settings = Settings()
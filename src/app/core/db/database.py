@@ -1,18 +1,37 @@
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from src.app.core.config import settings
 from src.utils.logger import get_logger
 
+from .engine import EngineOptions, EngineRegistry
+from .routing import RoutingSession
+
 logger = get_logger(__name__)
 
-DATABASE_URL = settings.postgres_async_uri
+DATABASE_URL = settings.database_async_uri
+
+PRIMARY_ENGINE = 'primary'
+REPLICA_ENGINE_PREFIX = 'replica'
+
+engine_options = EngineOptions.from_settings(settings)
+engines = EngineRegistry()
+engines.register(PRIMARY_ENGINE, DATABASE_URL, engine_options)
+for i, replica_uri in enumerate(settings.POSTGRES_REPLICA_URIS):
+    engines.register(f'{REPLICA_ENGINE_PREFIX}_{i}', replica_uri, engine_options)
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine = engines.get(PRIMARY_ENGINE)
+replica_engines = [engines.get(name) for name in engines.names(REPLICA_ENGINE_PREFIX)]
+# 読み取りはリードレプリカ (未設定の場合はプライマリ)、書き込み以降はプライマリで実行する
+async_session = sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    primary=engine.sync_engine,
+    replicas=[replica.sync_engine for replica in replica_engines],
+    expire_on_commit=False,
+)
 
 
 async def get_db_async() -> AsyncGenerator[AsyncSession, None]:
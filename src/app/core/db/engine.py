@@ -0,0 +1,261 @@
+import asyncio
+from dataclasses import dataclass, replace
+from typing import Any, Literal
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.app.core.config import Settings
+from src.app.core.db.instrumentation import InstrumentedAsyncQueuePool, instrument_engine
+from src.app.core.db.slow_query import SLOW_QUERY_LOG_SKIP_OPTION, install_slow_query_log
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PoolerMode = Literal['none', 'transaction']
+# エンジンの実行オプションに保存する、接続先のプーラーモード
+POOLER_MODE_OPTION = 'pooler_mode'
+# エンジンの実行オプションに保存する、接続ごとに設定済みの statement_timeout (ミリ秒)
+STATEMENT_TIMEOUT_OPTION = 'statement_timeout_ms'
+
+
+@dataclass(frozen=True)
+class EngineOptions:
+    """エンジン (コネクションプール) の設定"""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    echo: bool = False
+    statement_timeout_ms: int = 0
+    prepared_statement_cache_size: int = 100
+    slow_query_ms: int = 0
+    slow_query_explain_sample_rate: float = 0.0
+    slow_query_explain_timeout_ms: int = 5000
+    pooler_mode: PoolerMode = 'none'
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'EngineOptions':
+        return cls(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            echo=settings.DB_ECHO,
+            statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
+            prepared_statement_cache_size=settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            slow_query_ms=settings.DB_SLOW_QUERY_MS,
+            slow_query_explain_sample_rate=settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+            slow_query_explain_timeout_ms=settings.DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+            pooler_mode=settings.DB_POOLER_MODE,
+            sqlite_mmap_size=settings.SQLITE_MMAP_SIZE,
+            sqlite_busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS,
+        )
+
+    def with_overrides(self, **overrides: Any) -> 'EngineOptions':
+        return replace(self, **overrides)
+
+
+def _unique_statement_name() -> str:
+    return f'__asyncpg_{uuid4()}__'
+
+
+def _install_transaction_pooler_hooks(engine: Engine, statement_timeout_ms: int) -> None:
+    """トランザクションプーリングで使用できない機能を禁止し、セッション単位の設定をトランザクション単位に置き換える"""
+
+    @event.listens_for(engine, 'before_execute')
+    def reject_server_side_cursor(conn: Connection, clauseelement: Any, multiparams: Any, params: Any, execution_options: Any) -> None:
+        # サーバーサイドカーソル (stream / yield_per) はサーバー接続の状態に依存するため使用しない
+        if execution_options.get('stream_results') or conn.get_execution_options().get('stream_results'):
+            raise InvalidRequestError('Server-side cursors are not supported with pooler_mode=transaction')
+
+    if statement_timeout_ms > 0:
+        # PgBouncer は statement_timeout を起動パラメータとして受け付けないため、トランザクションごとに設定する
+        @event.listens_for(engine, 'begin')
+        def set_statement_timeout(conn: Connection) -> None:
+            conn.exec_driver_sql(f'SET LOCAL statement_timeout = {int(statement_timeout_ms)}')
+
+
+def _install_sqlite_hooks(engine: Engine, options: EngineOptions) -> None:
+    """SQLite の接続ごとの PRAGMA を設定し、トランザクションを SQLAlchemy から明示的に開始する
+
+    - WAL と synchronous=NORMAL で書き込み時の fsync を減らし、読み取りと書き込みを並行できるようにする (インメモリDBでは無視される)
+    - sqlite3 ドライバー自身のトランザクション管理を無効にし BEGIN を発行することで、SAVEPOINT とトランザクション内のDDLを正しく扱う
+    """
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in (
+            'journal_mode=WAL',
+            'synchronous=NORMAL',
+            f'mmap_size={int(options.sqlite_mmap_size)}',
+            f'busy_timeout={int(options.sqlite_busy_timeout_ms)}',
+            'foreign_keys=ON',
+        ):
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin(conn: Connection) -> None:
+        # 他のドライバーと同様に、BEGIN はクエリ数やスロークエリの計測対象に含めない
+        conn.exec_driver_sql('BEGIN', execution_options={SLOW_QUERY_LOG_SKIP_OPTION: True})
+
+
+def uses_transaction_pooler(bind: Engine | Connection) -> bool:
+    """PgBouncer のトランザクションプーリング経由で接続するエンジン (接続) かどうか"""
+    return bind.get_execution_options().get(POOLER_MODE_OPTION) == 'transaction'
+
+
+def build_engine(url: str, options: EngineOptions, name: str | None = None) -> AsyncEngine:
+    """設定に従って非同期エンジンを生成
+    SQLite (aiosqlite) ではプールのサイズ指定と asyncpg 固有の接続引数を使用しない
+    name を指定した場合は、その名前でプールのメトリクスとスロークエリログを記録する
+
+    pooler_mode='transaction' の場合は PgBouncer のトランザクションプーリングに合わせて以下のように設定する
+    - 接続は PgBouncer がプールするため NullPool を使用し、アプリ側では接続を保持しない
+    - asyncpg のステートメントキャッシュを無効にし、プリペアドステートメントの名前を一意にする
+      (同じサーバー接続を別のクライアントが使用しても名前が衝突しない)
+    - サーバーサイドカーソルを禁止し、statement_timeout は SET LOCAL でトランザクションごとに設定する
+    """
+    kwargs: dict[str, Any] = {'echo': options.echo, 'pool_pre_ping': options.pool_pre_ping}
+    backend = make_url(url).get_backend_name()
+    transaction_pooler = backend == 'postgresql' and options.pooler_mode == 'transaction'
+    if backend == 'postgresql' and options.statement_timeout_ms > 0:
+        # 時間予算の残り時間がこの値以上の場合は SET LOCAL を省略できるよう、エンジンに記録する
+        kwargs['execution_options'] = {STATEMENT_TIMEOUT_OPTION: options.statement_timeout_ms}
+    if transaction_pooler:
+        kwargs['poolclass'] = NullPool
+        kwargs['execution_options'] = {**kwargs.get('execution_options', {}), POOLER_MODE_OPTION: options.pooler_mode}
+        if name is not None:
+            kwargs['pool_logging_name'] = name
+    elif backend != 'sqlite':
+        if name is not None:
+            kwargs.update(poolclass=InstrumentedAsyncQueuePool, pool_logging_name=name)
+        kwargs.update(
+            pool_size=options.pool_size,
+            max_overflow=options.max_overflow,
+            pool_timeout=options.pool_timeout,
+            pool_recycle=options.pool_recycle,
+        )
+    if transaction_pooler:
+        kwargs['connect_args'] = {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            'prepared_statement_name_func': _unique_statement_name,
+        }
+    elif backend == 'postgresql':
+        connect_args: dict[str, Any] = {'prepared_statement_cache_size': options.prepared_statement_cache_size}
+        if options.statement_timeout_ms > 0:
+            connect_args['server_settings'] = {'statement_timeout': str(options.statement_timeout_ms)}
+        kwargs['connect_args'] = connect_args
+    engine = create_async_engine(url, **kwargs)
+    if transaction_pooler:
+        _install_transaction_pooler_hooks(engine.sync_engine, options.statement_timeout_ms)
+    if backend == 'sqlite':
+        _install_sqlite_hooks(engine.sync_engine, options)
+    if name is not None:
+        instrument_engine(engine, name)
+        if options.slow_query_ms > 0:
+            install_slow_query_log(
+                engine,
+                name,
+                options.slow_query_ms,
+                options.slow_query_explain_sample_rate,
+                options.slow_query_explain_timeout_ms,
+            )
+    return engine
+
+
+def build_sync_engine(url: str, options: EngineOptions) -> Engine:
+    """設定に従って同期エンジンを生成 (マイグレーションやテストなど、同期的にDBを操作する処理用)
+    SQLite では非同期エンジンと同じ PRAGMA を設定する。インメモリDB (共有キャッシュ) は同じ名前の非同期エンジンと共有される
+    """
+    kwargs: dict[str, Any] = {'echo': options.echo, 'pool_pre_ping': options.pool_pre_ping}
+    backend = make_url(url).get_backend_name()
+    if backend != 'sqlite':
+        kwargs.update(
+            pool_size=options.pool_size,
+            max_overflow=options.max_overflow,
+            pool_timeout=options.pool_timeout,
+            pool_recycle=options.pool_recycle,
+        )
+    engine = create_engine(url, **kwargs)
+    if backend == 'sqlite':
+        _install_sqlite_hooks(engine, options)
+    return engine
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> int:
+    """指定した数の接続を同時に確立してプールに戻し、最初のリクエストでの接続確立 (TCP/TLS/認証) を避ける
+    プールに保持される数を超えた接続は返却時に閉じられるため、pool_size を上限とする (NullPool では何もしない)
+    一部の接続に失敗した場合も確立できた接続はすべてプールに戻し、確立できた数を返す (すべて失敗した場合は例外を送出する)
+    """
+    if isinstance(engine.pool, NullPool):
+        return 0
+    size = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+    connections = min(connections, size)
+    if connections <= 0:
+        return 0
+    # 1つの接続の失敗で他の接続の確立が中断されず、返却漏れも起きないよう、すべての結果を待ってから返却する
+    results = await asyncio.gather(*[engine.connect().start() for _ in range(connections)], return_exceptions=True)
+    conns = [result for result in results if isinstance(result, AsyncConnection)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    try:
+        await asyncio.gather(*[conn.execute(text('SELECT 1')) for conn in conns])
+    finally:
+        await asyncio.gather(*[conn.close() for conn in conns], return_exceptions=True)
+    if errors:
+        if not conns:
+            raise errors[0]
+        logger.warning(f'Warmed up {len(conns)} of {connections} connections: {errors[0]}')
+    return len(conns)
+
+
+class EngineRegistry:
+    """用途ごとの名前付きエンジン (primary / replica / worker など) を管理する
+    エンジンは最初に取得されたときに生成し、dispose() でまとめて破棄する
+    """
+
+    def __init__(self) -> None:
+        self._specs: dict[str, tuple[str, EngineOptions]] = {}
+        self._engines: dict[str, AsyncEngine] = {}
+
+    def register(self, name: str, url: str, options: EngineOptions) -> None:
+        if name in self._engines:
+            raise ValueError(f'Engine already created: {name}')
+        self._specs[name] = (url, options)
+
+    def get(self, name: str) -> AsyncEngine:
+        engine = self._engines.get(name)
+        if engine is None:
+            if name not in self._specs:
+                raise KeyError(f'Engine not registered: {name}')
+            url, options = self._specs[name]
+            engine = self._engines[name] = build_engine(url, options, name)
+            logger.info(
+                f'Created engine {name}: pool_size={options.pool_size} max_overflow={options.max_overflow} '
+                f'pooler_mode={options.pooler_mode}'
+            )
+        return engine
+
+    def names(self, prefix: str = '') -> list[str]:
+        return [name for name in self._specs if name.startswith(prefix)]
+
+    async def dispose(self) -> None:
+        """生成済みのエンジンの接続をすべて閉じる
+        エンジン自体は保持したままのため (セッションファクトリが参照している)、再度使用した場合は新しい接続を確立する
+        """
+        for name, engine in self._engines.items():
+            await engine.dispose()
+            logger.info(f'Disposed engine {name}')
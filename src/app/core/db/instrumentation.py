@@ -0,0 +1,73 @@
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from src.app.core.metrics import current_route, metrics
+
+POOL_CHECKOUT_WAIT = metrics.histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a connection from the pool')
+POOL_CONNECTION_HOLD = metrics.histogram(
+    'db_pool_connection_hold_seconds', 'Time a connection was checked out, by route', buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+POOL_CHECKED_OUT = metrics.gauge('db_pool_checked_out', 'Connections currently checked out of the pool')
+POOL_OVERFLOW = metrics.gauge('db_pool_overflow', 'Connections currently open beyond pool_size')
+POOL_TIMEOUTS = metrics.counter('db_pool_timeouts_total', 'Checkouts that failed with a pool timeout')
+POOL_CONNECTS = metrics.counter('db_pool_connects_total', 'New DBAPI connections opened by the pool')
+POOL_INVALIDATIONS = metrics.counter('db_pool_invalidations_total', 'Connections invalidated (e.g. failed pre-ping)')
+
+
+def _engine_name(pool: Pool) -> str:
+    return getattr(pool, 'logging_name', None) or 'default'
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """接続の取得待ち時間とタイムアウト回数を記録するプール
+    エンジン名には create_async_engine の pool_logging_name を使用する
+    """
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=_engine_name(self))
+            raise
+        POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, engine=_engine_name(self))
+        return connection
+
+
+def _update_pool_gauges(pool: Pool, name: str, returning: int = 0) -> None:
+    # checkin イベントは接続がプールに戻される前に発行されるため、戻される接続数 (returning) を差し引く
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        POOL_CHECKED_OUT.set(pool.checkedout() - returning, engine=name)
+        POOL_OVERFLOW.set(max(pool.overflow(), 0), engine=name)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """プールのイベントを購読し、接続数・保持時間 (ルート別)・接続/無効化の回数を記録する"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'connect')
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        POOL_CONNECTS.inc(engine=name)
+
+    @event.listens_for(sync_engine, 'checkout')
+    def on_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        connection_record.info['checked_out_route'] = current_route()
+        _update_pool_gauges(sync_engine.pool, name)
+
+    @event.listens_for(sync_engine, 'checkin')
+    def on_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        route = connection_record.info.pop('checked_out_route', '-')
+        if checked_out_at is not None:
+            POOL_CONNECTION_HOLD.observe(time.perf_counter() - checked_out_at, engine=name, route=route)
+        _update_pool_gauges(sync_engine.pool, name, returning=1)
+
+    @event.listens_for(sync_engine, 'invalidate')
+    def on_invalidate(dbapi_connection: Any, connection_record: Any, exception: BaseException | None) -> None:
+        POOL_INVALIDATIONS.inc(engine=name)
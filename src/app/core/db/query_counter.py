@@ -0,0 +1,100 @@
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.utils.logger import get_logger
+
+from .slow_query import SLOW_QUERY_LOG_SKIP_OPTION
+from .statements import fingerprint, normalize_statement
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class QueryCounter:
+    """計測中に実行されたSQL文を記録する"""
+
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def fingerprints(self) -> Counter[str]:
+        return Counter(fingerprint(statement) for statement in self.statements)
+
+    def repeated(self, times: int) -> dict[str, int]:
+        """times 回以上実行された同じ形のクエリのフィンガープリントと実行回数 (N+1 の検出用)"""
+        return {key: count for key, count in self.fingerprints().items() if count >= times}
+
+    def summary(self) -> str:
+        """フィンガープリントごとの実行回数と正規化したSQL文 (多い順)"""
+        normalized = {fingerprint(statement): normalize_statement(statement) for statement in self.statements}
+        return '\n'.join(f'  {count}x {key}: {normalized[key]}' for key, count in self.fingerprints().most_common())
+
+
+_active_counters: ContextVar[tuple[QueryCounter, ...]] = ContextVar('query_counters', default=())
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _record_statement(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    counters = _active_counters.get()
+    # スロークエリログの EXPLAIN など、計測対象外として実行されたクエリは数えない
+    if not counters or context.execution_options.get(SLOW_QUERY_LOG_SKIP_OPTION, False):
+        return
+    for counter in counters:
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """ブロック内 (同じタスク内) で実行されたクエリを数える。入れ子にした場合は外側でも数える"""
+    counter = QueryCounter()
+    token = _active_counters.set((*_active_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _active_counters.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, max_repeats: int | None = None) -> Iterator[QueryCounter]:
+    """ブロック内のクエリ数が max_queries 以下であること、同じ形のクエリが max_repeats 回を超えないことを検証する"""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise AssertionError(f'Expected at most {max_queries} queries, got {counter.count}:\n{counter.summary()}')
+    if max_repeats is not None:
+        repeated = counter.repeated(max_repeats + 1)
+        if repeated:
+            raise AssertionError(f'Same query repeated more than {max_repeats} times: {repeated}\n{counter.summary()}')
+
+
+class QueryCountMiddleware:
+    """開発用: リクエストごとのクエリ数を数え、max_queries を超えた場合や
+    同じ形のクエリが max_repeats 回以上実行された場合 (N+1 の疑い) にフィンガープリントとともに警告を出力するミドルウェア
+    """
+
+    def __init__(self, app: ASGIApp, max_queries: int = 20, max_repeats: int = 5):
+        self.app = app
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        with count_queries() as counter:
+            await self.app(scope, receive, send)
+
+        repeated = counter.repeated(self.max_repeats)
+        if counter.count > self.max_queries or repeated:
+            route = getattr(scope.get('route'), 'path', scope['path'])
+            logger.warning(f'{scope["method"]} {route} executed {counter.count} queries (repeated: {repeated}):\n{counter.summary()}')
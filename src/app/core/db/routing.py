@@ -0,0 +1,48 @@
+import random
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+# session.info に保存する、プライマリ固定済みかどうかのキー
+PIN_PRIMARY_KEY = 'pin_primary'
+
+
+class RoutingSession(Session):
+    """読み取り専用のSELECTをリードレプリカに、それ以外をプライマリに振り分けるセッション
+
+    - INSERT/UPDATE/DELETE の実行や flush が行われた時点で、以降のクエリはすべてプライマリに固定する (read-your-writes)
+    - FOR UPDATE 付きのSELECTは常にプライマリで実行する
+    - レプリカはセッション生成時に1つ選び、同一セッション内では同じレプリカを使い続ける
+    AsyncSession から使用する場合は sync_session_class=RoutingSession とし、同期エンジン (AsyncEngine.sync_engine) を渡す
+    """
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine] = (), bind: Any = None, **kwargs: Any):
+        # AsyncSession から渡される bind (None) は使用せず、常にプライマリを既定の接続先とする
+        super().__init__(bind=primary, **kwargs)
+        self._primary = primary
+        self._replica = random.choice(replicas) if replicas else None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine | Connection:
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[PIN_PRIMARY_KEY] = True
+            return self._primary
+        if (
+            self._replica is not None
+            and not self.info.get(PIN_PRIMARY_KEY)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return self._replica
+        return self._primary
+
+
+def pin_primary(session: Session | AsyncSession) -> None:
+    """以降のクエリをすべてプライマリで実行するようにセッションを固定する
+    読み取った値をもとに更新する場合など、レプリカの遅延を許容できない処理の前に呼び出す
+    """
+    session.info[PIN_PRIMARY_KEY] = True
@@ -0,0 +1,133 @@
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.app.core.metrics import metrics
+from src.utils.logger import get_logger
+
+from .statements import find_caller, fingerprint, normalize_statement, parameters_shape
+
+logger = get_logger(__name__)
+
+SLOW_QUERIES = metrics.counter('db_slow_queries_total', 'Queries slower than the slow-query threshold, by caller')
+
+# このオプションを True にした接続・ステートメントはスロークエリログの対象外にする (EXPLAIN 自体の記録を防ぐ)
+SLOW_QUERY_LOG_SKIP_OPTION = 'slow_query_log_skip'
+
+# エンジン名ごとのスロークエリログ
+slow_query_logs: dict[str, 'SlowQueryLog'] = {}
+
+
+@dataclass
+class SlowQueryRecord:
+    engine: str
+    fingerprint: str
+    statement: str
+    parameters: Any
+    duration_ms: float
+    rowcount: int
+    caller: str | None
+    plan: str | None = field(default=None)
+
+
+class SlowQueryLog:
+    """閾値を超えたクエリをログに記録し、一部を別接続で EXPLAIN してプランを添付する
+
+    SELECT は EXPLAIN (ANALYZE, BUFFERS)、それ以外は実行されないよう EXPLAIN のみを行う。
+    EXPLAIN は別タスク・別接続で実行するため、元のリクエストの応答は待たせない
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        name: str,
+        threshold_ms: float,
+        explain_sample_rate: float = 0.0,
+        explain_timeout_ms: int = 5000,
+        history_size: int = 100,
+    ):
+        self.engine = engine
+        self.name = name
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.records: deque[SlowQueryRecord] = deque(maxlen=history_size)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def install(self) -> 'SlowQueryLog':
+        event.listen(self.engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(self.engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        return self
+
+    def _before_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        start = getattr(context, '_slow_query_start', None)
+        if start is None:
+            return
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms < self.threshold_ms or context.execution_options.get(SLOW_QUERY_LOG_SKIP_OPTION, False):
+            return
+
+        record = SlowQueryRecord(
+            engine=self.name,
+            fingerprint=fingerprint(statement),
+            statement=normalize_statement(statement),
+            parameters=parameters_shape(parameters, executemany),
+            duration_ms=round(duration_ms, 3),
+            rowcount=cursor.rowcount,
+            caller=find_caller(),
+        )
+        self.records.append(record)
+        SLOW_QUERIES.inc(engine=self.name, caller=record.caller or '-')
+        logger.warning(f'Slow query: {record}')
+
+        if not executemany and random.random() < self.explain_sample_rate:
+            self._schedule_explain(record, statement, parameters)
+
+    def _schedule_explain(self, record: SlowQueryRecord, statement: str, parameters: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(record, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, record: SlowQueryRecord, statement: str, parameters: Any) -> None:
+        analyze = statement.lstrip().upper().startswith('SELECT')
+        explain = f'EXPLAIN (ANALYZE, BUFFERS) {statement}' if analyze else f'EXPLAIN {statement}'
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(**{SLOW_QUERY_LOG_SKIP_OPTION: True})
+                # EXPLAIN ANALYZE はクエリを実際に実行するため、タイムアウトを設定してトランザクションごと破棄する
+                async with conn.begin() as transaction:
+                    await conn.execute(text(f'SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}'))
+                    result = await conn.exec_driver_sql(explain, parameters)
+                    record.plan = '\n'.join(row[0] for row in result)
+                    await transaction.rollback()
+        except Exception as e:
+            logger.warning(f'Failed to explain slow query {record.fingerprint}: {e}')
+            return
+        logger.warning(f'Slow query plan {record.fingerprint} ({record.caller}):\n{record.plan}')
+
+    async def wait_explains(self) -> None:
+        """実行中の EXPLAIN の完了を待つ (終了処理・テスト用)"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def install_slow_query_log(
+    engine: AsyncEngine, name: str, threshold_ms: float, explain_sample_rate: float = 0.0, explain_timeout_ms: int = 5000
+) -> SlowQueryLog:
+    """エンジンにスロークエリログを設定する (設定したログは slow_query_logs からエンジン名で参照できる)"""
+    slow_query_log = SlowQueryLog(engine, name, threshold_ms, explain_sample_rate, explain_timeout_ms).install()
+    slow_query_logs[name] = slow_query_log
+    return slow_query_log
@@ -0,0 +1,75 @@
+import hashlib
+import re
+import sys
+from collections.abc import Sequence
+from types import FrameType
+from typing import Any
+
+import greenlet
+
+# クエリの呼び出し元として扱うモジュール (CRUDクラスとリポジトリ実装)
+CALLER_MODULE_PREFIXES = ('src.app.crud', 'src.app.infrastructures')
+
+_NORMALIZE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),  # 文字列リテラル
+    (re.compile(r'\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?'), '?'),  # バインドパラメータ
+    (re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b'), '?'),  # 数値リテラル
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),  # IN (?, ?, ...) / VALUES (?, ?, ...)
+    (re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+'), '(...)'),  # 複数行の VALUES
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_statement(statement: str) -> str:
+    """リテラルやパラメータ、IN句の要素数の違いを取り除いたSQL文を返す"""
+    normalized = statement
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip()
+
+
+def fingerprint(statement: str) -> str:
+    """同じ形のクエリで同一になるフィンガープリント (正規化したSQL文のハッシュ) を返す"""
+    return hashlib.sha1(normalize_statement(statement).encode()).hexdigest()[:16]
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, list | tuple):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> Any:
+    """パラメータの値は含めず、型と件数のみを返す (ログに個人情報を残さないため)"""
+    if executemany and isinstance(parameters, Sequence) and parameters:
+        return {'rows': len(parameters), 'row': parameters_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+def _caller_from_frame(frame: FrameType | None, prefixes: Sequence[str]) -> str | None:
+    while frame is not None:
+        # 共通処理をまとめた非公開メソッド (_find_one など) は呼び出し元の公開メソッドを記録する
+        if frame.f_globals.get('__name__', '').startswith(tuple(prefixes)) and not frame.f_code.co_name.startswith('_'):
+            instance = frame.f_locals.get('self')
+            if instance is not None:
+                return f'{type(instance).__name__}.{frame.f_code.co_name}'
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+def find_caller(prefixes: Sequence[str] = CALLER_MODULE_PREFIXES) -> str | None:
+    """クエリを発行したCRUDクラス・リポジトリのメソッド名 (例: UserCRUD.read_async) を返す
+    AsyncSession のクエリはSQLAlchemyが生成したグリーンレット内で実行されるため、
+    現在のスタックで見つからない場合は呼び出し元のグリーンレット (コルーチン側) のスタックをたどる
+    """
+    caller = _caller_from_frame(sys._getframe(1), prefixes)
+    current = greenlet.getcurrent().parent
+    while caller is None and current is not None:
+        caller = _caller_from_frame(current.gr_frame, prefixes)
+        current = current.parent
+    return caller
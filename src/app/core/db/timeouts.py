@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.utils.logger import get_logger
+
+from .engine import STATEMENT_TIMEOUT_OPTION
+from .routing import RoutingSession
+
+logger = get_logger(__name__)
+
+# PostgreSQL の query_canceled (statement_timeout 超過・キャンセル要求)
+QUERY_CANCELED_SQLSTATE = '57014'
+# クライアントの切断を確認する間隔 (秒)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class DBTimeBudget:
+    """リクエスト内のDB処理に使用できる残り時間"""
+
+    def __init__(self, timeout_ms: int):
+        self.timeout_ms = timeout_ms
+        self.deadline = time.monotonic() + timeout_ms / 1000
+
+    def remaining_ms(self) -> int:
+        # 期限切れの場合も最小値の 1ms を返し、次のステートメントを即座にタイムアウトさせる
+        return max(1, int((self.deadline - time.monotonic()) * 1000))
+
+
+_current_budget: ContextVar[DBTimeBudget | None] = ContextVar('db_time_budget', default=None)
+
+
+def current_db_time_budget() -> DBTimeBudget | None:
+    return _current_budget.get()
+
+
+@contextmanager
+def db_time_budget_scope(timeout_ms: int) -> Iterator[DBTimeBudget]:
+    """このスコープ内で開始したトランザクションに、残り時間を statement_timeout として設定する"""
+    budget = DBTimeBudget(timeout_ms)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _apply_statement_timeout(session: Session, transaction: Any, connection: Any) -> None:
+    budget = _current_budget.get()
+    if budget is None or connection.dialect.name != 'postgresql':
+        return
+    remaining_ms = budget.remaining_ms()
+    # 接続時に設定済みの statement_timeout (DB_STATEMENT_TIMEOUT_MS) 以下にする必要がない場合は往復を省く
+    baseline_ms = connection.get_execution_options().get(STATEMENT_TIMEOUT_OPTION, 0)
+    if 0 < baseline_ms <= remaining_ms:
+        return
+    # SET LOCAL はトランザクション終了時に元に戻るため、プールに返却された接続には影響しない
+    connection.exec_driver_sql(f'SET LOCAL statement_timeout = {remaining_ms}')
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    """statement_timeout の超過またはキャンセル要求によって中断されたクエリの例外かどうか"""
+    if not isinstance(exc, DBAPIError):
+        return False
+    orig = exc.orig
+    sqlstate = getattr(orig, 'sqlstate', None) or getattr(orig, 'pgcode', None)
+    if sqlstate is None:
+        sqlstate = getattr(getattr(orig, '__cause__', None), 'sqlstate', None)
+    return sqlstate == QUERY_CANCELED_SQLSTATE
+
+
+async def _cancel_on_disconnect(request: Request, task: asyncio.Task[Any]) -> None:
+    while True:
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+        if await request.is_disconnected():
+            logger.info(f'Client disconnected, cancelling request: {request.url.path}')
+            # 実行中のクエリは asyncpg がサーバー側にキャンセルを要求し、セッションの終了処理で接続がプールに返却される
+            # DataLoader のバッチ取得は別タスクのため、ローダーの依存性の終了処理 (close()) がセッションを閉じる前にキャンセルする
+            task.cancel()
+            return
+
+
+def db_time_budget(
+    timeout_ms: int, cancel_on_disconnect: bool = False
+) -> Callable[[Request], AsyncGenerator[DBTimeBudget | None, None]]:
+    """ルート (またはルーター) 単位でDB処理の時間予算を設定する依存性を生成する
+
+    router = APIRouter(dependencies=[Depends(db_time_budget(3000))]) のように使用する。
+    - 予算の残り時間が接続時の statement_timeout より短い場合のみ、トランザクションごとに statement_timeout として設定する
+    - 超過したクエリは 503 を返す。timeout_ms が 0 以下の場合は何もしない
+    - cancel_on_disconnect=True の場合は、クライアントが切断した時点でリクエストの処理と実行中のクエリをキャンセルする
+      (切断の確認のため DISCONNECT_POLL_INTERVAL ごとにポーリングするため、長時間のクエリを実行するルートのみで有効にする)
+    """
+
+    async def disabled() -> AsyncGenerator[DBTimeBudget | None, None]:
+        yield None
+
+    if timeout_ms <= 0:
+        return disabled
+
+    async def dependency(request: Request) -> AsyncGenerator[DBTimeBudget | None, None]:
+        task = asyncio.current_task()
+        watcher = None
+        if cancel_on_disconnect and task is not None:
+            watcher = asyncio.create_task(_cancel_on_disconnect(request, task))
+        try:
+            with db_time_budget_scope(timeout_ms) as budget:
+                yield budget
+        except DBAPIError as e:
+            if is_statement_timeout(e):
+                logger.warning(f'Database time budget exceeded ({timeout_ms}ms): {request.url.path}')
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail='Database time budget exceeded',
+                ) from e
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+                with suppress(asyncio.CancelledError):
+                    await watcher
+
+    return dependency
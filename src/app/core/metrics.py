@@ -0,0 +1,181 @@
+import bisect
+import threading
+from collections.abc import Iterator, Sequence
+from contextvars import ContextVar
+from typing import Any
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LabelKey = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: dict[str, str] | None = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    body = ','.join(f'{name}="{value}"' for name, value in pairs)
+    return f'{{{body}}}'
+
+
+class Metric:
+    """ラベルごとの値を保持するメトリクスの基底クラス"""
+
+    type_name = ''
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} {self.type_name}'
+        yield from self._render_samples()
+
+    def _render_samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """単調増加するカウンター"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def _render_samples(self) -> Iterator[str]:
+        # 出力中に他のスレッドから更新されても辞書の反復が壊れないよう、ロック内で複製してから出力する
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(key)} {value}'
+
+
+class Gauge(Counter):
+    """増減する現在値"""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """値の分布 (累積バケット・合計・件数)"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelKey, list[int]] = {}
+        self._sums: dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] = self._sums.get(key, 0) + value
+
+    def count(self, **labels: Any) -> int:
+        return sum(self._counts.get(_label_key(labels), []))
+
+    def sum(self, **labels: Any) -> float:
+        return self._sums.get(_label_key(labels), 0)
+
+    def _render_samples(self) -> Iterator[str]:
+        # バケット・合計・件数が同じ時点の値になるよう、ロック内でまとめて複製してから出力する
+        with self._lock:
+            samples = [(key, list(counts), self._sums[key]) for key, counts in sorted(self._counts.items())]
+        for key, counts, total in samples:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{_format_labels(key, {"le": str(bound)})} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(key)} {total}'
+            yield f'{self.name}_count{_format_labels(key)} {cumulative}'
+
+
+class MetricsRegistry:
+    """アプリケーション内のメトリクスを名前で管理し、Prometheusのテキスト形式で出力する"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[Metric], name: str, description: str, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f'Metric {name} is already registered as {metric.type_name}')
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            registered = list(self._metrics.values())
+        lines = [line for metric in registered for line in metric.render()]
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+# 実行中のリクエストのASGIスコープ (ルーティング後に scope['route'] が設定される)
+_current_scope: ContextVar[Scope | None] = ContextVar('current_scope', default=None)
+
+
+def current_route() -> str:
+    """実行中のリクエストのルート (パステンプレート) を返す。リクエスト外の場合は '-'"""
+    scope = _current_scope.get()
+    if scope is None:
+        return '-'
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+
+class RouteContextMiddleware:
+    """メトリクスをルート単位で集計できるよう、リクエストのスコープをコンテキスト変数に保持するミドルウェア"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
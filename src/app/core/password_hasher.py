@@ -0,0 +1,174 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+import bcrypt
+
+from src.app.core.admission import AdmissionController
+from src.app.core.config import settings
+from src.app.core.metrics import metrics
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+PASSWORD_HASH_QUEUE_DEPTH = metrics.gauge('password_hash_queue_depth', 'Password hash operations waiting for an executor thread')
+PASSWORD_HASH_WAIT = metrics.histogram('password_hash_wait_seconds', 'Time a password hash operation waited for an executor thread')
+PASSWORD_HASH_DURATION = metrics.histogram('password_hash_duration_seconds', 'Time spent computing a password hash')
+
+# bcrypt.gensalt() のデフォルトのコスト
+DEFAULT_BCRYPT_ROUNDS = 12
+# キャリブレーション時の計測回数 (中央値を使う)
+CALIBRATION_SAMPLES = 5
+
+
+def bcrypt_rounds(hashed_password: str) -> int | None:
+    """bcrypt のハッシュ ($2b$12$...) からコストを取り出す。bcrypt の形式でない場合はNone"""
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def rounds_for_target(measured_ms: float, measured_rounds: int, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+    """計測したハッシュ時間から、目標時間以内に収まる最大のコストを min_rounds 〜 max_rounds の範囲で返す
+    bcrypt の計算量はコストが1増えるごとに2倍になる
+    """
+    rounds = min_rounds
+    while rounds < max_rounds and measured_ms * 2 ** (rounds + 1 - measured_rounds) <= target_ms:
+        rounds += 1
+    return rounds
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int, max_rounds: int, samples: int = CALIBRATION_SAMPLES) -> int:
+    """現在のマシンで min_rounds のハッシュ時間を samples 回計測し、中央値から目標時間に合うコストを返す (ブロッキング)"""
+    salt = bcrypt.gensalt(min_rounds)
+    bcrypt.hashpw(b'calibration', salt)  # ウォームアップ
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b'calibration', salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return rounds_for_target(statistics.median(timings), min_rounds, target_ms, min_rounds, max_rounds)
+
+
+class PasswordHasher:
+    """bcrypt のハッシュ化・検証を専用のスレッドプールで実行し、イベントループをブロックしないようにする
+    bcrypt はハッシュ計算中にGILを解放するため、スレッドでもCPUコア数まで並列に実行できる。
+    プールのサイズで同時に実行するハッシュ計算の数を制限し、待ち行列の長さと待ち時間をメトリクスに記録する。
+    admission を指定した場合は、スレッドプールに投入する前にアドミッション制御を行い、
+    上限を超えた操作は bcrypt を実行せずに AdmissionRejectedError で拒否する
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        admission: AdmissionController | None = None,
+        rounds: int = DEFAULT_BCRYPT_ROUNDS,
+        min_rounds: int = DEFAULT_BCRYPT_ROUNDS,
+        max_rounds: int = DEFAULT_BCRYPT_ROUNDS,
+    ):
+        self.max_workers = max_workers
+        self.admission = admission
+        self.min_rounds = min(min_rounds, rounds)
+        self.max_rounds = max(max_rounds, rounds)
+        self.rounds = rounds
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """スレッドの空きを待っている操作の数"""
+        return self._queued
+
+    def _dequeue(self, operation: str) -> None:
+        with self._lock:
+            self._queued -= 1
+        PASSWORD_HASH_QUEUE_DEPTH.dec(operation=operation)
+
+    async def _run(self, operation: str, func: Callable[..., T], *args: bytes) -> T:
+        if self.admission is None:
+            return await self._submit(operation, func, *args)
+        async with self.admission.admit():
+            return await self._submit(operation, func, *args)
+
+    async def _submit(self, operation: str, func: Callable[..., T], *args: bytes) -> T:
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+        PASSWORD_HASH_QUEUE_DEPTH.inc(operation=operation)
+
+        def task() -> T:
+            started = time.perf_counter()
+            self._dequeue(operation)
+            PASSWORD_HASH_WAIT.observe(started - submitted, operation=operation)
+            try:
+                return func(*args)
+            finally:
+                PASSWORD_HASH_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+        def on_done(future: Future[T]) -> None:
+            # 開始前にキャンセルされた場合は task が実行されないため、ここで待ち行列から外す
+            if future.cancelled():
+                self._dequeue(operation)
+
+        future = self._get_executor().submit(task)
+        future.add_done_callback(on_done)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        """平文パスワードをハッシュ化する"""
+        hashed_password = await self._run('hash', bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed_password.decode('utf-8')
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """保存されているハッシュのコストがポリシーの範囲 (min_rounds〜max_rounds) 外かどうか
+        範囲内であれば rounds と異なっていても再ハッシュしない (ワーカーごとにコストが異なる場合に再ハッシュを繰り返さないため)
+        """
+        rounds = bcrypt_rounds(hashed_password)
+        return rounds is None or not self.min_rounds <= rounds <= self.max_rounds
+
+    async def calibrate(self, target_ms: float) -> int:
+        """現在のマシンで目標時間に合うコストを min_rounds〜max_rounds の範囲で計測して設定する (アドミッション制御の対象外)"""
+        rounds = await asyncio.wrap_future(self._get_executor().submit(calibrate_rounds, target_ms, self.min_rounds, self.max_rounds))
+        if rounds != self.rounds:
+            logger.info(f'Calibrated bcrypt rounds: {self.rounds} -> {rounds} (target {target_ms}ms)')
+        self.rounds = rounds
+        return rounds
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """平文パスワードがハッシュ化されたパスワードと一致するかを検証する"""
+        return await self._run('verify', bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def shutdown(self) -> None:
+        """スレッドプールを終了する (次の呼び出し時に再生成される)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    admission=AdmissionController(
+        'password_hash',
+        max_concurrent=settings.PASSWORD_HASH_MAX_CONCURRENT,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+        queue_timeout_ms=settings.PASSWORD_HASH_QUEUE_TIMEOUT_MS,
+    ),
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+    min_rounds=settings.PASSWORD_HASH_MIN_ROUNDS,
+    max_rounds=settings.PASSWORD_HASH_MAX_ROUNDS,
+)
@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import suppress
+
+import httpx
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+
+from src.app.core.config import settings
+from src.app.core.db.database import PRIMARY_ENGINE, REPLICA_ENGINE_PREFIX, engines
+from src.app.core.db.engine import warm_up
+from src.app.core.password_hasher import password_hasher
+from src.app.services.google_certs_service import google_certs_request
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AppResources:
+    """アプリケーション全体で共有するクライアントと起動時のウォームアップを管理する
+    main.py の lifespan から startup() / shutdown() を呼び出す
+    """
+
+    def __init__(self) -> None:
+        self.http_client: httpx.AsyncClient | None = None
+        self.redis: Redis | None = None
+        self.sync_redis: SyncRedis | None = None
+        self.ready = False
+        self._warm_up_retry: asyncio.Task[None] | None = None
+
+    def get_http_client(self) -> httpx.AsyncClient:
+        # lifespan を経由しない場合 (テストなど) は最初の使用時に生成する
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient()
+        return self.http_client
+
+    def get_redis(self) -> Redis:
+        if self.redis is None:
+            self.redis = Redis.from_url(
+                settings.redis_uri,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+        return self.redis
+
+    def get_sync_redis(self) -> SyncRedis:
+        """同期的な処理 (同期セッションのCRUDなど) から使用するRedisクライアント"""
+        if self.sync_redis is None:
+            self.sync_redis = SyncRedis.from_url(
+                settings.redis_uri,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+        return self.sync_redis
+
+    async def startup(self) -> None:
+        """共有クライアントを生成し、DB接続・Redis接続・Googleの証明書を事前に準備する
+        DBのウォームアップが完了した時点でレディネスを有効にする (Redis・証明書の失敗は警告のみ)。
+        ウォームアップに失敗したエンジンはバックグラウンドで再試行し、すべて成功した時点でレディネスを有効にする
+        PASSWORD_HASH_CALIBRATE が有効な場合は、他の処理と計測が重ならないよう最後に bcrypt のコストをキャリブレーションする
+        """
+        http_client = self.get_http_client()
+        redis = self.get_redis()
+        web_engines = [PRIMARY_ENGINE, *engines.names(REPLICA_ENGINE_PREFIX)]
+        results = await asyncio.gather(
+            *[warm_up(engines.get(name), settings.DB_POOL_WARMUP) for name in web_engines],
+            redis.ping(),
+            google_certs_request.preload(http_client),
+            return_exceptions=True,
+        )
+        db_results, (redis_result, certs_result) = results[: len(web_engines)], results[len(web_engines) :]
+        failed = self._log_warm_up(web_engines, db_results)
+        if isinstance(redis_result, BaseException):
+            logger.warning(f'Failed to connect to Redis: {redis_result}')
+        if isinstance(certs_result, BaseException):
+            logger.warning(f'Failed to preload Google certificates: {certs_result}')
+        if settings.PASSWORD_HASH_CALIBRATE:
+            await password_hasher.calibrate(settings.PASSWORD_HASH_TARGET_MS)
+        self.ready = not failed
+        if failed:
+            self._warm_up_retry = asyncio.create_task(self._retry_warm_up(failed))
+
+    @staticmethod
+    def _log_warm_up(names: list[str], results: list[int | BaseException]) -> list[str]:
+        """ウォームアップの結果をログに出力し、失敗したエンジン名を返す"""
+        failed = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error(f'Failed to warm up engine {name}: {result}')
+                failed.append(name)
+            else:
+                logger.info(f'Warmed up {result} connections for engine {name}')
+        return failed
+
+    async def _retry_warm_up(self, names: list[str]) -> None:
+        """DBに一時的に接続できなかった場合に、再起動を待たずにレディネスを有効にできるよう再試行する"""
+        while names:
+            await asyncio.sleep(settings.DB_WARMUP_RETRY_INTERVAL)
+            results = await asyncio.gather(
+                *[warm_up(engines.get(name), settings.DB_POOL_WARMUP) for name in names], return_exceptions=True
+            )
+            names = self._log_warm_up(names, results)
+        self.ready = True
+        logger.info('All engines warmed up, marking the application as ready')
+
+    async def shutdown(self) -> None:
+        """レディネスを無効にし、共有クライアントとエンジンをすべて閉じる"""
+        self.ready = False
+        if self._warm_up_retry is not None:
+            self._warm_up_retry.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._warm_up_retry
+            self._warm_up_retry = None
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+        if self.sync_redis is not None:
+            self.sync_redis.close()
+            self.sync_redis = None
+        await google_certs_request.close()
+        await engines.dispose()
+        password_hasher.shutdown()
+
+
+resources = AppResources()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """共有の httpx.AsyncClient を返す依存性 (接続プールを再利用し、TLSハンドシェイクを省く)"""
+    return resources.get_http_client()
@@ -1,19 +1,33 @@
 import abc
+import base64
+import dataclasses
+import json
+from collections.abc import AsyncIterator, Iterator, Mapping, Sequence
 from typing import Any, Generic, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_jsonable_python
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import select
+from sqlalchemy.sql import any_, bindparam, column, delete, insert, select, table, tuple_, update
 
+from src.app.core.db.engine import uses_transaction_pooler
 from src.app.models.base_model import Base
+from src.app.schemas.global_schemas import CursorPage
 from src.utils.logger import get_logger
 
+from .converters import get_converter
+
 logger = get_logger(__name__)
 
 T = TypeVar('T')  # 入力型
 U = TypeVar('U')  # 出力型
 
+# 件数推定に使用するPostgreSQLのシステムカタログ
+_pg_class = table('pg_class', column('oid'), column('reltuples'))
+
 
 class CRUDException(Exception):
     pass
@@ -81,31 +95,49 @@ class CRUDInterface(abc.ABC, Generic[T, U]):
         """非同期的にデータを削除"""
         ...
 
-    def _model_to_dict(self, obj_in: T) -> dict[str, Any]:
-        """pydanticモデルを辞書に変換"""
+    def _model_to_dict(self, obj_in: T, exclude_unset: bool = False) -> dict[str, Any]:
+        """pydanticモデルを辞書に変換
+        exclude_unset=True の場合は明示的に設定されたフィールドのみを含める (部分更新用)
+        """
         if isinstance(obj_in, dict):
             return obj_in
 
         if isinstance(obj_in, BaseModel):
-            return obj_in.model_dump()
+            return obj_in.model_dump(exclude_unset=exclude_unset)
         raise CRUDException(f'Unsupported type: {type(obj_in)}')
 
 
 class SQLAlchemyCRUD(CRUDInterface[T, U], abc.ABC, Generic[T, U]):
     """SQLAlchemyを使用したCRUD操作の抽象クラス"""
 
+    # 一括INSERT時の1ステートメントあたりの最大行数
+    DEFAULT_CHUNK_SIZE = 1000
+    # PostgreSQL(asyncpg)の1ステートメントあたりのバインドパラメータ上限
+    MAX_BIND_PARAMS = 32767
+    # キーセットページネーションの1ページあたりのデフォルト件数
+    DEFAULT_PAGE_SIZE = 100
+    # ストリーミング取得時にDBから1回に取り出すデフォルト行数
+    DEFAULT_YIELD_PER = 1000
+    # 推定件数がこの値未満の場合は COUNT(*) で正確な件数を返す (小さなテーブルでは推定値の誤差が大きいため)
+    EXACT_COUNT_THRESHOLD = 10000
+
     def __init__(
         self,
         db_session: Session | AsyncSession,
         db_model: type[T],
         output_model: type[U],
+        output_aliases: Mapping[str, str] | None = None,
     ):
         """:param db_session: SQLAlchemyのセッション (同期または非同期)
         :param model: 操作対象のSQLAlchemyモデル
+        :param output_aliases: 列名と異なる名前の出力フィールドの対応 ({フィールド名: 列名})
         """
         self.db_session = db_session
         self.db_model = db_model
         self.output_model = output_model
+        self._converter = get_converter(db_model, output_model, output_aliases)
+        # 出力モデルのフィールドのうちテーブルの列に対応するもの (SELECT/RETURNING 句に使用)
+        self._output_column_names = list(self._converter.column_names)
 
     def _prepare_data(self, obj_in: T) -> dict[str, Any]:
         """データ作成時にカスタム処理を適用できるメソッド
@@ -113,15 +145,137 @@ class SQLAlchemyCRUD(CRUDInterface[T, U], abc.ABC, Generic[T, U]):
         """
         return self._model_to_dict(obj_in)
 
-    def _convert_to_pydantic_model(self, obj: Base) -> U:
-        """SQLAlchemyモデルをPydanticモデルに変換"""
-        data = {}
+    def _fill_defaults(self, data: dict[str, Any]) -> dict[str, Any]:
+        """dataclassのdefault/default_factoryを補完する
+        Core の INSERT ではモデルの __init__ を経由しないため、一括作成時はここで補完する
+        """
+        columns = self.db_model.__table__.columns
+        row = dict(data)
+        for field in dataclasses.fields(self.db_model):
+            if field.name in row or field.name not in columns:
+                continue
+            if field.default is not dataclasses.MISSING:
+                row[field.name] = field.default
+            elif field.default_factory is not dataclasses.MISSING:
+                row[field.name] = field.default_factory()
+        return row
+
+    def _insert_many_statement(self, chunk_size: int | None) -> tuple[Any, int]:
+        """一括作成用の INSERT ... RETURNING ステートメントと1チャンクあたりの行数を返す
+        executemany 形式で実行すると、SQLAlchemy の insertmanyvalues により
+        チャンク単位の複数行 VALUES として送信される (コンパイル結果はキャッシュされる)
+        """
+        table = self.db_model.__table__
+        max_rows = max(1, self.MAX_BIND_PARAMS // len(table.columns))
+        size = min(chunk_size or self.DEFAULT_CHUNK_SIZE, max_rows)
+        stmt = (
+            insert(table)
+            .returning(*[table.c[name] for name in self._output_column_names], sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=size)
+        )
+        return stmt, size
+
+    def _order_column(self, order_by: str) -> Any:
+        """並び替えに使用する列を取得"""
+        if order_by not in self.db_model.__table__.columns:
+            raise CRUDException(f'Unknown order_by column: {order_by}')
+        return getattr(self.db_model, order_by)
+
+    def _encode_cursor(self, obj: Any, order_by: str) -> str:
+        """ページの末尾行から次ページ取得用のカーソルを生成"""
+        payload = {'o': order_by, 'v': to_jsonable_python(getattr(obj, order_by)), 'id': obj.id}
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor: str, order_by: str) -> tuple[Any, int]:
+        """カーソルを (並び替え列の値, ID) に復元"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            cursor_order_by, value, last_id = payload['o'], payload['v'], int(payload['id'])
+        except (ValueError, TypeError, KeyError) as e:
+            raise CRUDException(f'Invalid cursor: {cursor}') from e
+        if cursor_order_by != order_by:
+            raise CRUDException(f'Cursor was issued for order_by={cursor_order_by}, not {order_by}')
+        python_type = self.db_model.__table__.columns[order_by].type.python_type
+        return TypeAdapter(python_type).validate_python(value), last_id
+
+    def _page_query(self, after: str | None, limit: int, order_by: str, descending: bool, filters: dict[str, Any] | None) -> Any:
+        """キーセットページネーション用のクエリを生成
+        次ページの有無を判定するため limit + 1 件を取得する
+        """
+        if limit < 1:
+            raise CRUDException(f'limit must be positive: {limit}')
+        order_column = self._order_column(order_by)
+        id_column = self.db_model.id
+        query = select(*self._projection('id', order_by))
+        if filters:
+            query = query.filter_by(**filters)
+
+        if order_by == 'id':
+            if after is not None:
+                _, last_id = self._decode_cursor(after, order_by)
+                query = query.where(id_column < last_id if descending else id_column > last_id)
+            order = [id_column.desc() if descending else id_column.asc()]
+        else:
+            if after is not None:
+                key = tuple_(order_column, id_column)
+                bound = self._decode_cursor(after, order_by)
+                query = query.where(key < bound if descending else key > bound)
+            order = [order_column.desc(), id_column.desc()] if descending else [order_column.asc(), id_column.asc()]
+        return query.order_by(*order).limit(limit + 1)
+
+    def _build_page(self, objs: Sequence[Any], limit: int, order_by: str) -> CursorPage[U]:
+        """取得結果からページを組み立てる"""
+        has_next = len(objs) > limit
+        objs = objs[:limit]
+        next_cursor = self._encode_cursor(objs[-1], order_by) if has_next else None
+        return CursorPage(items=self._convert_many(objs), next_cursor=next_cursor)
+
+    def _update_statement(self, id: int, values: dict[str, Any]) -> Any:
+        """指定IDの行を更新し、更新後の行を返す UPDATE ... RETURNING ステートメントを生成"""
+        return update(self.db_model).where(self.db_model.id == id).values(**values).returning(*self._projection())
+
+    def _upsert_statement(
+        self,
+        session: Session | AsyncSession,
+        obj_in: T,
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        update_values: dict[str, Any] | None,
+    ) -> Any:
+        """INSERT ... ON CONFLICT (conflict_cols) DO UPDATE ... RETURNING ステートメントを生成
+        PostgreSQL と SQLite (テスト用) の方言に対応する
+        """
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name == 'postgresql':
+            dialect_insert = postgresql.insert
+        elif dialect_name == 'sqlite':
+            dialect_insert = sqlite.insert
+        else:
+            raise CRUDException(f'Upsert is not supported for dialect: {dialect_name}')
+
+        table = self.db_model.__table__
+        stmt = dialect_insert(table).values(**self._fill_defaults(self._prepare_data(obj_in)))
+        set_ = {name: stmt.excluded[name] for name in update_cols}
+        set_.update(update_values or {})
+        return stmt.on_conflict_do_update(index_elements=list(conflict_cols), set_=set_).returning(
+            *[table.c[name] for name in self._output_column_names]
+        )
+
+    def _projection(self, *extra: str) -> list[Any]:
+        """出力モデルが必要とする列 (と extra で指定した列) のみを返す
+        select(*self._projection()) とすることで、不要な列 (パスワードハッシュやトークン等) を読み込まず、
+        ORMのアイデンティティマップも経由せずに Row から直接 Pydantic モデルを組み立てられる
+        """
+        names = self._output_column_names + [name for name in extra if name not in self._output_column_names]
+        return [getattr(self.db_model, name) for name in names]
 
-        for field in self.output_model.model_fields:
-            value = getattr(obj, field)
-            data[field] = value
+    def _convert_to_pydantic_model(self, obj: Base) -> U:
+        """SQLAlchemyモデル (または射影した Row) をPydanticモデルに変換"""
+        return self._converter.one(obj)
 
-        return self.output_model.model_validate(data)
+    def _convert_many(self, objs: Sequence[Any]) -> list[U]:
+        """複数の行をまとめてPydanticモデルのリストに変換 (検証は1回で行う)"""
+        return self._converter.many(objs)
 
     def _check_sync_session(self) -> Session:
         if not isinstance(self.db_session, Session):
@@ -153,95 +307,335 @@ class SQLAlchemyCRUD(CRUDInterface[T, U], abc.ABC, Generic[T, U]):
         await session.refresh(obj)
         return self._convert_to_pydantic_model(obj)
 
+    def create_many(self, objs_in: Sequence[T], chunk_size: int | None = None) -> list[U]:
+        """同期的にデータを一括作成
+        chunk_size 行ごとの複数行 INSERT ... RETURNING を1トランザクションで実行する
+        """
+        session = self._check_sync_session()
+        if not objs_in:
+            return []
+        rows = [self._fill_defaults(self._prepare_data(obj_in)) for obj_in in objs_in]
+        stmt, size = self._insert_many_statement(chunk_size)
+        results = []
+        try:
+            for i in range(0, len(rows), size):
+                results.extend(session.execute(stmt, rows[i : i + size]).all())
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return self._convert_many(results)
+
+    async def create_many_async(self, objs_in: Sequence[T], chunk_size: int | None = None) -> list[U]:
+        """非同期的にデータを一括作成
+        chunk_size 行ごとの複数行 INSERT ... RETURNING を1トランザクションで実行する
+        """
+        session = self._check_async_session()
+        if not objs_in:
+            return []
+        rows = [self._fill_defaults(self._prepare_data(obj_in)) for obj_in in objs_in]
+        stmt, size = self._insert_many_statement(chunk_size)
+        results = []
+        try:
+            for i in range(0, len(rows), size):
+                result = await session.execute(stmt, rows[i : i + size])
+                results.extend(result.all())
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        return self._convert_many(results)
+
+    def upsert(
+        self,
+        obj_in: T,
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        update_values: dict[str, Any] | None = None,
+    ) -> U:
+        """同期的にデータを作成し、conflict_cols が一意制約に衝突した場合は update_cols を更新
+        update_values には衝突時のみ設定する値 (更新日時など) を指定する
+        """
+        session = self._check_sync_session()
+        result = session.execute(self._upsert_statement(session, obj_in, conflict_cols, update_cols, update_values))
+        row = result.one()
+        session.commit()
+        return self._convert_to_pydantic_model(row)
+
+    async def upsert_async(
+        self,
+        obj_in: T,
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        update_values: dict[str, Any] | None = None,
+    ) -> U:
+        """非同期的にデータを作成し、conflict_cols が一意制約に衝突した場合は update_cols を更新
+        update_values には衝突時のみ設定する値 (更新日時など) を指定する
+        """
+        session = self._check_async_session()
+        result = await session.execute(self._upsert_statement(session, obj_in, conflict_cols, update_cols, update_values))
+        row = result.one()
+        await session.commit()
+        return self._convert_to_pydantic_model(row)
+
     def read(self, id: int) -> U | None:
         """同期的にデータを取得し、Pydanticモデルで返却"""
         session = self._check_sync_session()
-        obj = session.query(self.db_model).filter(self.db_model.id == id).one_or_none()
-        if obj:
-            return self._convert_to_pydantic_model(obj)
+        row = session.execute(select(*self._projection()).where(self.db_model.id == id)).one_or_none()
+        if row:
+            return self._convert_to_pydantic_model(row)
         return None
 
     async def read_async(self, id: int) -> U | None:
         """非同期的にデータを取得し、Pydanticモデルで返却"""
         session = self._check_async_session()
-        result = await session.execute(select(self.db_model).where(self.db_model.id == id))
-        obj = result.scalar_one_or_none()
-        if obj:
-            return self._convert_to_pydantic_model(obj)
+        result = await session.execute(select(*self._projection()).where(self.db_model.id == id))
+        row = result.one_or_none()
+        if row:
+            return self._convert_to_pydantic_model(row)
         return None
 
+    def _read_many_query(self, session: Session | AsyncSession, ids: Sequence[int]) -> Any:
+        """複数IDをまとめて取得するクエリを生成
+        PostgreSQL では配列の単一バインドパラメータで id = ANY(:ids) とし、件数が変わってもSQL文が同一になるようにする
+        """
+        id_column = self.db_model.id
+        if session.get_bind().dialect.name == 'postgresql':
+            condition = id_column == any_(bindparam('ids', list(ids), type_=postgresql.ARRAY(id_column.type)))
+        else:
+            condition = id_column.in_(list(ids))
+        return select(*self._projection()).where(condition)
+
+    def read_many(self, ids: Sequence[int]) -> list[U]:
+        """同期的に複数IDのデータを1クエリで取得 (存在しないIDは結果に含まれず、順序は保証しない)"""
+        if not ids:
+            return []
+        session = self._check_sync_session()
+        rows = session.execute(self._read_many_query(session, ids)).all()
+        return self._convert_many(rows)
+
+    async def read_many_async(self, ids: Sequence[int]) -> list[U]:
+        """非同期的に複数IDのデータを1クエリで取得 (存在しないIDは結果に含まれず、順序は保証しない)"""
+        if not ids:
+            return []
+        session = self._check_async_session()
+        result = await session.execute(self._read_many_query(session, ids))
+        return self._convert_many(result.all())
+
+    def _exists_query(self, **filters) -> Any:
+        """SELECT EXISTS (SELECT id FROM ... WHERE ...) のクエリを生成"""
+        return select(select(self.db_model.id).filter_by(**filters).exists())
+
+    def exists(self, **filters) -> bool:
+        """任意のフィルタ条件に一致するデータが存在するかを確認（同期）
+        行の取得やモデル変換を行わず、EXISTS の真偽値のみを取得する
+        """
+        session = self._check_sync_session()
+        return bool(session.scalar(self._exists_query(**filters)))
+
+    async def exists_async(self, **filters) -> bool:
+        """任意のフィルタ条件に一致するデータが存在するかを確認（非同期）
+        行の取得やモデル変換を行わず、EXISTS の真偽値のみを取得する
+        """
+        session = self._check_async_session()
+        return bool(await session.scalar(self._exists_query(**filters)))
+
+    def _count_query(self, **filters) -> Any:
+        """SELECT count(*) FROM ... WHERE ... のクエリを生成"""
+        return select(func.count()).select_from(self.db_model).filter_by(**filters)
+
+    def count(self, **filters) -> int:
+        """任意のフィルタ条件に一致するデータの件数を取得（同期）"""
+        session = self._check_sync_session()
+        return session.scalar(self._count_query(**filters)) or 0
+
+    async def count_async(self, **filters) -> int:
+        """任意のフィルタ条件に一致するデータの件数を取得（非同期）"""
+        session = self._check_async_session()
+        return await session.scalar(self._count_query(**filters)) or 0
+
+    def _estimated_count_query(self, session: Session | AsyncSession) -> Any | None:
+        """pg_class.reltuples (ANALYZE/VACUUM 時点の推定行数) を取得するクエリを生成
+        PostgreSQL 以外では None を返す
+        """
+        bind = session.get_bind()
+        if bind.dialect.name != 'postgresql':
+            return None
+        table_name = bind.dialect.identifier_preparer.format_table(self.db_model.__table__)
+        return select(cast(_pg_class.c.reltuples, BigInteger)).where(_pg_class.c.oid == func.to_regclass(table_name))
+
+    def estimated_count(self) -> int:
+        """テーブル全体の推定件数を取得（同期）
+        大きなテーブルでも統計情報を読むだけで済む。未ANALYZE の場合や小さなテーブルでは COUNT(*) で正確な件数を返す
+        """
+        session = self._check_sync_session()
+        query = self._estimated_count_query(session)
+        estimate = session.scalar(query) if query is not None else None
+        if estimate is None or estimate < self.EXACT_COUNT_THRESHOLD:
+            return self.count()
+        return estimate
+
+    async def estimated_count_async(self) -> int:
+        """テーブル全体の推定件数を取得（非同期）
+        大きなテーブルでも統計情報を読むだけで済む。未ANALYZE の場合や小さなテーブルでは COUNT(*) で正確な件数を返す
+        """
+        session = self._check_async_session()
+        query = self._estimated_count_query(session)
+        estimate = await session.scalar(query) if query is not None else None
+        if estimate is None or estimate < self.EXACT_COUNT_THRESHOLD:
+            return await self.count_async()
+        return estimate
+
     def read_by_filter(self, **filters) -> list[U]:
         """任意のフィルタ条件でデータを取得（同期）し、Pydanticモデルで返却"""
         session = self._check_sync_session()
-        query = session.query(self.db_model).filter_by(**filters)
-        results = query.all()
-        return [self._convert_to_pydantic_model(obj) for obj in results]
+        query = select(*self._projection()).filter_by(**filters)
+        rows = session.execute(query).all()
+        return self._convert_many(rows)
 
     async def read_by_filter_async(self, **filters) -> list[U]:
         """任意のフィルタ条件でデータを取得（非同期）し、Pydanticモデルで返却"""
         session = self._check_async_session()
-        query = select(self.db_model).filter_by(**filters)
+        query = select(*self._projection()).filter_by(**filters)
         result = await session.execute(query)
-        objs = result.scalars().all()
-        return [self._convert_to_pydantic_model(obj) for obj in objs]
+        rows = result.all()
+        return self._convert_many(rows)
 
     def read_all(self, filters: dict[str, Any] | None = None) -> list[U]:
         """同期的に全データを取得し、Pydanticモデルで返却"""
         session = self._check_sync_session()
-        query = session.query(self.db_model)
+        query = select(*self._projection())
         if filters:
             query = query.filter_by(**filters)
-        results = query.all()
-        return [self._convert_to_pydantic_model(obj) for obj in results]
+        rows = session.execute(query).all()
+        return self._convert_many(rows)
 
     async def read_all_async(self, filters: dict[str, Any] | None = None) -> list[U]:
         """非同期的に全データを取得し、Pydanticモデルで返却"""
         session = self._check_async_session()
-        query = select(self.db_model)
+        query = select(*self._projection())
         if filters:
             query = query.filter_by(**filters)
         result = await session.execute(query)
-        objs = result.scalars().all()
-        return [self._convert_to_pydantic_model(obj) for obj in objs]
+        rows = result.all()
+        return self._convert_many(rows)
+
+    def read_page(
+        self,
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_by: str = 'id',
+        descending: bool = False,
+        filters: dict[str, Any] | None = None,
+    ) -> CursorPage[U]:
+        """同期的にキーセットページネーションでデータを取得
+        after には前ページの next_cursor を渡す。order_by には NULL を含まない列を指定する
+        """
+        session = self._check_sync_session()
+        query = self._page_query(after, limit, order_by, descending, filters)
+        rows = session.execute(query).all()
+        return self._build_page(rows, limit, order_by)
+
+    async def read_page_async(
+        self,
+        after: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        order_by: str = 'id',
+        descending: bool = False,
+        filters: dict[str, Any] | None = None,
+    ) -> CursorPage[U]:
+        """非同期的にキーセットページネーションでデータを取得
+        after には前ページの next_cursor を渡す。order_by には NULL を含まない列を指定する
+        """
+        session = self._check_async_session()
+        query = self._page_query(after, limit, order_by, descending, filters)
+        result = await session.execute(query)
+        rows = result.all()
+        return self._build_page(rows, limit, order_by)
+
+    def stream(self, filters: dict[str, Any] | None = None, yield_per: int = DEFAULT_YIELD_PER) -> Iterator[U]:
+        """同期的にデータを yield_per 行ずつ取得しながら1件ずつ返却
+        テーブル全体をメモリに載せずに走査する
+        """
+        session = self._check_sync_session()
+        query = select(*self._projection())
+        if filters:
+            query = query.filter_by(**filters)
+        result = session.execute(query.execution_options(yield_per=yield_per))
+        try:
+            for partition in result.partitions():
+                yield from self._convert_many(partition)
+        finally:
+            result.close()
+
+    async def stream_async(self, filters: dict[str, Any] | None = None, yield_per: int = DEFAULT_YIELD_PER) -> AsyncIterator[U]:
+        """非同期的にサーバーサイドカーソルで yield_per 行ずつ取得しながら1件ずつ返却
+        テーブル全体をメモリに載せずに走査する
+        PgBouncer のトランザクションプーリングではサーバーサイドカーソルを使用できないため、ID順のキーセットページネーションで取得する
+        """
+        session = self._check_async_session()
+        query = select(*self._projection())
+        if filters:
+            query = query.filter_by(**filters)
+        if uses_transaction_pooler(session.get_bind(clause=query)):
+            after = None
+            while True:
+                page = await self.read_page_async(after, limit=yield_per, filters=filters)
+                for item in page.items:
+                    yield item
+                if page.next_cursor is None:
+                    return
+                after = page.next_cursor
+        result = await session.stream(query.execution_options(yield_per=yield_per))
+        try:
+            async for partition in result.partitions():
+                for item in self._convert_many(partition):
+                    yield item
+        finally:
+            await result.close()
 
     def update(self, id: int, obj_in: T) -> U | None:
-        """同期的にデータを更新"""
+        """同期的にデータを更新
+        UPDATE ... RETURNING の1ステートメントで更新し、対象が存在しない場合はNoneを返す
+        """
         session = self._check_sync_session()
-        obj = self.read(id)
-        if not obj:
-            return None
-        for key, value in obj_in.dict().items():
-            setattr(obj, key, value)
+        values = self._model_to_dict(obj_in, exclude_unset=True)
+        if not values:
+            return self.read(id)
+        result = session.execute(self._update_statement(id, values))
+        row = result.one_or_none()
         session.commit()
-        session.refresh(obj)
-        return self._convert_to_pydantic_model(obj)
+        if row is None:
+            return None
+        return self._convert_to_pydantic_model(row)
 
     async def update_async(self, id: int, obj_in: T) -> U | None:
-        """非同期的にデータを更新"""
+        """非同期的にデータを更新
+        UPDATE ... RETURNING の1ステートメントで更新し、対象が存在しない場合はNoneを返す
+        """
         session = self._check_async_session()
-        obj = await self.read_async(id)
-        if not obj:
-            return None
-        for key, value in obj_in.dict().items():
-            setattr(obj, key, value)
+        values = self._model_to_dict(obj_in, exclude_unset=True)
+        if not values:
+            return await self.read_async(id)
+        result = await session.execute(self._update_statement(id, values))
+        row = result.one_or_none()
         await session.commit()
-        await session.refresh(obj)
-        return self._convert_to_pydantic_model(obj)
+        if row is None:
+            return None
+        return self._convert_to_pydantic_model(row)
 
     def delete(self, id: int) -> None:
         """同期的にデータを削除"""
         session = self._check_sync_session()
-        obj = self.read(id)
-        if not obj:
-            raise CRUDException(f'Object with ID {id} does not exist.')
-        session.delete(obj)
+        result = session.execute(delete(self.db_model).where(self.db_model.id == id))
         session.commit()
+        if result.rowcount == 0:
+            raise CRUDException(f'Object with ID {id} does not exist.')
 
     async def delete_async(self, id: int) -> None:
         """非同期的にデータを削除"""
         session = self._check_async_session()
-        obj = await self.read_async(id)
-        if not obj:
-            raise CRUDException(f'Object with ID {id} does not exist.')
-        session.delete(obj)
+        result = await session.execute(delete(self.db_model).where(self.db_model.id == id))
         await session.commit()
+        if result.rowcount == 0:
+            raise CRUDException(f'Object with ID {id} does not exist.')
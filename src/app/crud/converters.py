@@ -0,0 +1,64 @@
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.engine import Row
+
+U = TypeVar('U', bound=BaseModel)
+
+
+class RowConverter(Generic[U]):
+    """SQLAlchemyの行 (Row / ORMインスタンス) を出力モデルに変換するコンバーター
+    (db_model, output_model) の組ごとに1度だけ生成され、列名・attrgetter・TypeAdapter を使い回す
+    列名と異なる名前の出力フィールドは aliases ({フィールド名: 列名}) で対応付ける
+    """
+
+    def __init__(self, db_model: type[Any], output_model: type[U], aliases: Mapping[str, str] | None = None):
+        columns = db_model.__table__.columns
+        aliases = aliases or {}
+        unknown = [column for column in aliases.values() if column not in columns]
+        if unknown:
+            raise ValueError(f'{db_model.__name__} has no columns {unknown} (aliases of {output_model.__name__})')
+        # 出力フィールドと対応する列の組 (SELECT/RETURNING 句の先頭に並ぶ順序)
+        pairs = [(name, aliases.get(name, name)) for name in output_model.model_fields]
+        pairs = [(name, column) for name, column in pairs if column in columns]
+        # 必須フィールドに対応する列が無い場合は変換時の検証エラーになるため、生成時点で不一致として扱う
+        missing = [
+            name for name, field in output_model.model_fields.items() if field.is_required() and aliases.get(name, name) not in columns
+        ]
+        if missing:
+            raise ValueError(f'{output_model.__name__} fields {missing} have no matching column in {db_model.__name__}')
+        if not pairs:
+            pairs = [(name, name) for name in columns.keys()]
+        self.field_names: tuple[str, ...] = tuple(name for name, _ in pairs)
+        self.column_names: tuple[str, ...] = tuple(column for _, column in pairs)
+        getter = attrgetter(*self.column_names)
+        self._getter = getter if len(self.column_names) > 1 else lambda obj: (getter(obj),)
+        self._adapter = TypeAdapter(output_model)
+        self._list_adapter = TypeAdapter(list[output_model])
+
+    def _to_dict(self, obj: Any) -> dict[str, Any]:
+        # select(*projection) / RETURNING の Row は列名順のタプルなので zip するだけでよい
+        values = obj if isinstance(obj, Row) else self._getter(obj)
+        return dict(zip(self.field_names, values))
+
+    def one(self, obj: Any) -> U:
+        """1件を出力モデルに変換"""
+        return self._adapter.validate_python(self._to_dict(obj))
+
+    def many(self, objs: Any) -> list[U]:
+        """複数件を1回の検証でまとめて出力モデルのリストに変換"""
+        return self._list_adapter.validate_python([self._to_dict(obj) for obj in objs])
+
+
+_converters: dict[tuple[type[Any], type[BaseModel], frozenset[tuple[str, str]]], RowConverter[Any]] = {}
+
+
+def get_converter(db_model: type[Any], output_model: type[U], aliases: Mapping[str, str] | None = None) -> RowConverter[U]:
+    """(db_model, output_model, aliases) に対応するコンバーターを取得 (初回のみ生成してキャッシュする)"""
+    key = (db_model, output_model, frozenset((aliases or {}).items()))
+    converter = _converters.get(key)
+    if converter is None:
+        converter = _converters[key] = RowConverter(db_model, output_model, aliases)
+    return converter
@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from typing import Any, Generic, TypeVar
+
+from src.app.core.db.routing import pin_primary
+
+from .base_crud import SQLAlchemyCRUD
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class DataLoader(Generic[K, V]):
+    """同じイベントループのティック内で呼ばれた load(key) を1回のバッチ取得にまとめるローダー
+    リクエストごとに生成し、取得結果 (存在しない場合の None も含む) をリクエストの間メモ化する
+    バッチ取得は別タスクで実行されるため、待機中に同じセッションで別のクエリを発行しないこと
+    リクエストのキャンセル時にバッチ取得が残らないよう、セッションを閉じる前に close() を呼び出す
+    """
+
+    def __init__(self, batch_load_fn: Callable[[list[K]], Awaitable[Mapping[K, V]]]):
+        self._batch_load_fn = batch_load_fn
+        self._memo: dict[K, asyncio.Future[V | None]] = {}
+        self._queue: list[K] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._dispatch_handle: asyncio.Handle | None = None
+
+    def load(self, key: K) -> asyncio.Future[V | None]:
+        """キーに対応する値を取得 (同一ティック内の呼び出しは1回のバッチ取得にまとめる)"""
+        future = self._memo.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._memo[key] = loop.create_future()
+        self._queue.append(key)
+        if len(self._queue) == 1:
+            self._dispatch_handle = loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """複数のキーに対応する値をキーの順序で取得"""
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def prime(self, key: K, value: V) -> None:
+        """取得済みの値をメモに登録 (既に登録済みの場合は何もしない)"""
+        if key not in self._memo:
+            future = self._memo[key] = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+
+    def clear(self, key: K) -> None:
+        """更新などで古くなった値をメモから削除"""
+        self._memo.pop(key, None)
+
+    async def close(self) -> None:
+        """未実行・実行中のバッチ取得をキャンセルし、完了を待つ
+        呼び出し元のタスクがキャンセルされてもバッチ取得のタスクは止まらないため、
+        同じセッションを並行して使用しないよう、セッションを閉じる前に呼び出す
+        """
+        if self._dispatch_handle is not None:
+            self._dispatch_handle.cancel()
+            self._dispatch_handle = None
+        self._queue = []
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for future in self._memo.values():
+            future.cancel()
+        self._memo.clear()
+
+    def _dispatch(self) -> None:
+        self._dispatch_handle = None
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._run_batch(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, keys: list[K]) -> None:
+        try:
+            values = await self._batch_load_fn(keys)
+        except asyncio.CancelledError:
+            for key in keys:
+                future = self._memo.pop(key, None)
+                if future is not None:
+                    future.cancel()
+            raise
+        except Exception as e:
+            # 失敗した結果はメモに残さず、次回の load で再取得する
+            for key in keys:
+                future = self._memo.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._memo.get(key)
+            if future is not None and not future.done():
+                future.set_result(values.get(key))
+
+
+def id_loader(crud: SQLAlchemyCRUD[Any, V], primary: bool = False) -> DataLoader[int, V]:
+    """CRUDの read_many_async (id = ANY(:ids) の1クエリ) で主キー検索をまとめるローダーを生成
+    primary=True の場合は、レプリカの遅延を許容できない値を取得するためセッションをプライマリに固定してから取得する
+    """
+
+    async def batch_load(ids: list[int]) -> dict[int, V]:
+        if primary:
+            pin_primary(crud.db_session)
+        return {item.id: item for item in await crud.read_many_async(ids)}
+
+    return DataLoader(batch_load)
@@ -1,4 +1,6 @@
+from collections.abc import Sequence
 from datetime import datetime
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from sqlalchemy import select
@@ -15,20 +17,37 @@ class SocialAccountCRUD(SQLAlchemyCRUD[CreateInternalSocialAccount, ReadSocialAc
     async def get_by_provider_and_id(self, provider: str, provider_user_id: str) -> ReadSocialAccount | None:
         """指定されたプロバイダーとプロバイダーユーザーIDでSocialAccountを取得"""
         session = self._check_async_session()
-        query = select(self.db_model).where(self.db_model.provider == provider, self.db_model.provider_user_id == provider_user_id)
+        query = select(*self._projection()).where(
+            self.db_model.provider == provider,
+            self.db_model.provider_user_id == provider_user_id,
+        )
         result = await session.execute(query)
-        db_obj = result.scalar_one_or_none()
-        if db_obj:
-            return self._convert_to_pydantic_model(db_obj)
+        row = result.one_or_none()
+        if row:
+            return self._convert_to_pydantic_model(row)
         return None
 
     async def get_by_user_id(self, user_id: int) -> list[ReadSocialAccount]:
         """指定されたユーザーIDでSocialAccountを取得"""
         session = self._check_async_session()
-        query = select(self.db_model).where(self.db_model.user_id == user_id)
+        query = select(*self._projection()).where(self.db_model.user_id == user_id)
         result = await session.execute(query)
-        db_objs = result.scalars().all()
-        return [self._convert_to_pydantic_model(db_obj) for db_obj in db_objs]
+        rows = result.all()
+        return self._convert_many(rows)
+
+    async def upsert_async(
+        self,
+        obj_in: CreateInternalSocialAccount,
+        conflict_cols: Sequence[str] = ('provider', 'provider_user_id'),
+        update_cols: Sequence[str] = ('provider_email', 'access_token', 'refresh_token', 'token_expiry'),
+        update_values: dict[str, Any] | None = None,
+    ) -> ReadSocialAccount:
+        """プロバイダーとプロバイダーユーザーIDの組でSocialAccountを作成、既に存在する場合はトークンを更新
+        INSERT ... ON CONFLICT (provider, provider_user_id) DO UPDATE の1ステートメントで実行する
+        """
+        if update_values is None:
+            update_values = {'updated_at': datetime.now(tz=ZoneInfo('Asia/Tokyo'))}
+        return await super().upsert_async(obj_in, conflict_cols, update_cols, update_values)
 
     async def update_tokens(
         self,
@@ -38,20 +57,15 @@ class SocialAccountCRUD(SQLAlchemyCRUD[CreateInternalSocialAccount, ReadSocialAc
         token_expiry: datetime,
     ) -> ReadSocialAccount | None:
         """指定されたSocialAccountのトークンを更新"""
-        session = self._check_async_session()
-        query = select(self.db_model).where(self.db_model.id == social_account_id)
-        result = await session.execute(query)
-        db_obj = result.scalar_one_or_none()
-        if not db_obj:
-            return None
-
-        db_obj.access_token = access_token
-        db_obj.refresh_token = refresh_token
-        db_obj.token_expiry = token_expiry
-        db_obj.updated_at = datetime.now(tz=ZoneInfo('Asia/Tokyo'))
-        await session.commit()
-        await session.refresh(db_obj)
-        return self._convert_to_pydantic_model(db_obj)
+        return await self.update_async(
+            social_account_id,
+            {
+                'access_token': access_token,
+                'refresh_token': refresh_token,
+                'token_expiry': token_expiry,
+                'updated_at': datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+            },
+        )
 
     async def delete_by_user_id_and_provider(self, user_id: int, provider: str) -> bool:
         """指定されたユーザーIDとプロバイダーでSocialAccountを削除"""
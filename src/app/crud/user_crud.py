@@ -1,10 +1,16 @@
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Integer
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import select
+from sqlalchemy.sql import case, cast, func, or_, select, update
 
+from src.app.core.admission import AdmissionRejectedError
 from src.app.models.user import User
 from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
-from src.app.services.user_service import verify_password
+from src.app.services.principal_cache import principal_cache
+from src.app.services.user_service import get_hashed_password_async, password_needs_rehash, verify_password_async
 from src.utils.logger import get_logger
 
 from .base_crud import SQLAlchemyCRUD
@@ -14,7 +20,8 @@ logger = get_logger(__name__)
 
 class UserCRUD(SQLAlchemyCRUD[CreateInternalUser, ReadUser]):
     def __init__(self, db_session: Session | AsyncSession):
-        super().__init__(db_session, User, ReadUser)
+        # ReadUser.name は users テーブルの full_name 列に対応する
+        super().__init__(db_session, User, ReadUser, output_aliases={'name': 'full_name'})
 
     def _prepare_data(self, obj_in):
         return {
@@ -24,18 +31,97 @@ class UserCRUD(SQLAlchemyCRUD[CreateInternalUser, ReadUser]):
             'hashed_password': obj_in.hashed_password,
         }
 
+    def create_many(self, objs_in: Sequence[CreateInternalUser], chunk_size: int | None = None) -> list[ReadUser]:
+        """ユーザーを一括作成し、認証済みユーザーのキャッシュから削除する (削除済みユーザーのIDが再利用される場合に備える)"""
+        users = super().create_many(objs_in, chunk_size)
+        principal_cache.invalidate_sync(*[user.id for user in users])
+        return users
+
+    async def create_many_async(self, objs_in: Sequence[CreateInternalUser], chunk_size: int | None = None) -> list[ReadUser]:
+        """ユーザーを一括作成し、認証済みユーザーのキャッシュから削除する (削除済みユーザーのIDが再利用される場合に備える)"""
+        users = await super().create_many_async(objs_in, chunk_size)
+        await principal_cache.invalidate(*[user.id for user in users])
+        return users
+
+    def update(self, id: int, obj_in: CreateInternalUser | dict) -> ReadUser | None:
+        """ユーザーを更新し、認証済みユーザーのキャッシュから削除する"""
+        try:
+            return super().update(id, obj_in)
+        finally:
+            principal_cache.invalidate_sync(id)
+
+    async def update_async(self, id: int, obj_in: CreateInternalUser | dict) -> ReadUser | None:
+        """ユーザーを更新し、認証済みユーザーのキャッシュから削除する"""
+        try:
+            return await super().update_async(id, obj_in)
+        finally:
+            await principal_cache.invalidate(id)
+
+    def upsert(
+        self,
+        obj_in: CreateInternalUser,
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        update_values: dict[str, Any] | None = None,
+    ) -> ReadUser:
+        """ユーザーを作成または更新し、認証済みユーザーのキャッシュから削除する"""
+        user = super().upsert(obj_in, conflict_cols, update_cols, update_values)
+        principal_cache.invalidate_sync(user.id)
+        return user
+
+    async def upsert_async(
+        self,
+        obj_in: CreateInternalUser,
+        conflict_cols: Sequence[str],
+        update_cols: Sequence[str],
+        update_values: dict[str, Any] | None = None,
+    ) -> ReadUser:
+        """ユーザーを作成または更新し、認証済みユーザーのキャッシュから削除する"""
+        user = await super().upsert_async(obj_in, conflict_cols, update_cols, update_values)
+        await principal_cache.invalidate(user.id)
+        return user
+
+    def delete(self, id: int) -> None:
+        """ユーザーを削除し、認証済みユーザーのキャッシュから削除する"""
+        try:
+            super().delete(id)
+        finally:
+            principal_cache.invalidate_sync(id)
+
+    async def delete_async(self, id: int) -> None:
+        """ユーザーを削除し、認証済みユーザーのキャッシュから削除する"""
+        try:
+            await super().delete_async(id)
+        finally:
+            await principal_cache.invalidate(id)
+
     def email_exists(self, email: str) -> bool:
-        results = self.read_by_filter(email=email)
-        return len(results) > 0
+        return self.exists(email=email)
 
     async def email_exists_async(self, email: str) -> bool:
-        results = await self.read_by_filter_async(email=email)
-        return len(results) > 0
+        return await self.exists_async(email=email)
 
     async def username_exists_async(self, username: str) -> bool:
         """指定されたユーザー名が既に存在するかどうかを非同期的に確認する"""
-        results = await self.read_by_filter_async(username=username)
-        return len(results) > 0
+        return await self.exists_async(username=username)
+
+    async def next_available_username_async(self, base: str) -> str:
+        """base が使用済みの場合は base_<使用済みの最大の連番 + 1> のユーザー名を返す
+        候補を1つずつ問い合わせたり該当するユーザー名をすべて取得したりせず、
+        base の使用有無と数字のみの接尾辞の最大値を1回のクエリで集計する
+        """
+        session = self._check_async_session()
+        suffix = func.substr(User.username, len(base) + 2)
+        # 整数に変換できる桁数に限定し、base_x などの数字以外の接尾辞は対象外とする
+        numeric_suffix = User.username.startswith(f'{base}_', autoescape=True) & suffix.regexp_match('^[0-9]{1,9}$')
+        query = select(
+            func.max(case((User.username == base, 1), else_=0)),
+            func.max(case((User.username != base, cast(suffix, Integer)))),
+        ).where(or_(User.username == base, numeric_suffix))
+        base_taken, max_suffix = (await session.execute(query)).one()
+        if not base_taken:
+            return base
+        return f'{base}_{(max_suffix or 0) + 1}'
 
     async def get_by_email_async(self, email: str) -> ReadUser | None:
         results = await self.read_by_filter_async(email=email)
@@ -49,27 +135,41 @@ class UserCRUD(SQLAlchemyCRUD[CreateInternalUser, ReadUser]):
         return await self.read_async(id)
 
     async def update_verified(self, id: int) -> ReadUser | None:
-        session = self._check_async_session()
-        query = select(User).where(User.id == id)
-        result = await session.execute(query)
-        user = result.scalars().first()
+        user = await self.update_async(id, {'is_verified': True})
         if not user:
-            logger.error(f'User not found: {user}')
+            logger.error(f'User not found: {id}')
             return None
-        user.is_verified = True
-        await session.commit()
-        await session.refresh(user)
-        return self._convert_to_pydantic_model(user)
+        return user
 
     async def authenticate(self, email: str, password: str) -> ReadUser | None:
         session = self._check_async_session()
-        query = select(User).where(User.email == email)
+        query = select(*self._projection('hashed_password')).where(User.email == email)
         result = await session.execute(query)
-        user = result.scalars().first()
+        user = result.first()
+        # アドミッション制御の待ち行列や bcrypt の実行中に接続を保持しないよう、読み取りのトランザクションを終える
+        await session.commit()
         if not user:
             logger.error(f'User not found: {user}')
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             logger.error('Password verification failed')
             return None
+        if password_needs_rehash(user.hashed_password):
+            await self._rehash_password(user.id, password, user.hashed_password)
         return self._convert_to_pydantic_model(user)
+
+    async def _rehash_password(self, id: int, password: str, hashed_password: str) -> None:
+        """保存されているハッシュのコストがポリシーの範囲外の場合に、ログイン時の平文パスワードで再ハッシュして保存する
+        混雑時に拒否された場合は次回のログインに持ち越し、ログイン自体は失敗させない。
+        同時にパスワードが変更された場合に上書きしないよう、読み取ったハッシュと一致する場合のみ更新する
+        """
+        try:
+            new_hashed_password = await get_hashed_password_async(password)
+        except AdmissionRejectedError:
+            logger.info(f'Skipped password rehash for user {id}: password hasher is busy')
+            return
+        session = self._check_async_session()
+        await session.execute(
+            update(User).where(User.id == id, User.hashed_password == hashed_password).values(hashed_password=new_hashed_password)
+        )
+        await session.commit()
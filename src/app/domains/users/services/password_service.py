@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 import bcrypt
 
+from src.app.core.password_hasher import PasswordHasher, password_hasher
+
 
 class PasswordService(ABC):
     """
@@ -36,12 +38,47 @@ class PasswordService(ABC):
         """
         pass
 
+    @abstractmethod
+    async def hash_password_async(self, plain_password: str) -> str:
+        """
+        イベントループをブロックせずに平文パスワードをハッシュ化します。
+
+        Args:
+            plain_password (str): ハッシュ化する平文パスワード
+
+        Returns:
+            str: ハッシュ化されたパスワード
+        """
+        pass
+
+    @abstractmethod
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        イベントループをブロックせずに平文パスワードを検証します。
+
+        Args:
+            plain_password (str): 検証する平文パスワード
+            hashed_password (str): 比較対象のハッシュ化されたパスワード
+
+        Returns:
+            bool: パスワードが一致する場合はTrue、それ以外はFalse
+        """
+        pass
+
 
 class BcryptPasswordService(PasswordService):
     """
     Bcryptを使用したパスワード操作のためのドメインサービス実装。
+    非同期のメソッドは PasswordHasher のスレッドプールで bcrypt を実行します。
     """
 
+    def __init__(self, hasher: PasswordHasher | None = None):
+        """
+        Args:
+            hasher (PasswordHasher | None): bcrypt を実行する PasswordHasher。Noneの場合は共有のインスタンスを使用します。
+        """
+        self.hasher = hasher or password_hasher
+
     def hash_password(self, plain_password: str) -> str:
         """
         平文パスワードをハッシュ化します。
@@ -50,7 +87,7 @@ class BcryptPasswordService(PasswordService):
             Returns:
             str: ハッシュ化されたパスワード
         """
-        hashed_password = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = bcrypt.hashpw(plain_password.encode('utf-8'), bcrypt.gensalt(self.hasher.rounds)).decode('utf-8')
         return hashed_password
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
@@ -64,3 +101,24 @@ class BcryptPasswordService(PasswordService):
         """
         is_valid = bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
         return is_valid
+
+    async def hash_password_async(self, plain_password: str) -> str:
+        """
+        イベントループをブロックせずに平文パスワードをハッシュ化します。
+        Args:
+            plain_password (str): ハッシュ化する平文パスワード
+        Returns:
+            str: ハッシュ化されたパスワード
+        """
+        return await self.hasher.hash(plain_password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        イベントループをブロックせずに平文パスワードを検証します。
+        Args:
+            plain_password (str): 検証する平文パスワード
+            hashed_password (str): 比較対象のハッシュ化されたパスワード
+        Returns:
+            bool: パスワードが一致する場合はTrue、それ以外はFalse
+        """
+        return await self.hasher.verify(plain_password, hashed_password)
@@ -1,3 +1,7 @@
+from typing import Any
+
+from sqlalchemy.engine import Row
+
 from src.app.core.dto.entity_with_model_dto import EntityWithModelDTO
 from src.app.core.schemas.global_value_objects import EntityUUID
 from src.app.domains.users.entities.user_entity import UserEntity
@@ -14,11 +18,11 @@ class UserEntityDTO(EntityWithModelDTO[UserEntity, User]):
     """
 
     @staticmethod
-    def to_entity(model: User) -> UserEntity:
+    def to_entity(model: User | Row[Any]) -> UserEntity:
         """
         UserモデルからUserEntityを作成します。
         Args:
-            model (User): Userモデル
+            model (User | Row): Userモデル、または users テーブルの全列を SELECT した行
         Returns:
             UserEntity: UserEntityインスタンス
         """
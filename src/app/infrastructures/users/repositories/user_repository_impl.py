@@ -1,18 +1,27 @@
+from collections.abc import Collection
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.core.db.routing import pin_primary
 from src.app.domains.users.dtos.user_dtos import CreateInternalUser, UpdateInternalUser
 from src.app.domains.users.entities.user_entity import UserEntity
 from src.app.domains.users.repositories.user_repository import UserRepositoryInterface
 from src.app.domains.users.schemas.user_schemas import Email
 from src.app.infrastructures.users.dtos.user_entity_dto import UserEntityDTO
 from src.app.models.user import User
+from src.app.services.principal_cache import principal_cache
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Coreで読み取るSELECT文。毎回組み立てるとキャッシュキーの生成が全列分かかるため、バインドパラメータで一度だけ組み立てる
+_CORE_READ_STATEMENTS = {
+    column: select(*User.__table__.columns).where(User.__table__.c[column] == bindparam('value'))
+    for column in ('id', 'email', 'username')
+}
+
 
 class UserRepositoryImpl(UserRepositoryInterface):
     """
@@ -20,12 +29,42 @@ class UserRepositoryImpl(UserRepositoryInterface):
     SQLAlchemyを使用してデータベースアクセスを行います。
     """
 
-    def __init__(self, db_session: AsyncSession):
+    # ORMのインスタンスを生成せず、Coreの行から直接エンティティを生成する読み取りメソッド
+    CORE_READ_METHODS: frozenset[str] = frozenset({'find_by_id', 'find_by_email', 'find_by_username'})
+
+    def __init__(self, db_session: AsyncSession, core_reads: Collection[str] | None = None):
         """
         Arguments:
             db_session (AsyncSession): SQLAlchemyのAsyncSessionオブジェクト。
+            core_reads (Collection[str] | None): Coreの行から直接エンティティを生成するメソッド名。
+                Noneの場合は CORE_READ_METHODS を使用し、空にするとすべてORM経由で取得します。
         """
         self.db_session = db_session
+        self.core_reads = self.CORE_READ_METHODS if core_reads is None else frozenset(core_reads)
+
+    async def _find_one(self, method: str, column: str, value: int | str) -> UserEntity | None:
+        """
+        指定した列の値が一致するユーザーを1件取得します。
+        method が core_reads に含まれる場合は、識別マップへの登録や変更追跡を行わずに
+        SELECT の行から直接エンティティを生成します (取得したユーザーはセッションに関連付けられません)。
+        Args:
+            method (str): 呼び出し元のメソッド名。
+            column (str): 検索する列名。
+            value (int | str): 検索する値。
+        returns:
+            UserEntity | None: ユーザーのエンティティまたはNone。
+        """
+        if method in self.core_reads:
+            result = await self.db_session.execute(_CORE_READ_STATEMENTS[column], {'value': value})
+            user_data = result.one_or_none()
+        else:
+            result = await self.db_session.execute(select(User).where(getattr(User, column) == value))
+            user_data = result.scalar_one_or_none()
+
+        if user_data is None:
+            return None
+
+        return UserEntityDTO.to_entity(user_data)
 
     async def create_user(self, create_dto: CreateInternalUser) -> UserEntity:
         """
@@ -60,14 +99,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             UserEntity | None: ユーザーのエンティティまたはNone。
         """
-        query = select(User).where(User.id == user_id)
-        result = await self.db_session.execute(query)
-        user_data = result.scalar_one_or_none()
-
-        if user_data is None:
-            return None
-
-        return UserEntityDTO.to_entity(user_data)
+        return await self._find_one('find_by_id', 'id', user_id)
 
     async def find_by_email(self, email: Email) -> UserEntity | None:
         """
@@ -78,14 +110,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             UserEntity | None: ユーザーのエンティティまたはNone。
         """
-        query = select(User).where(User.email == email.email)
-        result = await self.db_session.execute(query)
-        user_data = result.scalar_one_or_none()
-
-        if user_data is None:
-            return None
-
-        return UserEntityDTO.to_entity(user_data)
+        return await self._find_one('find_by_email', 'email', email.email)
 
     async def find_by_username(self, username: str) -> UserEntity | None:
         """
@@ -96,14 +121,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             UserEntity | None:
         """
-        query = select(User).where(User.username == username)
-        result = await self.db_session.execute(query)
-        user_data = result.scalar_one_or_none()
-
-        if user_data is None:
-            return None
-
-        return UserEntityDTO.to_entity(user_data)
+        return await self._find_one('find_by_username', 'username', username)
 
     async def update(self, update_dto: UpdateInternalUser) -> UserEntity:
         """
@@ -113,6 +131,8 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             UserEntity: 更新されたユーザーのエンティティ。
         """
+        # 読み取った値をもとに更新するため、レプリカではなくプライマリから取得する
+        pin_primary(self.db_session)
         query = select(User).where(User.id == update_dto.id)
         result = await self.db_session.execute(query)
         user_model = result.scalar_one_or_none()
@@ -139,6 +159,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
 
         user_model.updated_at = datetime.now(tz=ZoneInfo('Asia/Tokyo'))
         await self.db_session.commit()
+        await principal_cache.invalidate(update_dto.id)
         await self.db_session.refresh(user_model)
         return UserEntityDTO.to_entity(user_model)
 
@@ -148,6 +169,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         Args:
             user_id (int): 削除するユーザーのID。
         """
+        pin_primary(self.db_session)
         query = select(User).where(User.id == user_id)
         result = await self.db_session.execute(query)
         user_data = result.scalar_one_or_none()
@@ -157,6 +179,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
 
         await self.db_session.delete(user_data)
         await self.db_session.commit()
+        await principal_cache.invalidate(user_id)
 
     async def logical_delete(self, user_id: int) -> None:
         """
@@ -164,6 +187,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         Args:
             user_id (int): 論理削除するユーザーのID。
         """
+        pin_primary(self.db_session)
         query = select(User).where(User.id == user_id)
         result = await self.db_session.execute(query)
         user_data = result.scalar_one_or_none()
@@ -176,6 +200,7 @@ class UserRepositoryImpl(UserRepositoryInterface):
         user_data.deleted_at = datetime.now(tz=ZoneInfo('Asia/Tokyo'))
 
         await self.db_session.commit()
+        await principal_cache.invalidate(user_id)
 
     async def email_exists(self, email: Email) -> bool:
         """
@@ -185,11 +210,8 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             bool: ユーザーが存在する場合はTrue、存在しない場合はFalse。
         """
-        query = select(User).where(User.email == email.email)
-        result = await self.db_session.execute(query)
-        user_data = result.scalar_one_or_none()
-
-        return user_data is not None
+        query = select(exists().where(User.email == email.email))
+        return bool(await self.db_session.scalar(query))
 
     async def username_exists(self, username: str) -> bool:
         """
@@ -199,8 +221,5 @@ class UserRepositoryImpl(UserRepositoryInterface):
         returns:
             bool: ユーザーが存在する場合はTrue、存在しない場合はFalse。
         """
-        query = select(User).where(User.username == username)
-        result = await self.db_session.execute(query)
-        user_data = result.scalar_one_or_none()
-
-        return user_data is not None
+        query = select(exists().where(User.username == username))
+        return bool(await self.db_session.scalar(query))
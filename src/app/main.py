@@ -1,9 +1,35 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from src.app.api import router as api_router
+from src.app.core.admission import AdmissionRejectedError, admission_rejected_handler
+from src.app.core.config import settings
+from src.app.core.db.query_counter import QueryCountMiddleware
+from src.app.core.metrics import RouteContextMiddleware
+from src.app.core.resources import resources
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # 起動時にDB接続・共有クライアント・Googleの証明書を準備し、完了するまでレディネスを返さない
+    await resources.startup()
+    yield
+    await resources.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_exception_handler(AdmissionRejectedError, admission_rejected_handler)
+app.add_middleware(RouteContextMiddleware)
+if settings.APP_DEBUG:
+    app.add_middleware(
+        QueryCountMiddleware,
+        max_queries=settings.DB_QUERY_COUNT_WARN_THRESHOLD,
+        max_repeats=settings.DB_QUERY_REPEAT_WARN_THRESHOLD,
+    )
 
 app.include_router(api_router)
@@ -1,9 +1,12 @@
 import uuid as uuid_pkg
 from datetime import datetime
+from typing import Generic, TypeVar
 from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field, field_serializer
 
+ItemT = TypeVar('ItemT')
+
 
 class UUIDSchema(BaseModel):
     uuid: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4)
@@ -28,3 +31,12 @@ class PersistentDeletion(BaseModel):
             return deleted_at.isoformat()
 
         return None
+
+
+class CursorPage(BaseModel, Generic[ItemT]):
+    """キーセットページネーションの1ページ分の結果
+    next_cursor は次ページ取得時にそのまま渡す不透明な文字列 (最終ページでは None)
+    """
+
+    items: list[ItemT]
+    next_cursor: str | None = None
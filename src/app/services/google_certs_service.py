@@ -0,0 +1,128 @@
+import asyncio
+import re
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+import httpx
+from google.auth import transport
+from google.auth.transport import requests
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+GOOGLE_OAUTH2_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+# Cache-Control に max-age がない場合のキャッシュ期間 (秒)
+DEFAULT_CERTS_MAX_AGE = 3600
+# 期限切れのこの秒数前から、バックグラウンドで証明書を再取得する
+CERTS_REFRESH_MARGIN = 300
+# 再取得が完了していない (失敗した) 場合に、期限切れの証明書を返し続ける期間 (秒)
+CERTS_STALE_GRACE = 3600
+
+_MAX_AGE_PATTERN = re.compile(r'max-age=(\d+)')
+
+
+class _CachedResponse(transport.Response):
+    def __init__(self, status: int, headers: Mapping[str, str], data: bytes):
+        self._status = status
+        self._headers = dict(headers)
+        self._data = data
+
+    @property
+    def status(self) -> int:
+        return self._status
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self._headers
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+
+def _max_age(headers: Mapping[str, str]) -> int:
+    match = _MAX_AGE_PATTERN.search(headers.get('cache-control', '') or headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else DEFAULT_CERTS_MAX_AGE
+
+
+class CachedCertsRequest(transport.Request):
+    """Googleの公開鍵 (証明書) をCache-Controlの期間だけメモリに保持する google-auth 用トランスポート
+
+    id_token.verify_oauth2_token(token, request, ...) の request として渡すと、
+    証明書の取得をリクエストごとの同期HTTP通信ではなくキャッシュから行う。
+    起動時に preload() で取得しておくことで、最初のログインでも証明書の取得待ちが発生しない。
+    検証の前に ensure() を呼び出すと、期限切れが近い証明書をバックグラウンドで非同期に再取得し、
+    再取得が完了するまでは (CERTS_STALE_GRACE 秒までは) 期限切れの証明書を返すため、イベントループを止める同期の取得は行わない
+    """
+
+    def __init__(self, fallback: transport.Request | None = None):
+        self._fallback = fallback or requests.Request()
+        self._cache: dict[str, tuple[float, _CachedResponse]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+
+    def _store(self, url: str, response: _CachedResponse) -> None:
+        with self._lock:
+            self._cache[url] = (time.monotonic() + _max_age(response.headers), response)
+
+    def cached(self, url: str) -> _CachedResponse | None:
+        entry = self._cache.get(url)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def _stale(self, url: str) -> _CachedResponse | None:
+        entry = self._cache.get(url)
+        if entry is None or entry[0] + CERTS_STALE_GRACE <= time.monotonic():
+            return None
+        return entry[1]
+
+    async def ensure(self, client: httpx.AsyncClient, url: str = GOOGLE_OAUTH2_CERTS_URL) -> None:
+        """証明書を使用する前に呼び出す。未取得の場合は非同期に取得し、期限切れが近い場合はバックグラウンドで再取得する"""
+        entry = self._cache.get(url)
+        if entry is None:
+            await self.preload(client, url)
+            return
+        if entry[0] - time.monotonic() <= CERTS_REFRESH_MARGIN and url not in self._refreshing:
+            task = asyncio.create_task(self._refresh(client, url))
+            self._refreshing[url] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(url, None))
+
+    async def _refresh(self, client: httpx.AsyncClient, url: str) -> None:
+        try:
+            await self.preload(client, url)
+        except Exception as exc:
+            # 期限切れの証明書を返し続け、次の ensure() で再度取得する
+            logger.warning(f'Failed to refresh certificates: {url}: {exc}')
+
+    async def close(self) -> None:
+        """実行中のバックグラウンドの再取得をキャンセルする"""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def preload(self, client: httpx.AsyncClient, url: str = GOOGLE_OAUTH2_CERTS_URL) -> None:
+        """証明書を非同期に取得してキャッシュする"""
+        response = await client.get(url)
+        response.raise_for_status()
+        self._store(url, _CachedResponse(response.status_code, response.headers, response.content))
+        logger.info(f'Preloaded certificates: {url}')
+
+    def __call__(
+        self, url: str, method: str = 'GET', body: Any = None, headers: Any = None, timeout: Any = None, **kwargs: Any
+    ) -> transport.Response:
+        if method == 'GET':
+            cached = self.cached(url) or self._stale(url)
+            if cached is not None:
+                return cached
+        response = self._fallback(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        if method == 'GET' and response.status == 200:
+            self._store(url, _CachedResponse(response.status, response.headers, response.data))
+        return response
+
+
+google_certs_request = CachedCertsRequest()
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.app.core.config import settings
+from src.app.core.metrics import metrics
+from src.app.core.resources import resources
+from src.app.schemas.user_schemas import ReadUser
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PRINCIPAL_CACHE_LOOKUPS = metrics.counter(
+    'principal_cache_lookups_total', 'Authenticated-principal cache lookups, by tier (local/redis/miss)'
+)
+
+# Redisの操作に失敗した後、Redisを使わずにDBから取得する期間 (秒)
+REDIS_RETRY_INTERVAL = 5.0
+
+
+class PrincipalCache:
+    """認証済みユーザー (ReadUser) をユーザーIDごとに保持する2層のキャッシュ
+
+    1層目はプロセス内のLRU (local_ttl 秒)、2層目はワーカー間で共有するRedis (ttl 秒)。
+    ユーザーを更新・削除した場合は invalidate() (同期的な処理からは invalidate_sync()) で両方から削除する。
+    他のワーカープロセスのLRUには local_ttl 秒まで古い値が残るため、local_ttl は短くする。
+    Redisに接続できない場合や redis_timeout 秒以内に応答しない場合は、REDIS_RETRY_INTERVAL 秒の間Redisを使わず、
+    LRUとDBのみで動作する
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        local_ttl: float,
+        ttl: int,
+        get_redis: Callable[[], Redis] | None = None,
+        get_sync_redis: Callable[[], SyncRedis] | None = None,
+        key_prefix: str = 'principal:',
+        redis_timeout: float = 0.1,
+    ):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self.get_redis = get_redis
+        self.get_sync_redis = get_sync_redis
+        self.key_prefix = key_prefix
+        self.redis_timeout = redis_timeout
+        self._entries: OrderedDict[int, tuple[float, ReadUser]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_retry_at = 0.0
+
+    def _key(self, user_id: int) -> str:
+        return f'{self.key_prefix}{user_id}'
+
+    def _redis(self) -> Redis | None:
+        if self.get_redis is None or time.monotonic() < self._redis_retry_at:
+            return None
+        return self.get_redis()
+
+    def _sync_redis(self) -> SyncRedis | None:
+        if self.get_sync_redis is None or time.monotonic() < self._redis_retry_at:
+            return None
+        return self.get_sync_redis()
+
+    def _redis_failed(self, operation: str, exc: Exception) -> None:
+        logger.warning(f'Principal cache {operation} on Redis failed, using local cache only for {REDIS_RETRY_INTERVAL}s: {exc}')
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+    def _get_local(self, user_id: int) -> ReadUser | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def _set_local(self, user: ReadUser) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.local_ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get(self, user_id: int) -> ReadUser | None:
+        """キャッシュからユーザーを取得する。LRU → Redis の順に探し、Redisで見つかった場合はLRUにも保持する"""
+        user = self._get_local(user_id)
+        if user is not None:
+            PRINCIPAL_CACHE_LOOKUPS.inc(tier='local')
+            return user
+        redis = self._redis()
+        if redis is not None:
+            try:
+                async with asyncio.timeout(self.redis_timeout):
+                    data = await redis.get(self._key(user_id))
+            except (RedisError, TimeoutError) as exc:
+                self._redis_failed('get', exc)
+            else:
+                if data is not None:
+                    user = ReadUser.model_validate_json(data)
+                    self._set_local(user)
+                    PRINCIPAL_CACHE_LOOKUPS.inc(tier='redis')
+                    return user
+        PRINCIPAL_CACHE_LOOKUPS.inc(tier='miss')
+        return None
+
+    async def set(self, user: ReadUser) -> None:
+        """DBから取得したユーザーをLRUとRedisに保持する"""
+        self._set_local(user)
+        redis = self._redis()
+        if redis is None:
+            return
+        try:
+            async with asyncio.timeout(self.redis_timeout):
+                await redis.set(self._key(user.id), user.model_dump_json(), ex=self.ttl)
+        except (RedisError, TimeoutError) as exc:
+            self._redis_failed('set', exc)
+
+    def _invalidate_local(self, user_ids: tuple[int, ...]) -> list[str]:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+        return [self._key(user_id) for user_id in user_ids]
+
+    async def invalidate(self, *user_ids: int) -> None:
+        """ユーザーをLRUとRedisから削除する (ユーザーの更新・削除のコミット後に呼び出す)"""
+        keys = self._invalidate_local(user_ids)
+        redis = self._redis()
+        if redis is None or not keys:
+            return
+        try:
+            async with asyncio.timeout(self.redis_timeout):
+                await redis.delete(*keys)
+        except (RedisError, TimeoutError) as exc:
+            self._redis_failed('delete', exc)
+
+    def invalidate_sync(self, *user_ids: int) -> None:
+        """invalidate() の同期版 (同期セッションでの更新・削除のコミット後に呼び出す)
+        Redisの応答の上限はクライアントの socket_timeout に従う
+        """
+        keys = self._invalidate_local(user_ids)
+        redis = self._sync_redis()
+        if redis is None or not keys:
+            return
+        try:
+            redis.delete(*keys)
+        except RedisError as exc:
+            self._redis_failed('delete', exc)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    get_redis=resources.get_redis,
+    get_sync_redis=resources.get_sync_redis,
+    redis_timeout=settings.PRINCIPAL_CACHE_REDIS_TIMEOUT_SECONDS,
+)
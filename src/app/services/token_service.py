@@ -1,9 +1,14 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from jose import JWTError, jwt
 
 from src.app.core.config import settings
+from src.app.core.metrics import metrics
 from src.app.schemas.token_schemas import (
     AccessTokenJWTPayload,
     EmailVerificationJWTPayload,
@@ -13,11 +18,85 @@ from src.app.schemas.token_schemas import (
     VerifyTokenResponse,
 )
 
+TOKEN_CACHE_LOOKUPS = metrics.counter('token_verify_cache_lookups_total', 'Verified-token cache lookups, by result (hit/miss)')
+
+
+class VerifiedTokenCache:
+    """検証済みのトークンの検証結果を、トークンの有効期限 (exp) まで保持するLRUキャッシュ
+
+    同じトークンが繰り返し提示された場合に、署名の検証・デコードと VerifyTokenResponse の生成を省く。
+    キーはトークンのSHA-256ダイジェストで、トークン自体は保持しない。
+    返す VerifyTokenResponse はキャッシュ内のインスタンスと共有されるため、呼び出し側で変更しないこと
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[float, VerifyTokenResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, token: str) -> VerifyTokenResponse | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        TOKEN_CACHE_LOOKUPS.inc(result='miss' if entry is None else 'hit')
+        return None if entry is None else entry[1]
+
+    def put(self, token: str, verified: VerifyTokenResponse) -> None:
+        expires_at = verified.exp.timestamp()
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, verified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> bool:
+        """トークンの検証結果を削除する (トークンの失効時に呼び出す)"""
+        with self._lock:
+            return self._entries.pop(self._key(token), None) is not None
+
+    def evict_subject(self, subject: str) -> int:
+        """指定したユーザー (sub) のトークンの検証結果をすべて削除し、削除した件数を返す"""
+        with self._lock:
+            keys = [key for key, (_, verified) in self._entries.items() if verified.id == subject]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
 class JWTTokenService:
-    def __init__(self, secret_key: str, algorithm: str = 'HS256'):
+    def __init__(self, secret_key: str, algorithm: str = 'HS256', cache: VerifiedTokenCache | None = None):
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self.cache = cache
 
     def create_access_token(self, data: TokenUserData, expires_delta: timedelta = timedelta(minutes=15)) -> str:
         expire = datetime.now(tz=ZoneInfo('Asia/Tokyo')) + expires_delta
@@ -56,10 +135,14 @@ class JWTTokenService:
         return encoded_jwt
 
     def verify_token(self, token: str) -> VerifyTokenResponse | None:
+        if self.cache is not None:
+            cached = self.cache.get(token)
+            if cached is not None:
+                return cached
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
 
-            return VerifyTokenResponse(
+            verified = VerifyTokenResponse(
                 id=payload.get('sub'),
                 email=payload.get('email'),
                 role=payload.get('role'),
@@ -68,9 +151,18 @@ class JWTTokenService:
             )
         except JWTError:
             return None
+        if self.cache is not None:
+            self.cache.put(token, verified)
+        return verified
+
+    def revoke_token(self, token: str) -> None:
+        """トークンの検証結果をキャッシュから削除する (失効リストへの登録などと合わせて呼び出す)"""
+        if self.cache is not None:
+            self.cache.evict(token)
 
 
 token_service = JWTTokenService(
     secret_key=settings.SECRET_KEY,
     algorithm=settings.ALGORITHM,
+    cache=VerifiedTokenCache(settings.TOKEN_CACHE_MAX_SIZE) if settings.TOKEN_CACHE_MAX_SIZE > 0 else None,
 )
@@ -1,11 +1,25 @@
 import bcrypt
 
+from src.app.core.password_hasher import password_hasher
+
 
 def get_hashed_password(password: str) -> str:
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(password_hasher.rounds)).decode('utf-8')
     return hashed_password
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     is_valid = bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
     return is_valid
+
+
+async def get_hashed_password_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return password_hasher.needs_rehash(hashed_password)
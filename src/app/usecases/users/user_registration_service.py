@@ -51,16 +51,16 @@ class UserRegistrationService:
             UsernameAlreadyExistsError: ユーザー名が既に存在する場合。
         """
         email = Email(email=request.email)
-        if not self.user_service.is_email_unique(email):
+        if not await self.user_service.is_email_unique(email):
             logger.error(f'メールアドレスが既に存在します: {email}')
             raise EmailAlreadyExistsError(f'メールアドレスが既に存在します: {email}')
 
-        if not self.user_service.is_username_unique(request.username):
+        if not await self.user_service.is_username_unique(request.username):
             logger.error(f'ユーザー名が既に存在します: {request.username}')
             raise UsernameAlreadyExistsError(f'ユーザー名が既に存在します: {request.username}')
 
         password = Password(password=request.password)
-        hashed_password = self.password_service.hash_password(password)
+        hashed_password = await self.password_service.hash_password_async(password.password)
         full_name = FullName(first_name=request.first_name, last_name=request.last_name)
         user_entity = UserEntity(
             username=request.username,
@@ -11,25 +11,42 @@ import pytest_asyncio
 from faker import Faker
 from fastapi import HTTPException, status
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import Session, sessionmaker
 from src.app.api.v1.users.schemas import DataInUser
 from src.app.core.config import settings
 from src.app.core.db.database import get_db_async
+from src.app.core.db.engine import EngineOptions, build_engine, build_sync_engine
+from src.app.core.db.query_counter import assert_max_queries as assert_max_queries_context
 from src.app.crud.user_crud import UserCRUD
 from src.app.main import app
 from src.app.models.base_model import Base
 from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
+from src.app.services.principal_cache import principal_cache
 from src.app.services.user_service import get_hashed_password
 from src.utils.logger import get_logger
 
-sync_engine = create_engine(settings.postgres_sync_uri, echo=True)
+# DB_BACKEND=sqlite の場合は PostgreSQL を使用せず、同期・非同期エンジンで共有するインメモリDBでテストする
+if settings.DB_BACKEND == 'sqlite':
+    TEST_SYNC_URI, TEST_ASYNC_URI = settings.sqlite_sync_uri_memory, settings.sqlite_async_uri_memory
+else:
+    TEST_SYNC_URI, TEST_ASYNC_URI = settings.postgres_sync_uri, settings.postgres_async_uri
+
+sync_engine = build_sync_engine(TEST_SYNC_URI, EngineOptions(echo=True))
 sync_session_local = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 logger = get_logger(__name__)
 
 
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if settings.DB_BACKEND != 'sqlite':
+        return
+    skip_postgres = pytest.mark.skip(reason='PostgreSQL is required (DB_BACKEND=sqlite)')
+    for item in items:
+        if 'postgres' in item.keywords:
+            item.add_marker(skip_postgres)
+
+
 @pytest.fixture(scope='session')
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
@@ -46,42 +63,47 @@ async def client():
 
 
 @pytest.fixture
-def get_test_db() -> Generator[Session, Any, None]:
-    Base.metadata.create_all(bind=sync_engine)
-
-    try:
-        db = sync_session_local()
-        yield db
-    finally:
-        db.close()
-        Base.metadata.drop_all(bind=sync_engine)
+def get_test_db(async_test_engine) -> Generator[Session, Any, None]:
+    # テーブルは async_test_engine で作成するため明示的に依存し、テストごとのトランザクションをロールバックして元に戻す
+    with sync_engine.connect() as conn:
+        transaction = conn.begin()
+        db = sync_session_local(bind=conn, join_transaction_mode='create_savepoint')
+        try:
+            yield db
+        finally:
+            db.close()
+            transaction.rollback()
 
 
 @pytest_asyncio.fixture(scope='session')
 async def async_test_engine():
-    async_engine = create_async_engine(settings.postgres_async_uri, echo=False)
+    """テストセッション全体で使用するエンジン。テーブルは最初に1度だけ作成し、最後に削除する"""
+    async_engine = build_engine(TEST_ASYNC_URI, EngineOptions())
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     yield async_engine
+    async with async_engine.begin() as conn:
+        logger.info('Dropping all tables')
+        await conn.run_sync(Base.metadata.drop_all)
     await async_engine.dispose()
 
 
-@pytest_asyncio.fixture(scope='session')
-async def get_test_db_async(async_test_engine) -> AsyncGenerator[AsyncSession, None]:
-    async_session_local = sessionmaker(class_=AsyncSession, autocommit=False, autoflush=False, bind=async_test_engine)
-    async with async_session_local() as db:
-        async with async_test_engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-
+@pytest_asyncio.fixture
+async def test_connection(async_test_engine) -> AsyncGenerator[AsyncConnection, None]:
+    """テストごとのトランザクションを開始した接続。テスト終了時にロールバックし、テスト中の変更 (DDLを含む) をすべて破棄する"""
+    async with async_test_engine.connect() as conn:
+        transaction = await conn.begin()
         try:
-            yield db
-            await db.commit()
-        except Exception:
-            await db.rollback()
-            raise
+            yield conn
         finally:
-            await db.close()
-            async with async_test_engine.begin() as conn:
-                logger.info('Dropping all tables')
-                await conn.run_sync(Base.metadata.drop_all)
+            await transaction.rollback()
+
+
+@pytest_asyncio.fixture
+async def get_test_db_async(test_connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
+    # セッションの commit / rollback はセーブポイントに対して行われ、テストのトランザクションは終了しない
+    async with AsyncSession(bind=test_connection, autoflush=False, join_transaction_mode='create_savepoint') as db:
+        yield db
 
 
 @pytest_asyncio.fixture
@@ -91,6 +113,22 @@ async def override_get_db_async(get_test_db_async: AsyncSession):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def isolate_principal_cache(monkeypatch: pytest.MonkeyPatch):
+    """テスト間で認証済みユーザーのキャッシュを共有せず、外部のRedisも使わない (ロールバックでIDが再利用されるため)"""
+    monkeypatch.setattr(principal_cache, 'get_redis', None)
+    monkeypatch.setattr(principal_cache, 'get_sync_redis', None)
+    principal_cache.clear_local()
+    yield
+    principal_cache.clear_local()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """with assert_max_queries(2): ... の形で、ブロック内で実行されるクエリ数の上限を検証する"""
+    return assert_max_queries_context
+
+
 @pytest.fixture
 def data_in_user() -> DataInUser:
     faker = Faker()
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, EngineRegistry, build_engine, build_sync_engine, warm_up
+
+
+def test_build_engine_pool_options():
+    """プール関連の設定がエンジンに反映されることを確認するテスト"""
+    options = EngineOptions(pool_size=3, max_overflow=2, pool_timeout=5, pool_recycle=60, pool_pre_ping=True)
+    engine = build_engine(settings.postgres_async_uri, options)
+    pool = engine.pool
+    assert pool.size() == 3
+    assert pool._max_overflow == 2
+    assert pool._timeout == 5
+    assert pool._recycle == 60
+    assert pool._pre_ping is True
+    assert engine.echo is False
+
+
+def test_build_engine_sqlite():
+    """SQLiteではプールサイズの指定を行わずに生成できることを確認するテスト"""
+    engine = build_engine('sqlite+aiosqlite:///:memory:', EngineOptions(pool_size=3))
+    assert engine.dialect.name == 'sqlite'
+
+
+@pytest.mark.asyncio
+async def test_build_engine_sqlite_pragmas(tmp_path):
+    """SQLiteのファイルDBでは WAL・synchronous=NORMAL・mmap などの PRAGMA が接続ごとに設定されることを確認するテスト"""
+    engine = build_engine(f'sqlite+aiosqlite:///{tmp_path}/test.db', EngineOptions(sqlite_mmap_size=1024 * 1024))
+    try:
+        async with engine.connect() as conn:
+            assert await conn.scalar(text('PRAGMA journal_mode')) == 'wal'
+            assert await conn.scalar(text('PRAGMA synchronous')) == 1
+            assert await conn.scalar(text('PRAGMA mmap_size')) == 1024 * 1024
+            assert await conn.scalar(text('PRAGMA foreign_keys')) == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_shared_memory_and_savepoint():
+    """共有キャッシュのインメモリDBを同期・非同期エンジンで共有でき、トランザクション内のDDLとセーブポイントがロールバックされることを確認するテスト"""
+    uri = 'file:test_shared_memory?mode=memory&cache=shared&uri=true'
+    async_engine = build_engine(f'sqlite+aiosqlite:///{uri}', EngineOptions())
+    sync_engine = build_sync_engine(f'sqlite:///{uri}', EngineOptions())
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(text('CREATE TABLE shared_items (name TEXT)'))
+        with sync_engine.begin() as conn:
+            conn.execute(text("INSERT INTO shared_items VALUES ('sync')"))
+
+        async with async_engine.connect() as conn:
+            transaction = await conn.begin()
+            await conn.execute(text('CREATE TABLE rolled_back (id INTEGER)'))
+            savepoint = await conn.begin_nested()
+            await conn.execute(text("INSERT INTO shared_items VALUES ('savepoint')"))
+            await savepoint.rollback()
+            await conn.execute(text("INSERT INTO shared_items VALUES ('async')"))
+            assert (await conn.execute(text('SELECT name FROM shared_items'))).scalars().all() == ['sync', 'async']
+            await transaction.rollback()
+
+        async with async_engine.connect() as conn:
+            assert (await conn.execute(text('SELECT name FROM shared_items'))).scalars().all() == ['sync']
+            tables = (await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))).scalars().all()
+            assert tables == ['shared_items']
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_build_engine_statement_timeout():
+    """statement_timeout が接続時のセッション設定として反映されることを確認するテスト"""
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(statement_timeout_ms=1500))
+    try:
+        async with engine.connect() as conn:
+            assert await conn.scalar(text('SHOW statement_timeout')) == '1500ms'
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_engine_registry():
+    """名前付きエンジンが初回取得時に1度だけ生成され、dispose で接続が閉じられることを確認するテスト"""
+    registry = EngineRegistry()
+    registry.register('primary', settings.postgres_async_uri, EngineOptions())
+    registry.register('worker', settings.postgres_async_uri, EngineOptions().with_overrides(pool_size=1, max_overflow=0))
+    assert registry.names() == ['primary', 'worker']
+
+    primary = registry.get('primary')
+    assert registry.get('primary') is primary
+    assert registry.get('worker').pool.size() == 1
+    with pytest.raises(KeyError):
+        registry.get('unknown')
+    with pytest.raises(ValueError):
+        registry.register('primary', settings.postgres_async_uri, EngineOptions())
+
+    async with primary.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+    assert primary.pool.checkedin() == 1
+    await registry.dispose()
+    assert registry.get('primary') is primary
+    assert primary.pool.checkedin() == 0
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_warm_up_partial_failure_returns_connections(monkeypatch: pytest.MonkeyPatch):
+    """一部の接続に失敗しても確立できた接続はすべてプールに戻し、確立できた数を返すことを確認するテスト"""
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(pool_size=3, max_overflow=0))
+    start = AsyncConnection.start
+    calls = 0
+
+    async def flaky_start(self, is_ctxmanager: bool = False):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError('connection refused')
+        return await start(self, is_ctxmanager)
+
+    monkeypatch.setattr(AsyncConnection, 'start', flaky_start)
+    try:
+        assert await warm_up(engine, 3) == 2
+        assert engine.pool.checkedout() == 0
+        assert engine.pool.checkedin() == 2
+
+        # すべて失敗した場合は例外を送出する (起動時のウォームアップの再試行対象になる)
+        async def refused_start(self, is_ctxmanager: bool = False):
+            raise ConnectionError('connection refused')
+
+        monkeypatch.setattr(AsyncConnection, 'start', refused_start)
+        with pytest.raises(ConnectionError):
+            await warm_up(engine, 3)
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
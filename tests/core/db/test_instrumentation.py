@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, build_engine
+from src.app.core.db.instrumentation import (
+    POOL_CHECKED_OUT,
+    POOL_CHECKOUT_WAIT,
+    POOL_CONNECTION_HOLD,
+    POOL_CONNECTS,
+    POOL_TIMEOUTS,
+)
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_pool_metrics():
+    """接続の取得・返却・タイムアウトがプールのメトリクスに記録されることを確認するテスト"""
+    name = 'test_instrumented'
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(pool_size=1, max_overflow=0, pool_timeout=0.2), name)
+    waits_before = POOL_CHECKOUT_WAIT.count(engine=name)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+            assert POOL_CHECKED_OUT.value(engine=name) == 1
+
+            # プールが枯渇している間の取得はタイムアウトする
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+        assert POOL_CHECKED_OUT.value(engine=name) == 0
+        assert POOL_TIMEOUTS.value(engine=name) == 1
+        assert POOL_CONNECTS.value(engine=name) == 1
+        assert POOL_CHECKOUT_WAIT.count(engine=name) == waits_before + 1
+        # リクエスト外のチェックアウトはルート '-' として集計される
+        assert POOL_CONNECTION_HOLD.count(engine=name, route='-') == 1
+
+        async def hold():
+            async with engine.connect() as conn:
+                await conn.execute(text('SELECT pg_sleep(0.05)'))
+
+        # 空きを待ってから取得した場合は待ち時間が記録される
+        await asyncio.gather(hold(), hold())
+        assert POOL_CHECKOUT_WAIT.sum(engine=name) >= 0.04
+    finally:
+        await engine.dispose()
@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from src.app.core.db.engine import EngineOptions, build_engine
+from src.app.core.db.query_counter import QueryCountMiddleware, assert_max_queries, count_queries
+from src.app.core.db.statements import fingerprint
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = build_engine('sqlite+aiosqlite:///:memory:', EngineOptions())
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_count_queries(engine):
+    """ブロック内のクエリを数え、入れ子にした場合は外側でも数えることを確認するテスト"""
+    async with engine.connect() as conn:
+        with count_queries() as outer:
+            await conn.execute(text('SELECT 1'))
+            with count_queries() as inner:
+                await conn.execute(text('SELECT 2'))
+                await conn.execute(text('SELECT 3'))
+        await conn.execute(text('SELECT 4'))
+    assert outer.count == 3
+    assert inner.count == 2
+    # 同じ形のクエリはリテラルが異なっても同じフィンガープリントで数える
+    assert inner.repeated(2) == {fingerprint('SELECT 2'): 2}
+    assert '2x' in inner.summary()
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries(engine):
+    """クエリ数の上限や同じ形のクエリの繰り返し回数を超えた場合に失敗することを確認するテスト"""
+    async with engine.connect() as conn:
+        with assert_max_queries(2):
+            await conn.execute(text('SELECT 1'))
+            await conn.execute(text('SELECT 2'))
+
+        with pytest.raises(AssertionError, match='Expected at most 1 queries, got 2'):
+            with assert_max_queries(1):
+                await conn.execute(text('SELECT 1'))
+                await conn.execute(text('SELECT 2'))
+
+        with pytest.raises(AssertionError, match='repeated more than 2 times'):
+            with assert_max_queries(10, max_repeats=2):
+                for i in range(3):
+                    await conn.execute(text('SELECT :i'), {'i': i})
+
+
+@pytest.mark.asyncio
+async def test_query_count_middleware(engine, caplog: pytest.LogCaptureFixture):
+    """同じ形のクエリを繰り返したリクエストで、ルートとフィンガープリントを含む警告が出力されることを確認するテスト"""
+    app = FastAPI()
+    app.add_middleware(QueryCountMiddleware, max_queries=10, max_repeats=3)
+
+    @app.get('/items/{count}')
+    async def items(count: int):
+        async with engine.connect() as conn:
+            for i in range(count):
+                await conn.execute(text('SELECT :i'), {'i': i})
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger='src.app.core.db.query_counter'):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            await client.get('/items/2')
+            assert caplog.records == []
+            await client.get('/items/3')
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert 'GET /items/{count} executed 3 queries' in message
+    assert fingerprint('SELECT ?') in message
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import String, create_engine, insert, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from src.app.core.db.routing import PIN_PRIMARY_KEY, RoutingSession, pin_primary
+
+
+class RoutingBase(DeclarativeBase):
+    pass
+
+
+class Note(RoutingBase):
+    __tablename__ = 'routing_test_notes'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    body: Mapped[str] = mapped_column(String(50))
+
+
+@pytest.fixture
+def engines():
+    primary = create_engine('sqlite://')
+    replica = create_engine('sqlite://')
+    for engine, body in ((primary, 'primary'), (replica, 'replica')):
+        RoutingBase.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Note).values(id=1, body=body))
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def read_body(session: RoutingSession) -> str:
+    return session.execute(select(Note.body).where(Note.id == 1)).scalar_one()
+
+
+def test_select_goes_to_replica_until_write(engines):
+    """書き込みを行うまではSELECTがレプリカで実行され、書き込み後はプライマリに固定されることを確認するテスト"""
+    primary, replica = engines
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        assert read_body(session) == 'replica'
+        session.execute(update(Note).where(Note.id == 1).values(body='updated'))
+        session.commit()
+        assert session.info[PIN_PRIMARY_KEY] is True
+        assert read_body(session) == 'updated'
+
+
+def test_flush_pins_primary(engines):
+    """ORMのflushでもプライマリに固定されることを確認するテスト"""
+    primary, replica = engines
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        session.add(Note(id=2, body='new'))
+        session.commit()
+        assert session.execute(select(Note.body).where(Note.id == 2)).scalar_one() == 'new'
+
+
+def test_for_update_and_pin_primary(engines):
+    """FOR UPDATE付きのSELECTと明示的な固定ではプライマリが使われることを確認するテスト"""
+    primary, replica = engines
+    with RoutingSession(primary=primary, replicas=[replica]) as session:
+        assert session.execute(select(Note.body).with_for_update()).scalar_one() == 'primary'
+        assert read_body(session) == 'replica'
+        pin_primary(session)
+        assert read_body(session) == 'primary'
+
+
+def test_without_replicas(engines):
+    """レプリカ未設定の場合はすべてプライマリで実行されることを確認するテスト"""
+    primary, _ = engines
+    with RoutingSession(primary=primary) as session:
+        assert read_body(session) == 'primary'
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, build_engine
+from src.app.core.db.slow_query import SlowQueryLog, install_slow_query_log, slow_query_logs
+from src.app.core.db.statements import fingerprint, normalize_statement, parameters_shape
+from src.app.crud.social_account_crud import SocialAccountCRUD
+from src.app.domains.users.schemas.user_schemas import Email
+from src.app.infrastructures.users.repositories.user_repository_impl import UserRepositoryImpl
+
+
+def test_fingerprint_ignores_literals_and_list_sizes():
+    """リテラルやIN句の要素数が異なっても同じフィンガープリントになることを確認するテスト"""
+    first = 'SELECT users.id FROM users WHERE users.id IN ($1, $2) AND users.name = $3 LIMIT 10'
+    second = 'SELECT users.id FROM users  WHERE users.id IN ($1, $2, $3, $4) AND users.name = $5 LIMIT 20'
+    assert normalize_statement(first) == 'SELECT users.id FROM users WHERE users.id IN (...) AND users.name = ? LIMIT ?'
+    assert fingerprint(first) == fingerprint(second)
+    assert fingerprint(first) != fingerprint('SELECT users.email FROM users WHERE users.id = $1')
+
+
+def test_parameters_shape():
+    """パラメータの値を含めず、型と件数のみを返すことを確認するテスト"""
+    assert parameters_shape((1, 'secret@example.com', [1, 2, 3])) == ['int', 'str', 'list[3]']
+    assert parameters_shape({'email': 'secret@example.com'}) == {'email': 'str'}
+    assert parameters_shape([(1, 'a'), (2, 'b')], executemany=True) == {'rows': 2, 'row': ['int', 'str']}
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_slow_query_log(get_test_db_async: AsyncSession):
+    """閾値を超えたクエリが呼び出し元のメソッド名とともに記録され、EXPLAINのプランが添付されることを確認するテスト"""
+    engine = build_engine(settings.postgres_async_uri, EngineOptions())
+    slow_query_log = install_slow_query_log(engine, 'test_slow', threshold_ms=0, explain_sample_rate=1.0)
+    try:
+        async with AsyncSession(engine) as session:
+            assert await SocialAccountCRUD(session).exists_async(provider='google') is False
+            assert await UserRepositoryImpl(session).email_exists(Email(email='slow@example.com')) is False
+            assert await UserRepositoryImpl(session).find_by_email(Email(email='slow@example.com')) is None
+        await slow_query_log.wait_explains()
+
+        callers = [record.caller for record in slow_query_log.records]
+        assert 'SocialAccountCRUD.exists_async' in callers
+        assert 'UserRepositoryImpl.email_exists' in callers
+        assert 'UserRepositoryImpl.find_by_email' in callers
+        record = next(record for record in slow_query_log.records if record.caller == 'UserRepositoryImpl.email_exists')
+        assert record.parameters == ['str']
+        assert 'slow@example.com' not in record.statement
+        assert record.plan is not None and 'actual time' in record.plan
+        # EXPLAIN 自体は記録されない
+        assert not any(record.statement.startswith('EXPLAIN') for record in slow_query_log.records)
+    finally:
+        await engine.dispose()
+
+
+def test_build_engine_installs_slow_query_log():
+    """slow_query_ms を指定した名前付きエンジンにはスロークエリログが設定されることを確認するテスト"""
+    build_engine(settings.postgres_async_uri, EngineOptions(slow_query_ms=100), 'test_slow_installed')
+    assert isinstance(slow_query_logs['test_slow_installed'], SlowQueryLog)
+    assert slow_query_logs['test_slow_installed'].threshold_ms == 100
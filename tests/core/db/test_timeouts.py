@@ -0,0 +1,183 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.app.core.config import settings
+from src.app.core.db import timeouts
+from src.app.core.db.engine import EngineOptions, build_engine
+from src.app.core.db.routing import RoutingSession
+from src.app.core.db.timeouts import db_time_budget, db_time_budget_scope, is_statement_timeout
+from src.app.crud.loaders import DataLoader
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(pool_size=2, max_overflow=0))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, primary=engine.sync_engine)
+
+
+def build_app(session_factory: async_sessionmaker, timeout_ms: int, cancel_on_disconnect: bool = False) -> FastAPI:
+    app = FastAPI()
+
+    async def get_db():
+        async with session_factory() as session:
+            yield session
+
+    @app.get('/sleep/{seconds}', dependencies=[Depends(db_time_budget(timeout_ms, cancel_on_disconnect))])
+    async def sleep(seconds: float, db: AsyncSession = Depends(get_db)):
+        await db.execute(text('SELECT pg_sleep(:seconds)'), {'seconds': seconds})
+        return {'slept': seconds}
+
+    async def get_loader(db: AsyncSession = Depends(get_db)):
+        async def batch_load(keys: list[int]) -> dict[int, float]:
+            await db.execute(text('SELECT pg_sleep(:seconds)'), {'seconds': keys[0]})
+            return {key: key for key in keys}
+
+        loader = DataLoader(batch_load)
+        try:
+            yield loader
+        finally:
+            await loader.close()
+
+    # DataLoader のバッチ取得 (別タスク) でクエリを実行するルート
+    @app.get('/load/{seconds}', dependencies=[Depends(db_time_budget(timeout_ms, cancel_on_disconnect))])
+    async def load(seconds: int, loader: DataLoader[int, float] = Depends(get_loader)):
+        return {'slept': await loader.load(seconds)}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_budget_sets_statement_timeout(session_factory):
+    """時間予算の残り時間がトランザクションごとに statement_timeout として設定され、予算外では設定されないことを確認するテスト"""
+    async with session_factory() as session:
+        with db_time_budget_scope(2000):
+            timeout = (await session.execute(text('SHOW statement_timeout'))).scalar_one()
+            assert 1000 < int(timeout.removesuffix('ms')) <= 2000
+            await session.commit()
+        assert (await session.execute(text('SHOW statement_timeout'))).scalar_one() == '0'
+
+
+@pytest.mark.asyncio
+async def test_budget_within_baseline_skips_set_local():
+    """接続時の statement_timeout より予算の残り時間が長い場合は SET LOCAL を発行しないことを確認するテスト"""
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(pool_size=1, max_overflow=0, statement_timeout_ms=3000))
+    statements: list[str] = []
+    event.listen(engine.sync_engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    session_factory = async_sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession, primary=engine.sync_engine)
+    try:
+        async with session_factory() as session:
+            with db_time_budget_scope(10000):
+                assert (await session.execute(text('SHOW statement_timeout'))).scalar_one() == '3s'
+                await session.commit()
+            assert not any(statement.startswith('SET LOCAL') for statement in statements)
+
+            with db_time_budget_scope(1000):
+                timeout = (await session.execute(text('SHOW statement_timeout'))).scalar_one()
+                assert int(timeout.removesuffix('ms')) <= 1000
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_disabled_budget_is_noop():
+    """予算が 0 の場合は時間予算を設定しないことを確認するテスト"""
+    app = FastAPI()
+
+    @app.get('/budget')
+    async def budget(value=Depends(db_time_budget(0))):
+        return {'budget': value, 'current': timeouts.current_db_time_budget()}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        assert (await client.get('/budget')).json() == {'budget': None, 'current': None}
+
+
+@pytest.mark.asyncio
+async def test_budget_cancels_slow_query(session_factory):
+    """時間予算を超えたクエリがサーバー側でキャンセルされることを確認するテスト"""
+    async with session_factory() as session:
+        with db_time_budget_scope(100):
+            start = time.monotonic()
+            with pytest.raises(DBAPIError) as exc_info:
+                await session.execute(text('SELECT pg_sleep(5)'))
+        assert is_statement_timeout(exc_info.value)
+        assert time.monotonic() - start < 2
+
+
+@pytest.mark.asyncio
+async def test_route_budget_returns_503(engine, session_factory):
+    """ルートの時間予算を超えた場合は 503 を返し、接続がプールに返却されることを確認するテスト"""
+    app = build_app(session_factory, timeout_ms=200)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        assert (await client.get('/sleep/0')).status_code == 200
+        response = await client.get('/sleep/5')
+    assert response.status_code == 503
+    assert response.json() == {'detail': 'Database time budget exceeded'}
+    assert engine.pool.checkedout() == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('path', ['/sleep/10', '/load/10'])
+async def test_client_disconnect_cancels_query(engine, session_factory, monkeypatch, path: str):
+    """クライアントが切断した場合にリクエストの処理とサーバー側のクエリがキャンセルされることを確認するテスト
+    DataLoader のバッチ取得中の場合も、セッションを閉じる前にバッチ取得のタスクがキャンセルされる
+    """
+    monkeypatch.setattr(timeouts, 'DISCONNECT_POLL_INTERVAL', 0.05)
+    app = build_app(session_factory, timeout_ms=10000, cancel_on_disconnect=True)
+    disconnected = asyncio.Event()
+    sent: list[dict] = []
+
+    async def receive():
+        if not sent:
+            sent.append({'type': 'http.request'})
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'test')],
+        'client': ('127.0.0.1', 12345),
+        'server': ('test', 80),
+    }
+    request_task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.sleep(0.3)
+    assert engine.pool.checkedout() == 1
+
+    start = time.monotonic()
+    disconnected.set()
+    with pytest.raises(asyncio.CancelledError):
+        await request_task
+    assert time.monotonic() - start < 2
+    assert engine.pool.checkedout() == 0
+
+    async with engine.connect() as conn:
+        running = await conn.scalar(
+            text("SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND query LIKE 'SELECT pg_sleep(%'")
+        )
+    assert running == 0
@@ -0,0 +1,132 @@
+import asyncio
+
+import bcrypt
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from src.app.core.admission import ADMISSION_REJECTIONS, AdmissionController, AdmissionRejectedError, admission_rejected_handler
+from src.app.core.password_hasher import PasswordHasher
+
+
+async def hold(controller: AdmissionController, event: asyncio.Event, order: list[int], index: int) -> None:
+    async with controller.admit():
+        order.append(index)
+        await event.wait()
+
+
+@pytest.mark.asyncio
+async def test_admits_in_order_up_to_max_concurrent():
+    """同時実行数までは即座に、超えた分は到着順に実行されることを確認するテスト"""
+    controller = AdmissionController('test', max_concurrent=2, max_queue=10, queue_timeout_ms=1000)
+    event = asyncio.Event()
+    order: list[int] = []
+    tasks = [asyncio.create_task(hold(controller, event, order, i)) for i in range(4)]
+    await asyncio.sleep(0)
+    assert order == [0, 1]
+    assert (controller.in_flight, controller.queue_depth) == (2, 2)
+
+    event.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3]
+    assert (controller.in_flight, controller.queue_depth) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full_or_deadline_passes():
+    """待ち行列が満杯の場合は即座に、期限を過ぎた場合はその時点で拒否されることを確認するテスト"""
+    controller = AdmissionController('test_reject', max_concurrent=1, max_queue=1, queue_timeout_ms=50)
+    event = asyncio.Event()
+    running = asyncio.create_task(hold(controller, event, [], 0))
+    queued = asyncio.create_task(hold(controller, event, [], 1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        await controller.acquire()
+    assert exc_info.value.reason == 'queue_full'
+    assert exc_info.value.retry_after >= 1
+
+    with pytest.raises(AdmissionRejectedError, match='queue_timeout'):
+        await queued
+    assert controller.rejections == {'queue_full': 1, 'queue_timeout': 1}
+    assert ADMISSION_REJECTIONS.value(controller='test_reject', reason='queue_full') == 1
+    assert controller.queue_depth == 0
+
+    event.set()
+    await running
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    """待機中にキャンセルされた操作が枠を消費しないことを確認するテスト"""
+    controller = AdmissionController('test', max_concurrent=1, max_queue=10, queue_timeout_ms=1000)
+    event = asyncio.Event()
+    order: list[int] = []
+    running = asyncio.create_task(hold(controller, event, order, 0))
+    cancelled = asyncio.create_task(hold(controller, event, order, 1))
+    waiting = asyncio.create_task(hold(controller, event, order, 2))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    event.set()
+    await asyncio.gather(running, waiting)
+    assert order == [0, 2]
+    assert (controller.in_flight, controller.queue_depth) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rejected_hash_does_not_run_bcrypt(monkeypatch: pytest.MonkeyPatch):
+    """拒否された操作は bcrypt を実行せず、Retry-After付きの 503 に変換されることを確認するテスト"""
+    calls = 0
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def hashpw(password: bytes, salt: bytes) -> bytes:
+        nonlocal calls
+        calls += 1
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        return b'hashed'
+
+    monkeypatch.setattr(bcrypt, 'hashpw', hashpw)
+    hasher = PasswordHasher(1, AdmissionController('test_hasher', max_concurrent=1, max_queue=0, queue_timeout_ms=1000))
+    app = FastAPI()
+    app.add_exception_handler(AdmissionRejectedError, admission_rejected_handler)
+
+    @app.post('/hash')
+    async def hash_password():
+        return {'hashed': await hasher.hash('Password1!')}
+
+    try:
+        running = asyncio.create_task(hasher.hash('Password1!'))
+        await asyncio.sleep(0.01)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+            response = await client.post('/hash')
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert calls == 1
+
+        release.set()
+        assert await running == 'hashed'
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('timeout', [False, True])
+async def test_cancel_or_timeout_racing_with_release(timeout: bool):
+    """待機中の操作のキャンセル (期限切れ) と枠の解放が同時に起きても、本来の例外が送出され枠が漏れないことを確認するテスト"""
+    controller = AdmissionController('test_race', max_concurrent=1, max_queue=10, queue_timeout_ms=10 if timeout else 10_000)
+    await controller.acquire()
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    # wait_for が待機中の Future をキャンセルしてから acquire() の except に戻るまでの間に release() が実行される状況を再現する
+    controller._waiters[0].add_done_callback(lambda _: controller.release())
+
+    if timeout:
+        with pytest.raises(AdmissionRejectedError, match='queue_timeout'):
+            await waiting
+    else:
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+    assert (controller.in_flight, controller.queue_depth) == (0, 0)
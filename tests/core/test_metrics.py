@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from src.app.core.metrics import MetricsRegistry, RouteContextMiddleware, current_route
+
+
+def test_counter_and_gauge():
+    """ラベルごとにカウンターとゲージの値が集計されることを確認するテスト"""
+    registry = MetricsRegistry()
+    counter = registry.counter('requests_total', 'Requests')
+    counter.inc(route='/a')
+    counter.inc(2, route='/a')
+    counter.inc(route='/b')
+    assert counter.value(route='/a') == 3
+    assert registry.counter('requests_total', 'Requests') is counter
+
+    gauge = registry.gauge('in_use', 'In use')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.value() == 1
+    gauge.set(5)
+    assert gauge.value() == 5
+
+    with pytest.raises(ValueError):
+        registry.gauge('requests_total', 'Requests')
+
+
+def test_histogram_render():
+    """ヒストグラムが累積バケット・合計・件数としてテキスト形式で出力されることを確認するテスト"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram('wait_seconds', 'Wait', buckets=(0.1, 1.0))
+    histogram.observe(0.05, engine='primary')
+    histogram.observe(0.5, engine='primary')
+    histogram.observe(3, engine='primary')
+    assert histogram.count(engine='primary') == 3
+    assert histogram.sum(engine='primary') == pytest.approx(3.55)
+
+    rendered = registry.render()
+    assert '# TYPE wait_seconds histogram' in rendered
+    assert 'wait_seconds_bucket{engine="primary",le="0.1"} 1' in rendered
+    assert 'wait_seconds_bucket{engine="primary",le="1.0"} 2' in rendered
+    assert 'wait_seconds_bucket{engine="primary",le="+Inf"} 3' in rendered
+    assert 'wait_seconds_count{engine="primary"} 3' in rendered
+
+
+def test_render_while_updating():
+    """他のスレッドがラベルやメトリクスを追加している間も出力でき、件数とバケットが一致することを確認するテスト"""
+    registry = MetricsRegistry()
+    counter = registry.counter('updates_total', 'Updates')
+    histogram = registry.histogram('update_seconds', 'Update', buckets=(0.5,))
+    stop = threading.Event()
+
+    def update() -> None:
+        i = 0
+        while not stop.is_set():
+            counter.inc(key=i % 100)
+            histogram.observe(i % 2, key=i % 50)
+            registry.gauge(f'gauge_{i % 1000}', 'Gauge').set(i)
+            i += 1
+
+    thread = threading.Thread(target=update)
+    thread.start()
+    try:
+        for _ in range(50):
+            lines = registry.render().splitlines()
+            counts = {line.split()[0]: line.split()[1] for line in lines if line.startswith('update_seconds_count')}
+            infs = {line.split()[0]: line.split()[1] for line in lines if 'le="+Inf"' in line}
+            assert sorted(counts.values()) == sorted(infs.values())
+    finally:
+        stop.set()
+        thread.join()
+
+
+@pytest.mark.asyncio
+async def test_route_context_middleware():
+    """ミドルウェア配下ではルーティング後のパステンプレートが取得できることを確認するテスト"""
+    app = FastAPI()
+    app.add_middleware(RouteContextMiddleware)
+
+    @app.get('/items/{item_id}')
+    async def read_item(item_id: int):
+        return {'route': current_route()}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        response = await client.get('/items/1')
+    assert response.json() == {'route': '/items/{item_id}'}
+    assert current_route() == '-'
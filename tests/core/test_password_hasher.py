@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import bcrypt
+import pytest
+from src.app.core.password_hasher import PASSWORD_HASH_WAIT, PasswordHasher, bcrypt_rounds, rounds_for_target
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify(hasher: PasswordHasher):
+    """スレッドプールで計算したハッシュが bcrypt の形式で、検証できることを確認するテスト"""
+    hashed_password = await hasher.hash('Password1!')
+    assert bcrypt.checkpw(b'Password1!', hashed_password.encode('utf-8'))
+    assert await hasher.verify('Password1!', hashed_password)
+    assert not await hasher.verify('Password2!', hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_does_not_block_event_loop(hasher: PasswordHasher):
+    """ハッシュ計算中もイベントループが他のコルーチンを実行できることを確認するテスト"""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        await hasher.hash('Password1!')
+    finally:
+        task.cancel()
+    assert ticks > 0
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_and_wait_metrics(hasher: PasswordHasher, monkeypatch: pytest.MonkeyPatch):
+    """プールのサイズを超えた操作が待ち行列に入り、待ち時間が記録されることを確認するテスト"""
+    monkeypatch.setattr(bcrypt, 'hashpw', lambda password, salt: time.sleep(0.05) or b'hashed')
+    waits = PASSWORD_HASH_WAIT.count(operation='hash')
+
+    tasks = [asyncio.create_task(hasher.hash('Password1!')) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert hasher.queue_depth == 2
+
+    assert await asyncio.gather(*tasks) == ['hashed'] * 3
+    assert hasher.queue_depth == 0
+    assert PASSWORD_HASH_WAIT.count(operation='hash') == waits + 3
+    assert PASSWORD_HASH_WAIT.sum(operation='hash') > 0.05
+
+
+def test_rounds_for_target():
+    """目標時間以内に収まる最大のコストを、最小値・最大値の範囲で選ぶことを確認するテスト"""
+    # コスト10で40msの場合、11は80ms・12は160ms・13は320ms
+    assert rounds_for_target(40, 10, 250, 10, 14) == 12
+    assert rounds_for_target(40, 10, 1000, 10, 12) == 12
+    # 最小のコストでも目標時間を超える場合は最小値を使う
+    assert rounds_for_target(400, 10, 250, 10, 14) == 10
+
+
+@pytest.mark.asyncio
+async def test_calibrate_and_needs_rehash(hasher: PasswordHasher):
+    """計測したコストでハッシュ化し、コストがポリシーの範囲外のハッシュのみを再ハッシュ対象と判定することを確認するテスト"""
+    hasher.min_rounds, hasher.max_rounds = 4, 5
+    assert await hasher.calibrate(target_ms=0) == 4
+    hashed_password = await hasher.hash('Password1!')
+    assert bcrypt_rounds(hashed_password) == 4
+    assert not hasher.needs_rehash(hashed_password)
+
+    # 範囲内であれば現在のコストと異なっていても再ハッシュしない
+    hasher.rounds = 5
+    assert not hasher.needs_rehash(hashed_password)
+    hasher.min_rounds = 5
+    assert hasher.needs_rehash(hashed_password)
+    assert hasher.needs_rehash(bcrypt.hashpw(b'Password1!', bcrypt.gensalt(6)).decode('utf-8'))
+    assert hasher.needs_rehash('not-a-bcrypt-hash')
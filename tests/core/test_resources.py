@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+from sqlalchemy import text
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, build_engine, warm_up
+from src.app.core.password_hasher import password_hasher
+from src.app.core.resources import AppResources
+from src.app.services.google_certs_service import GOOGLE_OAUTH2_CERTS_URL, google_certs_request
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_warm_up():
+    """指定した数 (pool_size が上限) の接続が確立され、プールに保持されることを確認するテスト"""
+    engine = build_engine(settings.postgres_async_uri, EngineOptions(pool_size=3, max_overflow=5))
+    try:
+        assert await warm_up(engine, 10) == 3
+        assert engine.pool.checkedin() == 3
+        async with engine.connect() as conn:
+            assert await conn.scalar(text('SELECT 1')) == 1
+        assert engine.pool.checkedin() == 3
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_startup_and_shutdown(monkeypatch: pytest.MonkeyPatch):
+    """起動処理の完了後にレディネスが有効になり、終了処理で無効になることを確認するテスト"""
+    resources = AppResources()
+
+    async def ping_unavailable():
+        raise ConnectionError('redis is not available')
+
+    monkeypatch.setattr(resources.get_redis(), 'ping', ping_unavailable)
+    # 起動時のキャリブレーションで変更される bcrypt のコストをテスト後に戻す
+    monkeypatch.setattr(settings, 'PASSWORD_HASH_CALIBRATE', True)
+    monkeypatch.setattr(password_hasher, 'rounds', password_hasher.rounds)
+    assert resources.ready is False
+    with respx.mock:
+        respx.get(GOOGLE_OAUTH2_CERTS_URL).mock(return_value=httpx.Response(200, json={'kid': 'cert'}))
+        await resources.startup()
+    # Redisに接続できなくてもDBのウォームアップが完了していればレディネスを有効にする
+    assert resources.ready is True
+    assert google_certs_request.cached(GOOGLE_OAUTH2_CERTS_URL) is not None
+    assert settings.PASSWORD_HASH_MIN_ROUNDS <= password_hasher.rounds <= settings.PASSWORD_HASH_MAX_ROUNDS
+
+    await resources.shutdown()
+    assert resources.ready is False
+    assert resources.http_client is None
+    assert resources.redis is None
+
+
+@pytest.mark.asyncio
+async def test_startup_retries_failed_warm_up(monkeypatch: pytest.MonkeyPatch):
+    """起動時にDBに接続できなかった場合も、バックグラウンドの再試行が成功した時点でレディネスが有効になることを確認するテスト"""
+    resources = AppResources()
+    attempts = 0
+
+    async def flaky_warm_up(engine, connections):
+        nonlocal attempts
+        attempts += 1
+        if attempts <= 2:
+            raise ConnectionError('database is not available')
+        return connections
+
+    async def ping():
+        return True
+
+    monkeypatch.setattr('src.app.core.resources.warm_up', flaky_warm_up)
+    monkeypatch.setattr('src.app.core.resources.engines.names', lambda prefix: [])
+    monkeypatch.setattr(settings, 'DB_WARMUP_RETRY_INTERVAL', 0.01)
+    monkeypatch.setattr(resources.get_redis(), 'ping', ping)
+    with respx.mock:
+        respx.get(GOOGLE_OAUTH2_CERTS_URL).mock(return_value=httpx.Response(200, json={'kid': 'cert'}))
+        await resources.startup()
+    assert resources.ready is False
+
+    for _ in range(100):
+        if resources.ready:
+            break
+        await asyncio.sleep(0.01)
+    assert resources.ready is True
+    assert attempts == 3
+
+    await resources.shutdown()
+    assert resources.ready is False
+
+
+def test_redis_client_has_timeouts():
+    """共有のRedisクライアントに接続・応答のタイムアウトが設定されていることを確認するテスト"""
+    kwargs = AppResources().get_redis().connection_pool.connection_kwargs
+    assert kwargs['socket_connect_timeout'] == settings.REDIS_CONNECT_TIMEOUT
+    assert kwargs['socket_timeout'] == settings.REDIS_SOCKET_TIMEOUT
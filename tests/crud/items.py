@@ -0,0 +1,59 @@
+"""SQLAlchemyCRUD のテストで共有するテスト専用のモデル・スキーマ・CRUD"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel
+from sqlalchemy import DateTime, String, UniqueConstraint
+from sqlalchemy.orm import DeclarativeBase, Mapped, MappedAsDataclass, mapped_column
+from src.app.crud.base_crud import SQLAlchemyCRUD
+
+
+class ItemBase(MappedAsDataclass, DeclarativeBase):
+    """SQLAlchemyCRUDの汎用処理を検証するためのテスト専用ベース"""
+
+    pass
+
+
+class Item(ItemBase):
+    __tablename__ = 'crud_test_items'
+
+    id: Mapped[int] = mapped_column(autoincrement=True, primary_key=True, init=False)
+    name: Mapped[str] = mapped_column(String(50))
+    category: Mapped[str] = mapped_column(String(50))
+    secret: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    is_active: Mapped[bool] = mapped_column(default=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default_factory=lambda: datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+    )
+
+    __table_args__ = (UniqueConstraint('category', 'name'),)
+
+
+class CreateItem(BaseModel):
+    name: str
+    category: str
+    secret: str | None = None
+
+
+class UpdateItem(BaseModel):
+    name: str | None = None
+    category: str | None = None
+
+
+class ReadItem(BaseModel):
+    id: int
+    name: str
+    category: str
+    is_active: bool
+    created_at: datetime
+
+
+class ItemCRUD(SQLAlchemyCRUD[CreateItem, ReadItem]):
+    def __init__(self, db_session):
+        super().__init__(db_session, Item, ReadItem)
+
+
+def make_items(count: int, category: str = 'default') -> list[CreateItem]:
+    return [CreateItem(name=f'item_{i}', category=category, secret=f'secret_{i}') for i in range(count)]
@@ -0,0 +1,277 @@
+import pytest
+import pytest_asyncio
+from pydantic import BaseModel
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.crud.base_crud import CRUDException, SQLAlchemyCRUD
+from src.app.crud.converters import get_converter
+
+from tests.crud.items import CreateItem, Item, ItemBase, ItemCRUD, ReadItem, UpdateItem, make_items
+
+
+@pytest_asyncio.fixture
+async def item_crud(test_connection, get_test_db_async: AsyncSession):
+    # テーブルはテストのトランザクション内で作成し、テスト終了時のロールバックで削除される
+    await test_connection.run_sync(ItemBase.metadata.create_all)
+    return ItemCRUD(get_test_db_async)
+
+
+class TestCreateMany:
+    @pytest.mark.asyncio
+    async def test_create_many_async(self, item_crud: ItemCRUD):
+        """複数行を一括作成し、作成順に出力モデルが返ることを確認するテスト"""
+        result = await item_crud.create_many_async(make_items(25), chunk_size=10)
+        assert len(result) == 25
+        assert [item.name for item in result] == [f'item_{i}' for i in range(25)]
+        assert all(isinstance(item, ReadItem) for item in result)
+        # dataclassのデフォルト値が補完されていること
+        assert all(item.is_active is True for item in result)
+        assert all(item.created_at is not None for item in result)
+
+        db_result = await item_crud.db_session.execute(select(Item.secret).order_by(Item.id))
+        assert db_result.scalars().all() == [f'secret_{i}' for i in range(25)]
+
+    @pytest.mark.asyncio
+    async def test_create_many_async_empty(self, item_crud: ItemCRUD):
+        """空の入力では何も作成しないことを確認するテスト"""
+        assert await item_crud.create_many_async([]) == []
+
+    @pytest.mark.postgres
+    @pytest.mark.asyncio
+    async def test_create_many_async_rollback(self, item_crud: ItemCRUD):
+        """途中のチャンクで失敗した場合、全体がロールバックされることを確認するテスト"""
+        items = make_items(5)
+        items.append(CreateItem(name='x' * 100, category='default'))
+        with pytest.raises(Exception):
+            await item_crud.create_many_async(items, chunk_size=5)
+
+        db_result = await item_crud.db_session.execute(select(Item))
+        assert db_result.scalars().all() == []
+
+
+class TestReadPage:
+    @pytest.mark.asyncio
+    async def test_read_page_async_by_id(self, item_crud: ItemCRUD):
+        """カーソルをたどって全件を重複なく取得できることを確認するテスト"""
+        created = await item_crud.create_many_async(make_items(25))
+        seen = []
+        cursor = None
+        while True:
+            page = await item_crud.read_page_async(after=cursor, limit=10)
+            seen.extend(item.id for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == [item.id for item in created]
+
+    @pytest.mark.asyncio
+    async def test_read_page_async_by_column_descending(self, item_crud: ItemCRUD):
+        """ID以外の列で降順に並べた場合も (列, ID) のキーセットで取得できることを確認するテスト"""
+        await item_crud.create_many_async(make_items(6, category='a') + make_items(6, category='b'))
+        first = await item_crud.read_page_async(limit=8, order_by='category', descending=True)
+        assert [item.category for item in first.items] == ['b'] * 6 + ['a'] * 2
+        assert first.next_cursor is not None
+
+        second = await item_crud.read_page_async(after=first.next_cursor, limit=8, order_by='category', descending=True)
+        assert [item.category for item in second.items] == ['a'] * 4
+        assert second.next_cursor is None
+        ids = [item.id for item in first.items + second.items]
+        assert len(set(ids)) == 12
+
+    @pytest.mark.asyncio
+    async def test_read_page_async_with_filters(self, item_crud: ItemCRUD):
+        """フィルタ条件を指定したページ取得のテスト"""
+        await item_crud.create_many_async(make_items(3, category='a') + make_items(3, category='b'))
+        page = await item_crud.read_page_async(limit=10, filters={'category': 'b'})
+        assert [item.category for item in page.items] == ['b'] * 3
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_read_page_async_invalid_cursor(self, item_crud: ItemCRUD):
+        """不正なカーソルや並び替え列と一致しないカーソルを拒否することを確認するテスト"""
+        await item_crud.create_many_async(make_items(3))
+        page = await item_crud.read_page_async(limit=1)
+        with pytest.raises(CRUDException):
+            await item_crud.read_page_async(after='invalid', limit=1)
+        with pytest.raises(CRUDException):
+            await item_crud.read_page_async(after=page.next_cursor, limit=1, order_by='name')
+        with pytest.raises(CRUDException):
+            await item_crud.read_page_async(limit=1, order_by='unknown')
+
+
+class TestStream:
+    @pytest.mark.asyncio
+    async def test_stream_async(self, item_crud: ItemCRUD):
+        """サーバーサイドカーソルで全件を順に取得できることを確認するテスト"""
+        await item_crud.create_many_async(make_items(7, category='a') + make_items(3, category='b'))
+        names = [item.name async for item in item_crud.stream_async(yield_per=3)]
+        assert len(names) == 10
+
+        filtered = [item async for item in item_crud.stream_async({'category': 'b'}, yield_per=2)]
+        assert [item.category for item in filtered] == ['b'] * 3
+
+
+class TestUpdateDelete:
+    @pytest.mark.asyncio
+    async def test_update_async_partial(self, item_crud: ItemCRUD):
+        """明示的に指定したフィールドのみが更新されることを確認するテスト"""
+        [item] = await item_crud.create_many_async(make_items(1))
+        updated = await item_crud.update_async(item.id, UpdateItem(category='updated'))
+        assert updated is not None
+        assert updated.category == 'updated'
+        assert updated.name == item.name
+
+        # 永続化されていること
+        db_result = await item_crud.db_session.execute(select(Item.category, Item.name).where(Item.id == item.id))
+        assert db_result.one() == ('updated', item.name)
+
+    @pytest.mark.asyncio
+    async def test_update_async_with_dict(self, item_crud: ItemCRUD):
+        """辞書による更新のテスト"""
+        [item] = await item_crud.create_many_async(make_items(1))
+        updated = await item_crud.update_async(item.id, {'is_active': False})
+        assert updated.is_active is False
+
+    @pytest.mark.asyncio
+    async def test_update_async_not_found(self, item_crud: ItemCRUD):
+        """存在しないIDの更新ではNoneを返すことを確認するテスト"""
+        assert await item_crud.update_async(9999, UpdateItem(name='missing')) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_async(self, item_crud: ItemCRUD):
+        """削除と存在しないIDの削除のテスト"""
+        [item] = await item_crud.create_many_async(make_items(1))
+        await item_crud.delete_async(item.id)
+        assert await item_crud.read_async(item.id) is None
+
+        with pytest.raises(CRUDException):
+            await item_crud.delete_async(item.id)
+
+
+class TestUpsert:
+    @pytest.mark.asyncio
+    async def test_upsert_async(self, item_crud: ItemCRUD):
+        """一意制約に衝突しない場合は作成、衝突した場合は指定列のみ更新されることを確認するテスト"""
+        created = await item_crud.upsert_async(
+            CreateItem(name='item', category='a', secret='first'), conflict_cols=('category', 'name'), update_cols=('secret',)
+        )
+        upserted = await item_crud.upsert_async(
+            CreateItem(name='item', category='a', secret='second'),
+            conflict_cols=('category', 'name'),
+            update_cols=('secret',),
+            update_values={'is_active': False},
+        )
+        assert upserted.id == created.id
+        assert upserted.is_active is False
+        assert upserted.created_at == created.created_at
+
+        db_result = await item_crud.db_session.execute(select(func.count(), func.max(Item.secret)).select_from(Item))
+        assert db_result.one() == (1, 'second')
+
+
+class TestReadMany:
+    @pytest.mark.asyncio
+    async def test_read_many_async(self, item_crud: ItemCRUD):
+        """複数IDを1クエリで取得し、存在しないIDは無視されることを確認するテスト"""
+        created = await item_crud.create_many_async(make_items(5))
+        ids = [created[3].id, created[0].id, 9999]
+        result = await item_crud.read_many_async(ids)
+        assert sorted(item.id for item in result) == sorted([created[0].id, created[3].id])
+        assert await item_crud.read_many_async([]) == []
+
+
+class TestCount:
+    @pytest.mark.asyncio
+    async def test_count_async(self, item_crud: ItemCRUD):
+        """フィルタ条件に一致する件数を取得できることを確認するテスト"""
+        assert await item_crud.count_async() == 0
+        await item_crud.create_many_async(make_items(4, category='a') + make_items(2, category='b'))
+        assert await item_crud.count_async() == 6
+        assert await item_crud.count_async(category='b') == 2
+        assert await item_crud.count_async(category='c') == 0
+
+    @pytest.mark.postgres
+    @pytest.mark.asyncio
+    async def test_estimated_count_async(self, item_crud: ItemCRUD, monkeypatch: pytest.MonkeyPatch):
+        """統計情報がない場合や小さなテーブルでは正確な件数、ANALYZE後は推定件数を返すことを確認するテスト"""
+        await item_crud.create_many_async(make_items(30))
+        assert await item_crud.estimated_count_async() == 30
+
+        monkeypatch.setattr(ItemCRUD, 'EXACT_COUNT_THRESHOLD', 1)
+        await item_crud.create_many_async(make_items(5, category='other'))
+        await item_crud.db_session.execute(text(f'ANALYZE {Item.__tablename__}'))
+        # ANALYZE 後に追加した行は推定値に含まれない
+        await item_crud.create_many_async(make_items(5, category='after_analyze'))
+        assert await item_crud.estimated_count_async() == 35
+        assert await item_crud.count_async() == 40
+
+
+class TestExists:
+    @pytest.mark.asyncio
+    async def test_exists_async(self, item_crud: ItemCRUD):
+        """フィルタ条件に一致する行の有無を確認できることを確認するテスト"""
+        assert await item_crud.exists_async() is False
+        await item_crud.create_many_async(make_items(2, category='a'))
+        assert await item_crud.exists_async() is True
+        assert await item_crud.exists_async(category='a') is True
+        assert await item_crud.exists_async(category='a', name='item_1') is True
+        assert await item_crud.exists_async(category='b') is False
+
+
+class TestProjection:
+    def test_projection_selects_output_columns_only(self):
+        """出力モデルに含まれない列がSELECT句に含まれないことを確認するテスト"""
+        crud = ItemCRUD(None)
+        projected = [column.key for column in crud._projection()]
+        assert projected == ['id', 'name', 'category', 'is_active', 'created_at']
+        assert 'secret' not in str(select(*crud._projection()))
+        assert [column.key for column in crud._projection('secret', 'id')][-1] == 'secret'
+
+    def test_converter_is_cached_per_model_pair(self):
+        """コンバーターが (db_model, output_model) ごとに1度だけ生成されることを確認するテスト"""
+        assert ItemCRUD(None)._converter is ItemCRUD(None)._converter
+        assert get_converter(Item, ReadItem) is ItemCRUD(None)._converter
+        assert get_converter(Item, CreateItem) is not get_converter(Item, ReadItem)
+
+    def test_converter_rejects_unmatched_required_field(self):
+        """必須の出力フィールドに対応する列が無い場合、生成時にエラーになることを確認するテスト"""
+
+        class ReadTitle(BaseModel):
+            id: int
+            title: str
+            note: str | None = None
+
+        with pytest.raises(ValueError, match='title'):
+            get_converter(Item, ReadTitle)
+        with pytest.raises(ValueError, match='missing'):
+            get_converter(Item, ReadTitle, {'title': 'missing'})
+
+        converter = get_converter(Item, ReadTitle, {'title': 'name'})
+        assert converter.column_names == ('id', 'name')
+        item = Item(name='a', category='c')
+        item.id = 1
+        assert converter.one(item) == ReadTitle(id=1, title='a')
+
+    @pytest.mark.asyncio
+    async def test_aliased_output_field_is_projected(self, item_crud: ItemCRUD):
+        """別名の出力フィールドが対応する列から読み込まれることを確認するテスト"""
+
+        class ReadTitle(BaseModel):
+            id: int
+            title: str
+
+        class TitleCRUD(SQLAlchemyCRUD[CreateItem, ReadTitle]):
+            def __init__(self, db_session):
+                super().__init__(db_session, Item, ReadTitle, output_aliases={'title': 'name'})
+
+        [item] = await item_crud.create_many_async(make_items(1))
+        assert await TitleCRUD(item_crud.db_session).read_async(item.id) == ReadTitle(id=item.id, title=item.name)
+
+    @pytest.mark.asyncio
+    async def test_read_async_from_row(self, item_crud: ItemCRUD):
+        """射影した行から出力モデルを組み立てられることを確認するテスト"""
+        [item] = await item_crud.create_many_async(make_items(1))
+        result = await item_crud.read_async(item.id)
+        assert result == item
+        assert await item_crud.read_by_filter_async(name=item.name) == [item]
+        assert await item_crud.read_all_async({'category': item.category}) == [item]
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.core.db.routing import PIN_PRIMARY_KEY
+from src.app.crud.loaders import DataLoader, id_loader
+
+
+class BatchRecorder:
+    def __init__(self, fail: bool = False):
+        self.calls: list[list[int]] = []
+        self.fail = fail
+
+    async def __call__(self, keys: list[int]) -> dict[int, str]:
+        self.calls.append(keys)
+        if self.fail:
+            raise RuntimeError('batch failed')
+        return {key: f'value_{key}' for key in keys if key != 0}
+
+
+@pytest.mark.asyncio
+async def test_load_coalesces_same_tick():
+    """同一ティック内の load が1回のバッチ取得にまとめられることを確認するテスト"""
+    recorder = BatchRecorder()
+    loader = DataLoader(recorder)
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(0))
+    assert results == ['value_1', 'value_2', 'value_1', None]
+    assert recorder.calls == [[1, 2, 0]]
+
+
+@pytest.mark.asyncio
+async def test_load_is_memoized():
+    """取得済みのキー (存在しないキーも含む) は再取得しないことを確認するテスト"""
+    recorder = BatchRecorder()
+    loader = DataLoader(recorder)
+    assert await loader.load_many([1, 0]) == ['value_1', None]
+    assert await loader.load_many([0, 1, 3]) == [None, 'value_1', 'value_3']
+    assert recorder.calls == [[1, 0], [3]]
+
+    loader.clear(1)
+    loader.prime(5, 'primed')
+    assert await loader.load_many([1, 5]) == ['value_1', 'primed']
+    assert recorder.calls[-1] == [1]
+
+
+@pytest.mark.asyncio
+async def test_load_failure_is_not_memoized():
+    """バッチ取得の失敗は各呼び出し元に伝わり、メモに残らないことを確認するテスト"""
+    recorder = BatchRecorder(fail=True)
+    loader = DataLoader(recorder)
+    with pytest.raises(RuntimeError):
+        await loader.load(1)
+    recorder.fail = False
+    assert await loader.load(1) == 'value_1'
+    assert recorder.calls == [[1], [1]]
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_pending_batches():
+    """close() で実行中のバッチ取得がキャンセルされて完了し、未実行のバッチ取得は開始されないことを確認するテスト"""
+    started = asyncio.Event()
+    finished = []
+
+    async def slow_batch(keys: list[int]) -> dict[int, str]:
+        started.set()
+        await asyncio.sleep(10)
+        finished.append(keys)
+        return {}
+
+    loader = DataLoader(slow_batch)
+    running = loader.load(1)
+    await started.wait()
+    queued = loader.load(2)
+    await loader.close()
+
+    assert not loader._tasks
+    assert running.cancelled()
+    assert queued.cancelled()
+    await asyncio.sleep(0)
+    assert finished == []
+    assert not loader._tasks
+
+
+class EmptyCRUD:
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def read_many_async(self, ids: list[int]) -> list:
+        return []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('primary', [False, True])
+async def test_id_loader_pins_primary(primary: bool):
+    """primary=True の場合のみ、取得前にセッションがプライマリに固定されることを確認するテスト"""
+    session = AsyncSession()
+    loader = id_loader(EmptyCRUD(session), primary=primary)
+    assert await loader.load(1) is None
+    assert session.info.get(PIN_PRIMARY_KEY, False) is primary
@@ -0,0 +1,106 @@
+"""PgBouncer のトランザクションプーリング (pooler_mode='transaction') での SQLAlchemyCRUD の動作確認
+
+環境変数 POSTGRES_POOLER_URI に PgBouncer (pool_mode = transaction) の接続先を指定すると、PgBouncer 経由で実行する。
+未指定の場合は PostgreSQL に直接接続し、同じエンジン設定で実行する
+"""
+
+import asyncio
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
+from src.app.core.config import settings
+from src.app.core.db.engine import EngineOptions, build_engine, uses_transaction_pooler, warm_up
+
+from tests.crud.items import CreateItem, Item, ItemBase, ItemCRUD, UpdateItem, make_items
+
+pytestmark = pytest.mark.postgres
+
+POOLER_URI = os.environ.get('POSTGRES_POOLER_URI', settings.postgres_async_uri)
+
+
+@pytest_asyncio.fixture
+async def pooler_engine():
+    engine = build_engine(POOLER_URI, EngineOptions(pooler_mode='transaction', statement_timeout_ms=3000), 'test_pooler')
+    async with engine.begin() as conn:
+        await conn.run_sync(ItemBase.metadata.create_all)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(ItemBase.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(pooler_engine):
+    return async_sessionmaker(pooler_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_engine_configuration(pooler_engine):
+    """アプリ側で接続を保持せず、トランザクションごとに statement_timeout が設定されることを確認するテスト"""
+    assert isinstance(pooler_engine.pool, NullPool)
+    assert uses_transaction_pooler(pooler_engine.sync_engine)
+    assert await warm_up(pooler_engine, 5) == 0
+    async with pooler_engine.begin() as conn:
+        assert await conn.scalar(text('SHOW statement_timeout')) == '3s'
+
+
+@pytest.mark.asyncio
+async def test_crud_operations(session_factory):
+    """作成・取得・更新・upsert・件数・ページング・削除が行えることを確認するテスト"""
+    async with session_factory() as session:
+        crud = ItemCRUD(session)
+        created = await crud.create_many_async(make_items(5, category='a'))
+        single = await crud.create_async(CreateItem(name='single', category='b'))
+        await session.commit()
+
+        assert (await crud.read_async(single.id)).name == 'single'
+        assert [item.id for item in await crud.read_many_async([created[0].id, created[1].id])] == [created[0].id, created[1].id]
+        assert (await crud.update_async(single.id, UpdateItem(name='renamed'))).name == 'renamed'
+        upserted = await crud.upsert_async(
+            CreateItem(name='renamed', category='b', secret='s'), conflict_cols=('category', 'name'), update_cols=('secret',)
+        )
+        assert upserted.id == single.id
+        assert await crud.count_async(category='a') == 5
+        assert await crud.exists_async(category='b') is True
+
+        page = await crud.read_page_async(limit=4)
+        assert len(page.items) == 4 and page.next_cursor is not None
+
+        await crud.delete_async(single.id)
+        assert await crud.read_async(single.id) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_across_sessions(session_factory):
+    """同じクエリを複数のセッションから並行して繰り返し実行しても、プリペアドステートメントの名前が衝突しないことを確認するテスト"""
+    async with session_factory() as session:
+        await ItemCRUD(session).create_many_async(make_items(3))
+        await session.commit()
+
+    async def read_repeatedly() -> list[int]:
+        async with session_factory() as session:
+            crud = ItemCRUD(session)
+            return [await crud.count_async(category='default') for _ in range(5)]
+
+    results = await asyncio.gather(*[read_repeatedly() for _ in range(5)])
+    assert results == [[3] * 5] * 5
+
+
+@pytest.mark.asyncio
+async def test_stream_without_server_side_cursor(session_factory):
+    """stream_async はサーバーサイドカーソルを使わずにページ単位で全件を返し、直接のストリーミングは拒否されることを確認するテスト"""
+    async with session_factory() as session:
+        crud = ItemCRUD(session)
+        created = await crud.create_many_async(make_items(25))
+        await session.commit()
+
+        streamed = [item.id async for item in crud.stream_async(filters={'category': 'default'}, yield_per=10)]
+        assert streamed == [item.id for item in created]
+
+        with pytest.raises(InvalidRequestError):
+            await session.stream(select(Item.id))
@@ -1,9 +1,18 @@
+import uuid
+from datetime import datetime
+
+import bcrypt
 import pytest
 import pytest_asyncio
 from faker import Faker
+from sqlalchemy import insert, select
 from src.app.api.v1.users.schemas import DataInUser
+from src.app.core.password_hasher import bcrypt_rounds, password_hasher
+from src.app.crud.base_crud import CRUDException
 from src.app.crud.user_crud import UserCRUD
-from src.app.schemas.user_schemas import CreateInternalUser
+from src.app.models.user import User
+from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
+from src.app.services.principal_cache import principal_cache
 from src.app.services.user_service import get_hashed_password
 from src.utils.logger import get_logger
 
@@ -56,3 +65,97 @@ async def test_update_verified(user_crud: UserCRUD, local_data_in_user: DataInUs
     assert user is not None
     updated_user = await user_crud.update_verified(user.id)
     assert updated_user.is_verified is True
+
+
+@pytest.mark.asyncio
+async def test_next_available_username_async(user_crud: UserCRUD, get_test_db_async, assert_max_queries):
+    """使用済みのユーザー名を1回のクエリで調べ、数字のみの接尾辞の最大値の次の連番を返すことを確認するテスト"""
+    taken = ['taro', 'taro_1', 'taro_3', 'taro_x', 'taro_1x', 'taro_99999999999999999999', 'tarou', 'jiro_1']
+    await get_test_db_async.execute(
+        insert(User),
+        [{'username': name, 'email': f'{name}@example.com', 'uuid': uuid.uuid4(), 'created_at': datetime.now()} for name in taken],
+    )
+
+    with assert_max_queries(1):
+        assert await user_crud.next_available_username_async('taro') == 'taro_4'
+    with assert_max_queries(1):
+        assert await user_crud.next_available_username_async('tarou') == 'tarou_1'
+    with assert_max_queries(1):
+        assert await user_crud.next_available_username_async('hanako') == 'hanako'
+    # base が未使用であれば、連番のユーザー名が使用済みでも base を返す
+    assert await user_crud.next_available_username_async('jiro') == 'jiro'
+    # LIKE のワイルドカード文字を含むユーザー名でも正しく判定する
+    assert await user_crud.next_available_username_async('tar%') == 'tar%'
+
+
+@pytest.mark.asyncio
+async def test_authenticate_rehashes_password(user_crud: UserCRUD, get_test_db_async, monkeypatch: pytest.MonkeyPatch):
+    """保存されているハッシュのコストがポリシーの範囲外の場合に、ログイン時に再ハッシュして保存することを確認するテスト"""
+    monkeypatch.setattr(password_hasher, 'rounds', 5)
+    monkeypatch.setattr(password_hasher, 'min_rounds', 5)
+    # users テーブルに ReadUser.name に対応する列がないため、変換を省いて行をそのまま返す
+    monkeypatch.setattr(user_crud, '_convert_to_pydantic_model', lambda row: row)
+    old_hashed_password = bcrypt.hashpw(b'Password1!', bcrypt.gensalt(4)).decode('utf-8')
+    await get_test_db_async.execute(
+        insert(User),
+        [
+            {
+                'username': 'rehash',
+                'email': 'rehash@example.com',
+                'hashed_password': old_hashed_password,
+                'uuid': uuid.uuid4(),
+                'created_at': datetime.now(),
+            }
+        ],
+    )
+    query = select(User.hashed_password).where(User.email == 'rehash@example.com')
+
+    assert await user_crud.authenticate('rehash@example.com', 'Password1!') is not None
+    new_hashed_password = await get_test_db_async.scalar(query)
+    assert bcrypt_rounds(new_hashed_password) == 5
+    assert bcrypt.checkpw(b'Password1!', new_hashed_password.encode('utf-8'))
+
+    # コストがポリシーの範囲内の場合は再ハッシュしない
+    assert await user_crud.authenticate('rehash@example.com', 'Password1!') is not None
+    assert await get_test_db_async.scalar(query) == new_hashed_password
+    # パスワードが誤っている場合は再ハッシュしない
+    monkeypatch.setattr(password_hasher, 'rounds', 6)
+    monkeypatch.setattr(password_hasher, 'min_rounds', 6)
+    assert await user_crud.authenticate('rehash@example.com', 'Password2!') is None
+    assert await get_test_db_async.scalar(query) == new_hashed_password
+
+
+@pytest.mark.asyncio
+async def test_authenticate_releases_connection_before_verify(user_crud: UserCRUD, get_test_db_async, monkeypatch: pytest.MonkeyPatch):
+    """パスワードの検証 (アドミッション制御の待ち・bcrypt) の間、DBのトランザクションを保持しないことを確認するテスト"""
+    await get_test_db_async.execute(
+        insert(User),
+        [
+            {
+                'username': 'verify',
+                'email': 'verify@example.com',
+                'hashed_password': 'hashed',
+                'uuid': uuid.uuid4(),
+                'created_at': datetime.now(),
+            }
+        ],
+    )
+    in_transaction = []
+
+    async def verify_password_async(password: str, hashed_password: str) -> bool:
+        in_transaction.append(get_test_db_async.in_transaction())
+        return False
+
+    monkeypatch.setattr('src.app.crud.user_crud.verify_password_async', verify_password_async)
+    assert await user_crud.authenticate('verify@example.com', 'Password1!') is None
+    assert in_transaction == [False]
+
+
+@pytest.mark.asyncio
+async def test_sync_delete_invalidates_principal_cache(get_test_db):
+    """同期セッションでの削除でも、認証済みユーザーのキャッシュから削除されることを確認するテスト"""
+    user = ReadUser(id=987654, name='Taro Yamada', username='taro', email='taro@example.com', is_verified=True)
+    await principal_cache.set(user)
+    with pytest.raises(CRUDException):
+        UserCRUD(get_test_db).delete(user.id)
+    assert await principal_cache.get(user.id) is None
@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.domains.users.schemas.user_schemas import Email
+from src.app.infrastructures.users.repositories.user_repository_impl import UserRepositoryImpl
+from src.app.models.user import User
+from src.app.schemas.user_schemas import ReadUser
+from src.app.services.principal_cache import principal_cache
+
+
+@pytest_asyncio.fixture
+async def user_id(get_test_db_async: AsyncSession) -> int:
+    result = await get_test_db_async.execute(
+        insert(User)
+        .values(
+            username='repo_user',
+            email='repo_user@example.com',
+            full_name='Taro Yamada',
+            uuid=uuid.uuid4(),
+            created_at=datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+        )
+        .returning(User.id)
+    )
+    return result.scalar_one()
+
+
+class TestCoreReads:
+    @pytest.mark.asyncio
+    async def test_core_and_orm_reads_return_same_entity(self, get_test_db_async: AsyncSession, user_id: int):
+        """Coreの行から生成したエンティティが、ORM経由で取得したエンティティと一致することを確認するテスト"""
+        core = UserRepositoryImpl(get_test_db_async)
+        orm = UserRepositoryImpl(get_test_db_async, core_reads=())
+
+        for method, argument in (
+            ('find_by_id', user_id),
+            ('find_by_email', Email(email='repo_user@example.com')),
+            ('find_by_username', 'repo_user'),
+        ):
+            core_entity = await getattr(core, method)(argument)
+            orm_entity = await getattr(orm, method)(argument)
+            assert core_entity is not None
+            assert core_entity.id == orm_entity.id == user_id
+            assert core_entity.__dict__ == orm_entity.__dict__
+
+        assert await core.find_by_id(user_id + 1) is None
+        assert await core.find_by_email(Email(email='missing@example.com')) is None
+
+    @pytest.mark.asyncio
+    async def test_core_reads_skip_identity_map(self, get_test_db_async: AsyncSession, user_id: int):
+        """Coreで取得した場合はORMインスタンスを生成せず、メソッドごとに切り替えられることを確認するテスト"""
+        loaded = []
+        event.listen(get_test_db_async.sync_session, 'loaded_as_persistent', lambda session, instance: loaded.append(instance))
+        repository = UserRepositoryImpl(get_test_db_async, core_reads={'find_by_email'})
+
+        await repository.find_by_email(Email(email='repo_user@example.com'))
+        assert loaded == []
+
+        await repository.find_by_id(user_id)
+        assert len(loaded) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_principal_cache(get_test_db_async: AsyncSession, user_id: int):
+    """ユーザーを論理削除・削除した場合に、認証済みユーザーのキャッシュから削除されることを確認するテスト"""
+    repository = UserRepositoryImpl(get_test_db_async)
+    cached_user = ReadUser(id=user_id, name='Taro Yamada', username='repo_user', email='repo_user@example.com', is_verified=False)
+
+    await principal_cache.set(cached_user)
+    await repository.logical_delete(user_id)
+    assert await principal_cache.get(user_id) is None
+
+    await principal_cache.set(cached_user)
+    await repository.delete(user_id)
+    assert await principal_cache.get(user_id) is None
@@ -5,13 +5,18 @@ import httpx
 import pytest
 import respx
 from google.oauth2 import id_token
+from sqlalchemy.exc import DBAPIError
+from src.app.api.v1.users.dependencies import get_user_loader
 from src.app.api.v1.users.schemas import DataInUser
 from src.app.core.config import settings
+from src.app.crud.loaders import DataLoader
 from src.app.crud.social_account_crud import SocialAccountCRUD
 from src.app.crud.user_crud import UserCRUD
-from src.app.schemas.social_account_schema import ReadSocialAccount
+from src.app.main import app
+from src.app.schemas.social_account_schema import CreateInternalSocialAccount, ReadSocialAccount
 from src.app.schemas.token_schemas import TokenUserData
 from src.app.schemas.user_schemas import CreateInternalUser, ReadUser
+from src.app.services.google_certs_service import GOOGLE_OAUTH2_CERTS_URL
 from src.app.services.token_service import JWTTokenService, token_service
 from src.utils.logger import get_logger
 
@@ -104,15 +109,15 @@ async def test_login_with_google_callback(
     client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch, dummy_token_data: dict, dummy_verify_oauth2_token
 ):
     # DB 関連の CRUD をダミー関数に置換して、新規ユーザー作成が行われるシナリオとする
-    async def dummy_get_by_provider_and_id(self, provider_user_id, provider):
+    async def dummy_get_by_provider_and_id(self, provider, provider_user_id):
         # 存在しないものとする
         return None
 
     async def get_by_email_async(self, email):
         return None
 
-    async def username_exists_async(self, username):
-        return False
+    async def next_available_username_async(self, base):
+        return base
 
     async def create_user_async(self, obj_in: CreateInternalUser):
         return ReadUser(
@@ -127,7 +132,7 @@ async def test_login_with_google_callback(
             updated_at=datetime.now(),
         )
 
-    async def create_social_account_async(self, obj_in: CreateInternalUser):
+    async def upsert_social_account_async(self, obj_in: CreateInternalSocialAccount):
         return ReadSocialAccount(
             id=1,
             user_id=1,
@@ -139,6 +144,7 @@ async def test_login_with_google_callback(
         )
 
     with respx.mock:
+        respx.get(GOOGLE_OAUTH2_CERTS_URL).mock(return_value=httpx.Response(200, json={'kid': 'cert'}))
         respx.post(settings.GOOGLE_TOKEN_URL).mock(
             return_value=httpx.Response(
                 status_code=200,
@@ -149,9 +155,9 @@ async def test_login_with_google_callback(
 
         monkeypatch.setattr(SocialAccountCRUD, 'get_by_provider_and_id', dummy_get_by_provider_and_id)
         monkeypatch.setattr(UserCRUD, 'get_by_email_async', get_by_email_async)
-        monkeypatch.setattr(UserCRUD, 'username_exists_async', username_exists_async)
+        monkeypatch.setattr(UserCRUD, 'next_available_username_async', next_available_username_async)
         monkeypatch.setattr(UserCRUD, 'create_async', create_user_async)
-        monkeypatch.setattr(SocialAccountCRUD, 'create_async', create_social_account_async)
+        monkeypatch.setattr(SocialAccountCRUD, 'upsert_async', upsert_social_account_async)
 
         monkeypatch.setattr(
             JWTTokenService,
@@ -171,3 +177,55 @@ async def test_login_with_google_callback(
             },
         )
         assert response.status_code in (302, 307)
+
+
+class QueryCanceled(Exception):
+    sqlstate = '57014'
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('error', 'status_code'),
+    [(None, 404), (DBAPIError('SELECT 1', {}, QueryCanceled('canceling statement due to statement timeout')), None)],
+)
+async def test_login_with_google_callback_keeps_status_code(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+    dummy_token_data: dict,
+    dummy_verify_oauth2_token,
+    error: DBAPIError | None,
+    status_code: int | None,
+):
+    """ユーザーが見つからない場合の 404 や、時間予算の依存性が 503 に変換するDBの例外が、400 に変換されないことを確認するテスト"""
+
+    async def get_by_provider_and_id(self, provider, provider_user_id):
+        if error is not None:
+            raise error
+        return ReadSocialAccount(
+            id=1,
+            user_id=987654,
+            provider='google',
+            provider_email=dummy_verify_oauth2_token['email'],
+            provider_user_id=dummy_verify_oauth2_token['sub'],
+            token_expiry=datetime.now(tz=ZoneInfo('Asia/Tokyo')) + timedelta(seconds=3600),
+            created_at=datetime.now(tz=ZoneInfo('Asia/Tokyo')),
+        )
+
+    async def load_nothing(user_ids: list[int]) -> dict[int, ReadUser]:
+        return {}
+
+    app.dependency_overrides[get_user_loader] = lambda: DataLoader(load_nothing)
+    monkeypatch.setattr(id_token, 'verify_oauth2_token', lambda *args, **kwargs: dummy_verify_oauth2_token)
+    monkeypatch.setattr(SocialAccountCRUD, 'get_by_provider_and_id', get_by_provider_and_id)
+    try:
+        with respx.mock:
+            respx.get(GOOGLE_OAUTH2_CERTS_URL).mock(return_value=httpx.Response(200, json={'kid': 'cert'}))
+            respx.post(settings.GOOGLE_TOKEN_URL).mock(return_value=httpx.Response(status_code=200, json=dummy_token_data))
+            if status_code is None:
+                with pytest.raises(DBAPIError):
+                    await client.get('/api/v1/auth/google/callback', params={'code': 'dummy_code'})
+                return
+            response = await client.get('/api/v1/auth/google/callback', params={'code': 'dummy_code'})
+    finally:
+        app.dependency_overrides.pop(get_user_loader, None)
+    assert response.status_code == status_code
@@ -1,5 +1,6 @@
 import httpx
 import pytest
+from src.app.core.resources import resources
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,3 +13,14 @@ async def test_health_check(client: httpx.AsyncClient):
     logger.info('Test health check response: %s', result)
     assert response.status_code == 200
     assert result == {'message': 'OK', 'status': 200}
+
+
+@pytest.mark.asyncio
+async def test_readiness_check(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    response = await client.get('/api/v1/health-check/ready')
+    assert response.status_code == 503
+
+    monkeypatch.setattr(resources, 'ready', True)
+    response = await client.get('/api/v1/health-check/ready')
+    assert response.status_code == 200
+    assert response.json() == {'message': 'OK', 'status': 200}
@@ -0,0 +1,12 @@
+import httpx
+import pytest
+from src.app.core.db.instrumentation import POOL_CHECKOUT_WAIT
+
+
+@pytest.mark.asyncio
+async def test_metrics(client: httpx.AsyncClient):
+    POOL_CHECKOUT_WAIT.observe(0.01, engine='primary')
+    response = await client.get('/api/v1/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    assert '# TYPE db_pool_checkout_wait_seconds histogram' in response.text
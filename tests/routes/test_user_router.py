@@ -1,9 +1,16 @@
 import pytest
+import pytest_asyncio
 from faker import Faker
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.app.api.v1.users.schemas import DataInUser
+from src.app.core.admission import AdmissionController
+from src.app.core.db.database import get_db_async
+from src.app.core.password_hasher import password_hasher
 from src.app.crud.user_crud import UserCRUD
+from src.app.main import app
 from src.app.schemas.user_schemas import ReadUser
 from src.utils.logger import get_logger
 
@@ -46,3 +53,62 @@ async def test_get_current_user(authed_client: AsyncClient):
     logger.info(f'user: {user}')
     assert user.email is not None
     assert user.name is not None
+
+
+@pytest_asyncio.fixture
+async def pool_checkouts(async_test_engine):
+    """リクエストごとにテスト用エンジンのセッションを生成し、リクエスト中の接続のチェックアウト回数を記録する"""
+    checkouts: list[int] = []
+
+    async def get_db():
+        async with AsyncSession(async_test_engine, expire_on_commit=False) as db:
+            yield db
+
+    def on_checkout(*args) -> None:
+        checkouts.append(async_test_engine.pool.checkedout())
+
+    event.listen(async_test_engine.sync_engine, 'checkout', on_checkout)
+    app.dependency_overrides[get_db_async] = get_db
+    yield checkouts
+    app.dependency_overrides.pop(get_db_async, None)
+    event.remove(async_test_engine.sync_engine, 'checkout', on_checkout)
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_invalid_token_does_not_check_out_connection(client: AsyncClient, async_test_engine, pool_checkouts: list[int]):
+    """トークンが不正なリクエストでは、セッションを生成しても接続をチェックアウトしないことを確認するテスト"""
+    response = await client.get('/api/v1/users/me', headers={'Authorization': 'Bearer invalid'})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert pool_checkouts == []
+    assert async_test_engine.pool.checkedout() == 0
+
+
+@pytest.mark.postgres
+@pytest.mark.asyncio
+async def test_admission_rejection_does_not_hold_connection(
+    client: AsyncClient,
+    async_test_engine,
+    pool_checkouts: list[int],
+    local_data_in_user: DataInUser,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """パスワードのハッシュ化がアドミッション制御で拒否 (503) される時点で、接続をプールに返却済みであることを確認するテスト"""
+    # 実行枠を使い切り、待ち行列もない状態にして即座に拒否させる
+    admission = AdmissionController('test_register', max_concurrent=1, max_queue=0, queue_timeout_ms=1000)
+    await admission.acquire()
+    checked_out_at_admission: list[int] = []
+    acquire = admission.acquire
+
+    async def recording_acquire() -> None:
+        checked_out_at_admission.append(async_test_engine.pool.checkedout())
+        await acquire()
+
+    monkeypatch.setattr(admission, 'acquire', recording_acquire)
+    monkeypatch.setattr(password_hasher, 'admission', admission)
+
+    response = await client.post('/api/v1/users/register', json=local_data_in_user.model_dump())
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert len(pool_checkouts) == 1
+    assert checked_out_at_admission == [0]
+    assert async_test_engine.pool.checkedout() == 0
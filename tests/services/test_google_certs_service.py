@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+from google.auth import transport
+from src.app.services import google_certs_service
+from src.app.services.google_certs_service import GOOGLE_OAUTH2_CERTS_URL, CachedCertsRequest
+
+
+class FallbackRequest(transport.Request):
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        self.calls.append((url, method))
+        request = self
+
+        class Response(transport.Response):
+            status = 200
+            headers = {'cache-control': 'public, max-age=0'}
+            data = f'{{"call": {len(request.calls)}}}'.encode()
+
+        return Response()
+
+
+@pytest.mark.asyncio
+async def test_preload_serves_from_cache():
+    """preload() で取得した証明書が同期の取得処理を経由せずに返されることを確認するテスト"""
+    fallback = FallbackRequest()
+    certs_request = CachedCertsRequest(fallback)
+    with respx.mock:
+        respx.get(GOOGLE_OAUTH2_CERTS_URL).mock(
+            return_value=httpx.Response(200, json={'kid': 'cert'}, headers={'cache-control': 'public, max-age=600'})
+        )
+        async with httpx.AsyncClient() as client:
+            await certs_request.preload(client)
+
+    response = certs_request(GOOGLE_OAUTH2_CERTS_URL, method='GET')
+    assert response.status == 200
+    assert response.data == b'{"kid":"cert"}'
+    assert fallback.calls == []
+
+
+def test_fallback_and_expiry(monkeypatch: pytest.MonkeyPatch):
+    """キャッシュがない場合・期限切れの猶予期間を過ぎた場合は取得処理に委譲することを確認するテスト"""
+    fallback = FallbackRequest()
+    certs_request = CachedCertsRequest(fallback)
+    assert certs_request('https://example.com/certs').data == b'{"call": 1}'
+    # max-age=0 で期限切れだが、猶予期間内は再取得せずに期限切れの証明書を返す
+    assert certs_request('https://example.com/certs').data == b'{"call": 1}'
+    monkeypatch.setattr(google_certs_service, 'CERTS_STALE_GRACE', 0)
+    assert certs_request('https://example.com/certs').data == b'{"call": 2}'
+    certs_request('https://example.com/certs', method='POST')
+    assert fallback.calls[-1] == ('https://example.com/certs', 'POST')
+
+
+@pytest.mark.asyncio
+async def test_ensure_refreshes_in_background():
+    """期限切れが近い証明書は ensure() が裏で再取得し、その間も同期の取得を行わずに既存の証明書を返すことを確認するテスト"""
+    fallback = FallbackRequest()
+    certs_request = CachedCertsRequest(fallback)
+    with respx.mock:
+        route = respx.get(GOOGLE_OAUTH2_CERTS_URL)
+        route.side_effect = [
+            httpx.Response(200, json={'kid': 'old'}, headers={'cache-control': 'public, max-age=60'}),
+            httpx.Response(200, json={'kid': 'new'}, headers={'cache-control': 'public, max-age=600'}),
+        ]
+        async with httpx.AsyncClient() as client:
+            # 未取得の場合は非同期に取得する
+            await certs_request.ensure(client)
+            assert route.call_count == 1
+
+            # 期限切れまで CERTS_REFRESH_MARGIN 未満のため、再取得をバックグラウンドで開始して待たずに戻る
+            await certs_request.ensure(client)
+            await certs_request.ensure(client)
+            assert certs_request(GOOGLE_OAUTH2_CERTS_URL).data == b'{"kid":"old"}'
+            await asyncio.sleep(0.05)
+            assert route.call_count == 2
+            assert certs_request(GOOGLE_OAUTH2_CERTS_URL).data == b'{"kid":"new"}'
+            await certs_request.close()
+    assert fallback.calls == []
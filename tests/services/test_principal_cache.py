@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from src.app.api.v1.users.dependencies import get_current_user
+from src.app.schemas.token_schemas import TokenUserData
+from src.app.schemas.user_schemas import ReadUser
+from src.app.services import principal_cache as principal_cache_module
+from src.app.services.principal_cache import PrincipalCache, principal_cache
+from src.app.services.token_service import token_service
+
+
+class InMemoryRedis:
+    """PrincipalCache が使う get / set / delete のみを持つ、テスト用のRedisクライアント"""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.expires: dict[str, int] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex: int) -> None:
+        self.data[key] = value
+        self.expires[key] = ex
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class SyncInMemoryRedis:
+    """invalidate_sync() が使う delete のみを持つ、テスト用の同期Redisクライアント"""
+
+    def __init__(self, data: dict[str, str]):
+        self.data = data
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class HangingRedis:
+    """応答しないRedisを再現する、テスト用のRedisクライアント"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def _hang(self, *args, **kwargs) -> None:
+        self.calls += 1
+        await asyncio.Event().wait()
+
+    get = set = delete = _hang
+
+
+class CountingLoader:
+    def __init__(self, users: dict[int, ReadUser]):
+        self.users = users
+        self.calls = 0
+
+    async def load(self, user_id: int) -> ReadUser | None:
+        self.calls += 1
+        return self.users.get(user_id)
+
+
+def make_user(user_id: int, username: str = 'taro') -> ReadUser:
+    return ReadUser(id=user_id, name='Taro Yamada', username=username, email=f'{username}@example.com', is_verified=True)
+
+
+@pytest.mark.asyncio
+async def test_local_tier_lru_and_ttl(monkeypatch: pytest.MonkeyPatch):
+    """LRUが最大件数を超えた場合は古いものから削除し、local_ttl を過ぎた値は返さないことを確認するテスト"""
+    cache = PrincipalCache(max_size=2, local_ttl=5, ttl=60)
+    for user_id in (1, 2, 3):
+        await cache.set(make_user(user_id))
+    assert await cache.get(1) is None
+    assert (await cache.get(3)).id == 3
+
+    now = principal_cache_module.time.monotonic()
+    monkeypatch.setattr(principal_cache_module.time, 'monotonic', lambda: now + 10)
+    assert await cache.get(3) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_invalidated():
+    """Redisに保存した値を他のワーカー (別のインスタンス) からも取得でき、invalidate() で両方から削除されることを確認するテスト"""
+    redis = InMemoryRedis()
+    worker_a = PrincipalCache(max_size=10, local_ttl=5, ttl=60, get_redis=lambda: redis)
+    worker_b = PrincipalCache(max_size=10, local_ttl=5, ttl=60, get_redis=lambda: redis)
+
+    user = make_user(1)
+    await worker_a.set(user)
+    assert redis.expires == {'principal:1': 60}
+    assert await worker_b.get(1) == user
+    # Redisから取得した値はLRUにも保持される
+    redis.data.clear()
+    assert await worker_b.get(1) == user
+
+    await worker_a.set(user)
+    await worker_a.invalidate(1)
+    assert await worker_a.get(1) is None
+    assert redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_many_and_sync():
+    """複数のユーザーをまとめて削除でき、同期的な処理からもLRUとRedisの両方から削除されることを確認するテスト"""
+    redis = InMemoryRedis()
+    sync_redis = SyncInMemoryRedis(redis.data)
+    cache = PrincipalCache(max_size=10, local_ttl=5, ttl=60, get_redis=lambda: redis, get_sync_redis=lambda: sync_redis)
+    for user_id in (1, 2, 3):
+        await cache.set(make_user(user_id))
+
+    await cache.invalidate(1, 2)
+    assert set(redis.data) == {'principal:3'}
+    cache.invalidate_sync(3)
+    assert redis.data == {}
+    assert [await cache.get(user_id) for user_id in (1, 2, 3)] == [None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable_falls_back_to_local():
+    """Redisに接続できない場合も例外を送出せず、一定時間はRedisに接続しないことを確認するテスト"""
+    redis = Redis(host='127.0.0.1', port=1)
+    calls = 0
+
+    def get_redis() -> Redis:
+        nonlocal calls
+        calls += 1
+        return redis
+
+    cache = PrincipalCache(max_size=10, local_ttl=5, ttl=60, get_redis=get_redis)
+    try:
+        assert await cache.get(1) is None
+        await cache.set(make_user(1))
+        assert (await cache.get(1)).id == 1
+        assert calls == 1
+    finally:
+        await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_hanging_redis_does_not_stall_requests():
+    """Redisが応答しない場合も redis_timeout で打ち切り、一定時間はRedisに接続しないことを確認するテスト"""
+    redis = HangingRedis()
+    cache = PrincipalCache(max_size=10, local_ttl=5, ttl=60, get_redis=lambda: redis, redis_timeout=0.01)
+
+    started = time.monotonic()
+    assert await cache.get(1) is None
+    await cache.set(make_user(1))
+    await cache.invalidate(1)
+    assert time.monotonic() - started < 1
+    assert redis.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_cache():
+    """2回目以降はDBから取得せずにキャッシュしたユーザーを返し、無効化後は再取得することを確認するテスト"""
+    user = make_user(7)
+    loader = CountingLoader({7: user})
+    token = token_service.create_access_token(TokenUserData(id=7, email=user.email))
+
+    assert await get_current_user(token=token, user_loader=loader) == user
+    assert await get_current_user(token=token, user_loader=loader) == user
+    assert loader.calls == 1
+
+    await principal_cache.invalidate(7)
+    assert await get_current_user(token=token, user_loader=loader) == user
+    assert loader.calls == 2
+
+    # 存在しないユーザーはキャッシュしない
+    missing_token = token_service.create_access_token(TokenUserData(id=8, email='missing@example.com'))
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await get_current_user(token=missing_token, user_loader=loader)
+    assert loader.calls == 4
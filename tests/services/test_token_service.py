@@ -6,7 +6,7 @@ from faker import Faker
 from jose import jwt
 from src.app.core.config import settings
 from src.app.schemas.token_schemas import TokenUserData
-from src.app.services.token_service import token_service
+from src.app.services.token_service import JWTTokenService, VerifiedTokenCache, token_service
 
 
 @pytest.fixture
@@ -78,3 +78,49 @@ def test_verify_expired_token(user_payload):
     expired_token = token_service.create_access_token(user_payload, expires_delta=timedelta(seconds=-1))
     verified_data = token_service.verify_token(expired_token)
     assert verified_data is None
+
+
+@pytest.fixture
+def cached_token_service():
+    return JWTTokenService(settings.SECRET_KEY, settings.ALGORITHM, cache=VerifiedTokenCache(max_size=2))
+
+
+def test_verify_token_uses_cache(cached_token_service: JWTTokenService, user_payload, monkeypatch: pytest.MonkeyPatch):
+    """2回目以降の検証ではデコードせずにキャッシュした結果を返し、無効なトークンはキャッシュしないことを確認するテスト"""
+    token = cached_token_service.create_access_token(user_payload)
+    verified_data = cached_token_service.verify_token(token)
+
+    def decode_not_called(*args, **kwargs):
+        raise AssertionError('jwt.decode should not be called')
+
+    with monkeypatch.context() as m:
+        m.setattr(jwt, 'decode', decode_not_called)
+        assert cached_token_service.verify_token(token) is verified_data
+
+    assert cached_token_service.verify_token('invalid_token') is None
+    assert len(cached_token_service.cache) == 1
+    assert (cached_token_service.cache.hits, cached_token_service.cache.misses) == (1, 2)
+    assert cached_token_service.cache.hit_rate == pytest.approx(1 / 3)
+
+
+def test_verified_token_cache_expiry_size_and_eviction(cached_token_service: JWTTokenService, user_payload, monkeypatch):
+    """有効期限を過ぎた結果は返さず、最大件数を超えた場合は古いものから削除し、失効時に削除できることを確認するテスト"""
+    cache = cached_token_service.cache
+    short_token = cached_token_service.create_access_token(user_payload, expires_delta=timedelta(seconds=30))
+    cached_token_service.verify_token(short_token)
+    now = datetime.now().timestamp()
+    monkeypatch.setattr('src.app.services.token_service.time.time', lambda: now + 60)
+    assert cache.get(short_token) is None
+    assert len(cache) == 0
+    monkeypatch.undo()
+
+    tokens = [cached_token_service.create_access_token(user_payload, expires_delta=timedelta(minutes=i + 1)) for i in range(3)]
+    for token in tokens:
+        cached_token_service.verify_token(token)
+    assert len(cache) == 2
+    assert cache.get(tokens[0]) is None
+
+    cached_token_service.revoke_token(tokens[1])
+    assert cache.get(tokens[1]) is None
+    assert cache.evict_subject(str(user_payload.id)) == 1
+    assert len(cache) == 0